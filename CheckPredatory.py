@@ -1,12 +1,15 @@
 import pywikibot
-from pywikibot import pagegenerators
 import re
-import itertools
 import time
 import traceback
-import requests
+from urllib.parse import urlsplit
+from categorysnapshot import get_category_titles
+from helperfunctions import api_query, batched
+from pagecache import get_texts
 
 pages_checked = 0
+links_checked = 0
+match_seconds = 0.0
 
 # Funktion, um die externen Links von einer Wikipedia-Seite zu extrahieren
 def extract_external_links(site, page_title):
@@ -20,68 +23,157 @@ def extract_external_links(site, page_title):
             links.add(line.strip())
     return links
 
-def get_pages_in_category(category_name, site):
+URL_PATTERN = re.compile(r"(?:https?:)?//[^\s\]\[<>\"'|{}]+", re.IGNORECASE)
+
+def extract_urls_from_text(text):
     """
-    Retrieves all pages in a given category and its subcategories.
+    Extrahiert externe Links direkt aus dem Wikitext (ohne über Vorlagen erzeugte Links).
 
     Args:
-        category_name: The name of the category.
-        site: The pywikibot.Site object representing the Wikipedia site.
+        text: Wikitext der Seite.
 
     Returns:
-        A set of pages in the category and its subcategories.
+        Liste der gefundenen URLs.
     """
-    category = pywikibot.Category(site, category_name)
-    return pagegenerators.CategorizedPageGenerator(category, recurse=True)
+    return list(dict.fromkeys(URL_PATTERN.findall(text)))
 
-def filter_pages(target_pages_gen, exclusion_pages_gen):
+def get_external_links_batch(site, titles, use_local_fallback=True):
     """
-    Filters pages that are in target_pages but not in exclusion_pages
-    and prevents duplicate pages.
+    Holt die externen Links für bis zu 50 Seiten mit prop=extlinks (inkl. Fortsetzungen).
+    Schlägt die Abfrage fehl, werden die Links optional aus dem (gecachten) Wikitext extrahiert.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+        use_local_fallback: Bei Fehlern die Links lokal aus dem Wikitext extrahieren.
+
+    Returns:
+        dict: {Seitentitel: Liste der externen Links}, jeder angefragte Titel ist enthalten.
+    """
+    links = {title: [] for title in titles}
+    try:
+        normalized = {}
+        for data in api_query(site, prop="extlinks", ellimit="max", titles="|".join(titles)):
+            query = data.get("query", {})
+            for entry in query.get("normalized", []):
+                normalized[entry["to"]] = entry["from"]
+            for page in query.get("pages", []):
+                title = normalized.get(page["title"], page["title"])
+                links.setdefault(title, []).extend(link["url"] for link in page.get("extlinks", []))
+    except Exception as e:
+        if not use_local_fallback:
+            raise
+        print(f"prop=extlinks fehlgeschlagen, extrahiere Links lokal: {e}")
+        texts = get_texts(site, titles)
+        links = {title: extract_urls_from_text(texts.get(title, "")) for title in titles}
+    return links
+
+def split_link(link):
+    """
+    Zerlegt einen Link in Hostnamen (klein, ohne "www.") und Pfad (mit Query).
+
+    Args:
+        link: Der Link, z.B. "https://www.example.org/journal?id=1" oder "//example.org".
+
+    Returns:
+        tuple: (Hostname, Pfad) oder (None, None), wenn der Link keinen Hostnamen hat.
+    """
+    if "//" not in link:
+        link = "//" + link
+    try:
+        parts = urlsplit(link.strip())
+        host = parts.hostname
+    except ValueError:
+        return None, None
+    if not host:
+        return None, None
+    host = host.rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path
+    if parts.query:
+        path += "?" + parts.query
+    return host, path
+
+
+def create_domain_index(predatory_links):
+    """
+    Baut aus den Einträgen der predatory-Liste einen Index über die Hostnamen auf.
+    Ein Eintrag gilt für den Host und alle Subdomains, ein Pfad im Eintrag schränkt
+    die Treffer auf Links ein, deren Pfad damit beginnt.
+
+    Args:
+        predatory_links: Menge der predatory Links (z.B. "https://www.example.org/journal").
+
+    Returns:
+        dict: {Hostname: Liste von Tupeln (Pfadpräfix, Eintrag)}
     """
+    index = {}
+    for entry in predatory_links:
+        host, path = split_link(entry)
+        if not host:
+            print(f"Eintrag ohne Hostnamen ignoriert: {entry}")
+            continue
+        index.setdefault(host, []).append((path.rstrip("/"), entry))
+    return index
 
-    special_excludes = {''}
 
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
+def match_predatory_link(domain_index, link):
+    """
+    Sucht einen Link im Index, dabei werden der Hostname und alle übergeordneten Domains geprüft.
 
-    seen_titles = set()   # <-- HIER passiert die Magie
+    Args:
+        domain_index: Der Index aus create_domain_index.
+        link: Der externe Link.
 
-    for page in target_pages_gen:
-        title = page.title()
+    Returns:
+        Liste der passenden Einträge der predatory-Liste.
+    """
+    host, path = split_link(link)
+    if not host:
+        return []
 
-        if title in seen_titles:
-            continue  # Duplikat → überspringen
+    matches = []
+    labels = host.split(".")
+    for start in range(len(labels)):
+        for prefix, entry in domain_index.get(".".join(labels[start:]), ()):
+            if path.startswith(prefix):
+                matches.append(entry)
+    return matches
 
-        seen_titles.add(title)
 
-        if (
-            title not in exclusion_titles
-            and not page.isRedirectPage()
-            and title not in special_excludes
-        ):
-            yield page
+def find_predatory_links(page_title, external_links, domain_index):
+    """
+    Sucht die predatory Domains in den externen Links einer Seite.
 
+    Args:
+        page_title: Titel der Seite.
+        external_links: Liste der externen Links der Seite.
+        domain_index: Der Index aus create_domain_index.
 
-def get_external_links(page: pywikibot.Page):
-    site = page.site
-    api_url = site.base_url(site.apipath())
+    Returns:
+        Liste von Tupeln (Domain, externer Link, Seitentitel).
+    """
+    global links_checked, match_seconds
+    start_time = time.perf_counter()
 
-    headers = {
-        "User-Agent": "ChemoBot/1.0 (https://de.wikipedia.org/wiki/Benutzer:ChemoBot)"
-    }
+    found_links = []
+    for ext in external_links:
+        for pred in match_predatory_link(domain_index, ext):
+            found_links.append((pred, ext, page_title))
+            print(f"  -> Link gefunden: {pred} in {page_title}")
 
-    params = {
-        "action": "parse",
-        "page": page.title(),
-        "prop": "externallinks",
-        "format": "json"
-    }
+    links_checked += len(external_links)
+    match_seconds += time.perf_counter() - start_time
+    return found_links
 
-    response = requests.get(api_url, params=params, headers=headers)
-    response.raise_for_status()
 
-    data = response.json()
-    return data.get("parse", {}).get("externallinks", [])
+def print_match_statistics():
+    """
+    Gibt die Anzahl der geprüften Links und den Durchsatz der Suche aus.
+    """
+    rate = links_checked / match_seconds if match_seconds else 0
+    print(f"links_checked = {links_checked}, Suche: {round(match_seconds, 3)} s ({round(rate)} Links/s)")
 
 def write_results_to_subpage(base_page: pywikibot.Page, lines: list[str]):
     """
@@ -115,31 +207,19 @@ def write_results_to_subpage(base_page: pywikibot.Page, lines: list[str]):
     )
 
 
-def process_category(category_names, exclusion_category_names, predatory_links, site):
+def process_category(category_names, exclusion_category_names, domain_index, site):
     """
-    Adds text to all pages in a category and its subcategories.
+    Checks the external links of all pages in a category and its subcategories.
+    The external links are fetched with prop=extlinks for 50 pages per request.
 
     Args:
-        category_name: The name of the category to process.
+        category_names: List of category names to process.
+        exclusion_category_names: List of category names to exclude.
+        domain_index: Index of the predatory links (see create_domain_index).
         site: The pywikibot.Site object representing the Wikipedia site.
     """
-    target_pages = []
-    # Get all pages in the exclusion category and its subcategories
-    for inclusion_category_name in category_names:
-        print(f"get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion category and its subcategories
-    print("get pages in exclusion category")
-    
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site))
-
-    # Subtract exclusion pages from target pages
-    print("filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+    titles = get_category_titles(site, category_names, exclusion_category_names)
 
     start_time = time.time()  # Startzeit der Schleife
     interval = 60  # Intervall in Sekunden
@@ -147,37 +227,26 @@ def process_category(category_names, exclusion_category_names, predatory_links,
 
     print("process pages")
     found_links = []
-    for page in filtered_pages:
-
-        count = count + 1
-        if time.time() - start_time >= interval:
-            start_time = time.time()  # Reset der Startzeit für die nächste Nachricht
-            print(f"{count}. Seite: {page.title()}")
-
-        # print(page.title())
-        global pages_checked
-        pages_checked = pages_checked + 1
-        if page.namespace() == 0 and not page.isRedirectPage():  # Only process articles (namespace 0)
-            try:
-                external_links = get_external_links(page)
-
-                page_text = page.text
-                # print(f"Überprüfe Seite: {page.title()}")
-                for ext in external_links:
-                    for pred in predatory_links:
-                        if pred in ext:
-                            found_links.append((pred, ext, page.title()))
-                            print(f"  -> Link gefunden: {pred} in {page.title()}")
-                    # else:
-                    #    print(f"  -> Link NICHT gefunden: {link}")
-
-                # print(f"Added text to page: {page.title()}")
-            except Exception as e:
-                traceback.print_exc()
-                print(f"Failed to add text to page {page.title()}: {e}")
+    for batch in batched(titles, 50):
+        try:
+            external_links = get_external_links_batch(site, batch)
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Failed to get external links for {batch[0]} ... {batch[-1]}: {e}")
+            continue
+
+        for title in batch:
+            count = count + 1
+            if time.time() - start_time >= interval:
+                start_time = time.time()  # Reset der Startzeit für die nächste Nachricht
+                print(f"{count}. Seite: {title}")
+
+            global pages_checked
+            pages_checked = pages_checked + 1
+            found_links.extend(find_predatory_links(title, external_links[title], domain_index))
 
     if found_links:
-        write_results_to_subpage(page, found_links)
+        write_results_to_subpage(pywikibot.Page(site, "Benutzer:Rjh/predatory"), found_links)
 
 
 def human_readable_time_difference(start_time, end_time):
@@ -219,14 +288,16 @@ def main():
     # Extrahiere die externen Links von der Seite "Benutzer:Rjh/predatory"
     predatory_links = extract_external_links(site, "Benutzer:Rjh/predatory")
     print(f"Gefundene externe Links: {len(predatory_links)} Links")
+    domain_index = create_domain_index(predatory_links)
 
     # Überprüfe, ob diese Links in den Seiten einer bestimmten Kategorie vorhanden sind
     category_names = ["Kategorie:Chemische Verbindung nach Element", "Kategorie:Chemische Verbindung nach Strukturelement"]  
     #exclusion_category_names = ["Kategorie:Mineral" , "Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe"]
     exclusion_category_names = ["Kategorie:Mineral"]
 
-    process_category(category_names, exclusion_category_names, predatory_links, site)
+    process_category(category_names, exclusion_category_names, domain_index, site)
     print(f"\npages_checked = {pages_checked}")
+    print_match_statistics()
     print("\nLaufzeit: ",human_readable_time_difference(zeitanfang, time.time()))
  
 if __name__ == "__main__":
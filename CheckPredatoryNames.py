@@ -1,67 +1,17 @@
 import pywikibot
-from pywikibot import pagegenerators
 import re
-import itertools
 import time
 import traceback
-import requests
-from helperfunctions import human_readable_time_difference
+from helperfunctions import human_readable_time_difference, create_literal_matcher, find_literals
+from categorysnapshot import get_category_pages, get_category_titles
+from dumpreader import dump_candidate_pages
+import doiresolver
+import argparse
 
 pages_checked = 0
 pages_found = 0
 
 
-DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$", re.IGNORECASE)
-
-import re
-import time
-import requests
-
-DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$", re.IGNORECASE)
-
-import requests
-import re
-
-DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$", re.IGNORECASE)
-
-def doi_exists(doi, timeout=15):
-    # print(f"Prüfe DOI: {doi}")
-
-    if not doi:
-        return False
-
-    doi = doi.strip()
-
-    if not DOI_PATTERN.match(doi):
-        print("DOI hat ungültiges Format")
-        return False
-
-    url = f"https://api.crossref.org/works/{doi}"
-    # print(f"→ Anfrage an: {url}")
-
-    headers = {
-        "User-Agent": "MyWikiBot/1.0 (mailto:mail@example.org)"
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=timeout)
-        # print(f"← HTTP Status: {response.status_code}")
-
-        if response.status_code == 200:
-            return True
-        elif response.status_code == 404:
-            print("DOI existiert nicht (404)")
-            return False
-        else:
-            print(f"Unerwarteter Statuscode: {response.status_code}")
-            return False
-
-    except requests.RequestException as e:
-        print(f"Netzwerkfehler: {e}")
-        return False
-
-
-
 # Funktion, um die externen Links von einer Wikipedia-Seite zu extrahieren
 def extract_external_names(site, page_title):
     page = pywikibot.Page(site, page_title)
@@ -74,36 +24,119 @@ def extract_external_names(site, page_title):
             links.add(line.strip())
     return links
 
+# Ausnahmen gegen Fehltreffer: {Name: Texte, bei deren Vorkommen in derselben Referenz der Name nicht gezählt wird}
+NAME_EXCLUSIONS = {
+    "RIDE": ("HYDRIDE", "TRIDE", "TELLURIDE", "FLUORIDE", "CHLORIDE", "TRIDENT"),
+    "Journal of Chemistry": (
+        "Canadian Journal of Chemistry", "Asian Journal of Chemistry", "Arabian Journal of Chemistry",
+        "New Journal of Chemistry", "Australian Journal of Chemistry", "Israel Journal of Chemistry",
+        "Turkish Journal of Chemistry", "Indian Journal of Chemistry", "Chinese Journal of Chemistry",
+        "European Journal of Chemistry", "Journal of Chemistry and Applied Chemical Engineering",
+        "Oriental Journal of Chemistry",
+    ),
+    "Journal of Energy": ("Journal of Energy Engineering",),
+    "Scientific World": ("The Scientific World Journal",),
+    "Applied Microbiology": (
+        "Applied Microbiology and Biotechnology", "Journal of Applied Microbiology",
+        "Systematic and Applied Microbiology", "Letters in Applied Microbiology",
+        "The Society for Applied Microbiology",
+    ),
+    "Engineering Sciences": ("Mathematical, Physical and Engineering Sciences",),
+    "Pharmacognosy Research": ("Journal of Pharmacy & Pharmacognosy Research",),
+    "BioChem": ("ChemBioChem", "BioChemica"),
+    "RICA": ("AMERICA", "AFRICA", "LYRICA", "TRICA"),
+    "IPP": ("DIPP", "CIPPH", "NIPPON", "-IPP", "IPPN", "TIPP"),
+    "Journal of Tropical Medicine": ("The American Journal of Tropical Medicine and Hygiene",),
+    "BioMed": ("BioMed Central", "BioMed research international"),
+    "Journal of Toxicology": (
+        "Journal of Toxicology and Environmental Health", "International Journal of Toxicology",
+        "Japanese Journal of Toxicology", "Journal of Toxicology Clinical Toxicology",
+    ),
+    "ECI": ("PRECI",),
+    "AMJ": ("SAMJ",),
+    "RECI": ("PRECISION",),
+    "JIM": ("JIMD", "JIMO"),
+    "MCA": ("MCAT", "DIMCARB", "MCAC"),
+    "CSJ": ("/CSJ", "BCSJ"),
+    "JOP": ("JOPSS",),
+    "CAE": ("CAESIUM",),
+    "ABP": ("ABPA", "FABP"),
+    "IJP": ("Indian Journal of Plastic Surgery", "IJPP"),
+    "JHP": ("AJHP",),
+    "JMC": ("name=\"JMC",),
+    "JPR": ("WJPR", "Journal of Pain Research"),
+    "Journal of Nanotechnology": ("Beilstein Journal of Nanotechnology",),
+    "Medical Sciences": (
+        "Journal of Experimental Physiology and Cognate Medical Sciences",
+        "Turkiye Klinikleri Journal of Medical Sciences",
+    ),
+    "Forensic Sciences": ("Journal of Forensic Sciences",),
+    "Horticulturae": ("Scientia Horticulturae", "Acta Horticulturae"),
+    "International Journal of Food Science": ("International Journal of Food Science & Technology",),
+    "International Journal of Environment": (
+        "International Journal of Environmental Science & Technology",
+        "International Journal of Environmental Research and Public Health",
+    ),
+    "Science International": ("Forensic Science International",),
+    "Journal of Nutrition and Metabolism": ("Mediterranean Journal of Nutrition and Metabolism",),
+    "Journal of Science": ("Journal of Science Education", "American Journal of Science"),
+    "Geriatrics": ("Geriatrics & Gerontology International",),
+    "Journal of Sports Medicine": ("British Journal of Sports Medicine",),
+    "Physiologia": ("Physiologia Plantarum",),
+    "BioTech": ("BioTechniques",),
+    "Agriculturae": ("Acta Agriculturae",),
+    "JCT": ("IJCT",),
+    "Review of Research": ("Systematic Review of Research",),
+    "Molecular Imaging": ("Molecular Imaging, Biomedical Materials and Pharmaceuticals",),
+    "Neuropsychiatry": ("Journal of Neuropsychiatry",),
+    "Journal of Oncology": ("International Journal of Oncology",),
+    "Business Journal": ("Boston Business Journal",),
+    "Reproductive Medicine": ("Journal of Reproductive Medicine and Endocrinology",),
+}
+
+REFERENCE_PATTERN = re.compile(r"<ref(?!erences)\b[^>/]*>(.*?)</ref>", re.DOTALL | re.IGNORECASE)
+REF_BLOCK_PATTERN = re.compile(r"(<ref[^>]*>(.*?)</ref>)", re.DOTALL)
+DOI_TEMPLATE_PATTERN = re.compile(r"(?:\{\{DOI\||\[\[doi:|\|doi\s*=)\s*([^}\]\|\s]+)", re.IGNORECASE)
+YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+STRUCTURED_FIELD_PATTERNS = {field: re.compile(rf"{field}\s*=\s*([^|}}]+)") for field in ("Datum", "DOI")}
+
+
 # Funktion, um Referenzen aus dem Wikitext zu extrahieren
 def extract_references(wikitext):
     """
     Extrahiert die Referenzen aus dem Wikitext einer Seite.
     """
-    references = re.findall(
-        r"<ref(?!erences)\b[^>/]*>(.*?)</ref>",
-        wikitext,
-        re.DOTALL | re.IGNORECASE
-    )
-    return references
+    return REFERENCE_PATTERN.findall(wikitext)
+
+
+def extract_ref_blocks(wikitext):
+    """
+    Extrahiert alle <ref ...>...</ref>-Blöcke einer Seite (einmal pro Seite, für parse_reference).
+
+    Returns:
+        Liste von Tupeln (ganzer Block inklusive Tag, Inhalt).
+    """
+    return REF_BLOCK_PATTERN.findall(wikitext)
 
-def parse_reference(text, name):
+
+def parse_reference(ref_blocks, name):
     """
-    Durchsucht alle <ref ...>...</ref>-Blöcke und extrahiert:
+    Durchsucht die <ref ...>...</ref>-Blöcke und extrahiert:
       - Datum (Jahr)
       - DOI (strukturiert oder aus {{DOI|...}})
     Der gesuchte Name muss irgendwo im <ref>-Block vorkommen.
-    Gibt ein Dictionary oder None zurück.
-    """
 
-    # Alle <ref ...>...</ref>-Blöcke finden
-    ref_blocks = re.findall(r"(<ref[^>]*>.*?</ref>)", text, re.DOTALL)
-    if not ref_blocks:
-        return None
+    Args:
+        ref_blocks: Die Blöcke aus extract_ref_blocks.
+        name: Der gefundene Name.
+
+    Returns:
+        Ein Dictionary oder None.
+    """
 
     def extract_structured(field, content):
         """Extrahiert strukturierte Felder wie DOI = ..."""
-        pattern = rf"{field}\s*=\s*([^|}}]+)"
-        match = re.search(pattern, content)
+        match = STRUCTURED_FIELD_PATTERNS[field].search(content)
         return match.group(1).strip() if match else None
 
     def extract_unstructured(content):
@@ -112,36 +145,23 @@ def parse_reference(text, name):
         datum = None
 
         # DOI aus {{DOI|...}}
-        doi_match = re.search(
-            r"(?:\{\{DOI\||\[\[doi:|\|doi\s*=)\s*([^}\]\|\s]+)",
-            content,
-            re.IGNORECASE
-        )
-
+        doi_match = DOI_TEMPLATE_PATTERN.search(content)
         if doi_match:
             doi = doi_match.group(1).strip()
 
-
         # Jahr (vierstellig)
-        year_match = re.search(r"\b(19|20)\d{2}\b", content)
+        year_match = YEAR_PATTERN.search(content)
         if year_match:
             datum = year_match.group(0)
 
         return datum, doi
 
-    for full_block in ref_blocks:
+    for full_block, ref_content in ref_blocks:
 
         # Name kann im Tag oder im Inhalt stehen
         if name not in full_block:
             continue
 
-        # Inhalt extrahieren
-        content_match = re.search(r"<ref[^>]*>(.*?)</ref>", full_block, re.DOTALL)
-        if not content_match:
-            continue
-
-        ref_content = content_match.group(1)
-
         # 1. Strukturierte Felder
         datum = extract_structured("Datum", ref_content)
         doi = extract_structured("DOI", ref_content)
@@ -164,175 +184,52 @@ def parse_reference(text, name):
         }
 
     return None
-    
-# Funktion, um zu prüfen, ob ein externer Name in den Referenzen vorkommt
-def check_names_in_references(references, external_names):
-    """
-    Überprüft, ob externe Links in den Referenzen vorhanden sind.
 
-    Args:
-        references: Liste von Referenzen (als Text).
-        external_names: Menge von externen Namen.
 
-    Returns:
-        Eine Liste von gefundenen Namen.
-    """
-    found_names = []
-    for reference in references:
-        for name in external_names:
-            # print(name, " ===> ", reference)
-            if name in reference:
-                if name == "RIDE" and (("HYDRIDE" in reference) or ("TRIDE" in reference) or ("TELLURIDE" in reference) or ("FLUORIDE" in reference) or ("CHLORIDE" in reference) or ("TRIDENT" in reference)): 
-                    continue
-                if name == "Journal of Chemistry" and (("Canadian Journal of Chemistry" in reference) or ("Asian Journal of Chemistry" in reference) or ("Arabian Journal of Chemistry" in reference) or ("New Journal of Chemistry" in reference) or ("Australian Journal of Chemistry" in reference) or ("Israel Journal of Chemistry" in reference) or ("Turkish Journal of Chemistry" in reference) or ("Indian Journal of Chemistry" in reference) or ("Chinese Journal of Chemistry" in reference) or ("European Journal of Chemistry" in reference) or ("Journal of Chemistry and Applied Chemical Engineering" in reference) or ("Oriental Journal of Chemistry" in reference)): 
-                    continue
-                if name == "Journal of Energy" and "Journal of Energy Engineering" in reference: 
-                    continue
-                if name == "Scientific World" and "The Scientific World Journal" in reference: 
-                    continue
-                if name == "Applied Microbiology" and (("Applied Microbiology and Biotechnology" in reference) or ("Journal of Applied Microbiology" in reference)or ("Systematic and Applied Microbiology" in reference) or ("Letters in Applied Microbiology" in reference) or ("The Society for Applied Microbiology" in reference)): 
-                    continue
-                if name == "Engineering Sciences" and "Mathematical, Physical and Engineering Sciences" in reference: 
-                    continue
-                if name == "Pharmacognosy Research" and "Journal of Pharmacy & Pharmacognosy Research" in reference: 
-                    continue
-                if name == "BioChem" and "ChemBioChem" in reference: 
-                    continue
-                if name == "RICA" and (("AMERICA" in reference) or ("AFRICA" in reference) or ("LYRICA" in reference) or ("TRICA" in reference)): 
-                    continue
-                if name == "IPP" and (("DIPP" in reference) or ("CIPPH" in reference) or ("NIPPON" in reference) or ("-IPP" in reference) or ("IPPN" in reference) or ("TIPP" in reference)): 
-                    continue
-                if name == "Journal of Tropical Medicine" and "The American Journal of Tropical Medicine and Hygiene" in reference: 
-                    continue
-                if name == "BioMed" and (("BioMed Central" in reference) or ("BioMed research international")): 
-                    continue
-                if name == "Journal of Toxicology" and (("Journal of Toxicology and Environmental Health" in reference) or ("International Journal of Toxicology" in reference) or ("Japanese Journal of Toxicology" in reference) or ("Journal of Toxicology Clinical Toxicology" in reference)): 
-                    continue
-                if name == "ECI" and "PRECI" in reference: 
-                    continue
-                if name == "AMJ" and "SAMJ" in reference: 
-                    continue
-                if name == "RECI" and "PRECISION" in reference: 
-                    continue
-                if name == "JIM" and (("JIMD" in reference) or ("JIMO" in reference)): 
-                    continue
-                if name == "MCA" and (("MCAT" in reference) or ("DIMCARB" in reference) or ("MCAC" in reference)): 
-                    continue
-                if name == "CSJ" and (("/CSJ" in reference) or ("BCSJ") in reference): 
-                    continue
-                if name == "JOP" and "JOPSS" in reference: 
-                    continue
-                if name == "CAE" and "CAESIUM" in reference: 
-                    continue
-                if name == "ABP" and ("ABPA" in reference or ("FABP" in reference)): 
-                    continue
-                if name == "IJP" and "Indian Journal of Plastic Surgery" in reference: 
-                    continue
-                if name == "JHP" and "AJHP" in reference: 
-                    continue
-                if name == "JMC" and "name=\"JMC" in reference: 
-                    continue
-                if name == "JPR" and (("WJPR" in reference) or ("Journal of Pain Research" in reference)): 
-                    continue
-                if name == "BioChem" and "BioChemica" in reference: 
-                    continue
-                if name == "Journal of Nanotechnology" and "Beilstein Journal of Nanotechnology" in reference: 
-                    continue
-                if name == "Medical Sciences" and "Journal of Experimental Physiology and Cognate Medical Sciences" in reference: 
-                    continue
-                if name == "Medical Sciences" and "Turkiye Klinikleri Journal of Medical Sciences" in reference: 
-                    continue
-                if name == "Forensic Sciences" and "Journal of Forensic Sciences" in reference: 
-                    continue
-                if name == "Horticulturae" and (("Scientia Horticulturae" in reference) or ("Acta Horticulturae") in reference): 
-                    continue
-                if name == "International Journal of Food Science" and "International Journal of Food Science & Technology" in reference: 
-                    continue
-                if name == "International Journal of Environment" and "International Journal of Environmental Science & Technology" in reference: 
-                    continue
-                if name == "Science International" and "Forensic Science International" in reference: 
-                    continue
-                if name == "Journal of Nutrition and Metabolism" and "Mediterranean Journal of Nutrition and Metabolism" in reference: 
-                    continue
-                if name == "Journal of Science" and "Journal of Science Education" in reference: 
-                    continue
-                if name == "Geriatrics" and "Geriatrics & Gerontology International" in reference: 
-                    continue
-                if name == "Journal of Sports Medicine" and "British Journal of Sports Medicine" in reference: 
-                    continue
-                if name == "Physiologia" and "Physiologia Plantarum" in reference: 
-                    continue
-                if name == "International Journal of Environment" and "International Journal of Environmental Research and Public Health" in reference:
-                    continue
-                if name == "BioTech" and "BioTechniques" in reference: 
-                    continue
-                if name == "Agriculturae" and "Acta Agriculturae" in reference: 
-                    continue
-                if name == "JCT" and "IJCT" in reference: 
-                    continue
-                if name == "Review of Research" and "Systematic Review of Research" in reference: 
-                    continue
-                if name == "Journal of Science" and "American Journal of Science" in reference: 
-                    continue
-                if name == "Molecular Imaging" and "Molecular Imaging, Biomedical Materials and Pharmaceuticals" in reference: 
-                    continue
-                if name == "Neuropsychiatry" and "Journal of Neuropsychiatry" in reference: 
-                    continue
-                if name == "Journal of Oncology" and "International Journal of Oncology" in reference: 
-                    continue
-                if name == "IJP" and "IJPP" in reference: 
-                    continue
-                if name == "Business Journal" and "Boston Business Journal" in reference: 
-                    continue
-                if name == "Reproductive Medicine" and "Journal of Reproductive Medicine and Endocrinology" in reference: 
-                    continue
-
-                found_names.append(name)
-                found_names = list(set(found_names))                
-    return found_names
-
-
-def get_pages_in_category(category_name, site):
+def create_name_matcher(external_names, exclusions=NAME_EXCLUSIONS):
     """
-    Retrieves all pages in a given category and its subcategories.
+    Übersetzt die Namen und die Ausnahmen einmal in einen regulären Ausdruck, so dass jede
+    Referenz in einem Durchlauf auf alle Namen und Ausnahmetexte geprüft wird.
 
     Args:
-        category_name: The name of the category.
-        site: The pywikibot.Site object representing the Wikipedia site.
+        external_names: Menge von externen Namen.
+        exclusions: dict {Name: Ausnahmetexte}.
 
     Returns:
-        A set of pages in the category and its subcategories.
+        dict: Der Matcher für check_names_in_references.
     """
-    category = pywikibot.Category(site, category_name)
-    return pagegenerators.CategorizedPageGenerator(category, recurse=True)
+    names = frozenset(external_names)
+    exclusions = {name: frozenset(texts) for name, texts in exclusions.items() if name in names}
 
+    name_matcher = create_literal_matcher(names.union(*exclusions.values()))
+    name_matcher["names"] = names
+    name_matcher["exclusions"] = exclusions
+    return name_matcher
 
-def filter_pages(target_pages_gen, exclusion_pages_gen):
-    """
-    Filters pages that are in target_pages but not in exclusion_pages
-    and prevents duplicate pages.
-    """
-
-    special_excludes = {''}
-
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
 
-    seen_titles = set()   # <-- HIER passiert die Magie
-
-    for page in target_pages_gen:
-        title = page.title()
+# Funktion, um zu prüfen, ob ein externer Name in den Referenzen vorkommt
+def check_names_in_references(references, name_matcher):
+    """
+    Überprüft, ob externe Namen in den Referenzen vorhanden sind.
 
-        if title in seen_titles:
-            continue  # Duplikat → überspringen
+    Args:
+        references: Liste von Referenzen (als Text).
+        name_matcher: Der Matcher aus create_name_matcher.
 
-        seen_titles.add(title)
+    Returns:
+        Eine sortierte Liste von gefundenen Namen.
+    """
+    names = name_matcher["names"]
+    exclusions = name_matcher["exclusions"]
 
-        if (
-            title not in exclusion_titles
-            and not page.isRedirectPage()
-            and title not in special_excludes
-        ):
-            yield page
+    found_names = set()
+    for reference in references:
+        found = find_literals(name_matcher, reference)
+        for name in found & names:
+            if name in exclusions and not exclusions[name].isdisjoint(found):
+                continue
+            found_names.add(name)
+    return sorted(found_names)
 
 
 def is_allowed_doi(doi: str) -> bool:
@@ -357,6 +254,49 @@ def is_allowed_doi(doi: str) -> bool:
     return prefix in ALLOWED_PREFIXES
 
 
+def check_page_for_predatory_names(page_title, page_text, name_matcher):
+    """
+    Prüft die Referenzen eines Seitentextes auf predatory Journal Namen.
+
+    Args:
+        page_title: Titel der Seite.
+        page_text: Wikitext der Seite.
+        name_matcher: Der Matcher aus create_name_matcher.
+
+    Returns:
+        Liste von Tupeln (Name, Seitentitel, DOI, Datum, DOI bei crossref bekannt).
+    """
+    found_links = []
+
+    # Extrahiere Referenzen aus dem Wikitext
+    references = extract_references(page_text)
+
+    # Prüfe, ob externe Journal Namen in den Referenzen vorkommen
+    found_names = check_names_in_references(references, name_matcher)
+    if not found_names:
+        return found_links
+
+    ref_blocks = extract_ref_blocks(page_text)
+    found_refs = []
+    for name in found_names:
+        ref_data = parse_reference(ref_blocks, name)
+        if ref_data and is_allowed_doi(ref_data["DOI"]):
+            continue
+        found_refs.append((name, ref_data))
+        print(f"{pages_found} [[{page_title}]]: {name}")
+
+    # alle DOIs der Seite gemeinsam bei Crossref prüfen (bekannte Ergebnisse aus dem Cache)
+    doi_known = doiresolver.check_dois([ref_data["DOI"] for name, ref_data in found_refs if ref_data])
+
+    for name, ref_data in found_refs:
+        if ref_data:
+            found_links.append((name, page_title, ref_data["DOI"], ref_data["Datum"], doi_known[ref_data["DOI"]]))
+        else:
+            found_links.append((name, page_title, "", "", ""))
+
+    return found_links
+
+
 def write_results_to_subpage(site, lines: list[str]):
     """
     Schreibt die gefundenen Links in eine Unterseite der Basis-Seite.
@@ -393,32 +333,24 @@ def write_results_to_subpage(site, lines: list[str]):
     )
 
 
-def process_category(category_names, exclusion_category_names, external_names, site):
+def process_category(category_names, exclusion_category_names, name_matcher, site, dump_file=None):
     """
     Processes all pages in the specified category and checks for external links in references.
 
     Args:
         category_names: List of category names to process.
         exclusion_category_names: List of category names to exclude.
-        external_links: Set of external links to check.
+        name_matcher: Compiled predatory names (see create_name_matcher).
         site: The pywikibot.Site object representing the Wikipedia site.
+        dump_file: Optional XML dump, only pages with hits in the dump are loaded live.
     """
-    target_pages = []
-    # Get all pages in the inclusion categories
-    for inclusion_category_name in category_names:
-        print(f"Get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion categories
-    print("Get pages in exclusion categories")
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"Exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site))
-
-    # Subtract exclusion pages from target pages
-    print("Filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    if dump_file:
+        # Check the references in the dump offline, the hits are checked again with the live text
+        titles = get_category_titles(site, category_names, exclusion_category_names)
+        filtered_pages = dump_candidate_pages(site, dump_file, titles, lambda title, text: check_names_in_references(extract_references(text), name_matcher))
+    else:
+        # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+        filtered_pages = get_category_pages(site, category_names, exclusion_category_names)
 
     start_time = time.time()  # Startzeit der Schleife
     interval = 60  # Intervall in Sekunden
@@ -437,30 +369,9 @@ def process_category(category_names, exclusion_category_names, external_names, s
 
         if page.namespace() == 0 and not page.isRedirectPage():  # Only process articles (namespace 0)
             try:
-                page_text = page.text
-                # Extrahiere Referenzen aus dem Wikitext
-                references = extract_references(page_text)
-
-                # Prüfe, ob externe Journal Namen in den Referenzen vorkommen
-                found_names = check_names_in_references(references, external_names)
-                
-                found = False
-                
-                for name in found_names:
-                    
-                    ref_data = parse_reference(page_text, name)
-                    if ref_data:
-                        
-                        doi = ref_data["DOI"]
-                        if is_allowed_doi(doi):
-                            continue
-                            
-                        found = True
-                        found_links.append((name, page.title(), ref_data["DOI"], ref_data["Datum"], doi_exists(doi)))
-                    else:
-                        found = True
-                        found_links.append((name, page.title(), "", "", ""))
-                    print(f"{pages_found} [[{page.title()}]]: {name}")
+                page_links = check_page_for_predatory_names(page.title(), page.text, name_matcher)
+                found_links.extend(page_links)
+                found = bool(page_links)
                 
                 if found:
                     pages_found += 1
@@ -476,8 +387,15 @@ def process_category(category_names, exclusion_category_names, external_names, s
 
 # Hauptfunktion
 def main():
+    parser = argparse.ArgumentParser(description="Prüfung auf predatory Journal Namen")
+    parser.add_argument(
+        "--dump",
+        help="XML-Dump (z.B. dewiki-latest-pages-articles.xml.bz2) offline prüfen, nur Treffer werden live geladen"
+    )
+    args = parser.parse_args()
+
     
-    # print(doi_exists("10.3390/ijerph16122068"))
+    # print(doiresolver.doi_exists("10.3390/ijerph16122068"))
     # exit(0)
     zeitanfang = time.time()
     site = pywikibot.Site('de', 'wikipedia')  # Stelle sicher, dass du 'de' und 'wikipedia' korrekt konfigurierst
@@ -485,12 +403,13 @@ def main():
     # Extrahiere die Namen von der Seite "Benutzer:Rjh/predatory_names"
     external_names = extract_external_names(site, "Benutzer:Rjh/predatory_names")
     print(f"Gefundene externe Namen: {len(external_names)} Namen")
+    name_matcher = create_name_matcher(external_names)
 
     # Test on special page
     # page = pywikibot.Page(site, "Anhalinin")
     # refs = extract_references(page.text)
     # print(f"{refs}")
-    # found_names = check_names_in_references(refs, external_names)
+    # found_names = check_names_in_references(refs, name_matcher)
     # if found_names:
     #    print(f"* [[{page.title()}]]: {', '.join(found_names)}")
     # exit(1)
@@ -500,8 +419,9 @@ def main():
     exclusion_category_names = ["Kategorie:Mineral"]
 
     # Prozess starten
-    process_category(category_names, exclusion_category_names, external_names, site)
+    process_category(category_names, exclusion_category_names, name_matcher, site, args.dump)
     print(f"\npages_checked = {pages_checked}, pages_found = {pages_found}")
+    print(f"DOI-Prüfungen: {doiresolver.lookups} Anfragen, {doiresolver.cache_hits} aus dem Cache")
     print("\nLaufzeit: ", human_readable_time_difference(zeitanfang, time.time()))
 
 
@@ -1,14 +1,7 @@
 import openpyxl
 import pywikibot
-
-def getSearchCount(site, name, maxSearchNumber):
-    if maxSearchNumber < 200:
-        maxSearchNumber = 500
-    else:
-        maxSearchNumber = 2*maxSearchNumber
-    results = list(site.search("\""+name+"\"", total=maxSearchNumber, namespaces=[0]))
-    #print(f"Treffer für '{name}' im Artikelnamensraum: {len(results)}")
-    return len(results)
+from backlinkcount import count_backlinks
+from searchcount import count_name_hits
 
 # Lade Excel-Datei
 dateiname = "../Mineralnamen.xlsx"  # Passe den Dateinamen an
@@ -23,6 +16,13 @@ ws.cell(row=1, column=3).value = "Links"
 ws.cell(row=1, column=4).value = "Sprachen"
 ws.cell(row=1, column=5).value = "Suchtreffer"
 
+# Anzahl interner Links für alle Namen vorab in Blöcken zu 50 zählen (nur Hauptnamensraum)
+names = [row[0].value for row in ws.iter_rows(min_row=2) if isinstance(row[0].value, str)]
+link_counts = count_backlinks(site_de, names)
+
+# Suchtreffer (totalhits, nicht mehr begrenzt) ebenfalls vorab abfragen
+search_counts = count_name_hits(site_de, names)
+
 # Durchlaufe alle Zeilen ab der zweiten (Kopfzeile überspringen)
 for i, row in enumerate(ws.iter_rows(min_row=2), start=2):
     name = row[0].value         # Spalte A: Name
@@ -32,15 +32,11 @@ for i, row in enumerate(ws.iter_rows(min_row=2), start=2):
     search_count = 0
     
     # Anzahl interner Links in deutscher Wikipedia
-    try:
-        page = pywikibot.Page(site_de, name)
-        backlinks = list(page.backlinks(namespaces=[0]))  # Nur Hauptnamensraum
-        link_count = len(backlinks)
-    except Exception as e:
-        print(f"Fehler bei Seite '{name}': {e}")
-        link_count = None
+    link_count = link_counts.get(name)
+    if link_count is None:
+        print(f"Fehler bei Seite '{name}': keine Linkzählung")
 
-    search_count = getSearchCount(site_de, name, link_count)
+    search_count = search_counts.get(name)
 
     # Anzahl Sprachversionen über Wikidata
     if isinstance(wikidata_id, str) and wikidata_id.startswith("Q"):
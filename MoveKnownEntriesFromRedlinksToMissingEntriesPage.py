@@ -1,6 +1,7 @@
 import pywikibot
 import re
 import difflib
+from titleindex import create_title_index, find_title, get_entry_title
 
 def load_short_list(site):
     """
@@ -226,8 +227,9 @@ def add_entry_to_exclusion_list(text, section_title, new_entry):
 
         # print("new_entry = " ,new_entry, " ,Exclusionlist = ", exclusion_list, "\n\n")
 
-        # Neuen Eintrag alphabetisch einfügen
-        if new_entry in exclusion_list or new_entry.strip() in exclusion_list :
+        # Neuen Eintrag alphabetisch einfügen, Schreibvarianten desselben Titels gelten als vorhanden
+        title_index = create_title_index({section_title: [get_entry_title(line) for line in exclusion_list]})
+        if find_title(title_index, get_entry_title(new_entry)):
             # print(f"Der Eintrag '{new_entry}' ist bereits in der Ausschlussliste.")
             return text
         else:
@@ -281,8 +283,9 @@ def add_entry_to_intermediate_list(text, section_title, new_entry):
 
         # print("new_entry = " ,new_entry, " ,Exclusionlist = ", exclusion_list, "\n\n")
 
-        # Neuen Eintrag alphabetisch einfügen
-        if new_entry in exclusion_list or new_entry.strip() in exclusion_list :
+        # Neuen Eintrag alphabetisch einfügen, Schreibvarianten desselben Titels gelten als vorhanden
+        title_index = create_title_index({section_title: [get_entry_title(line) for line in exclusion_list]})
+        if find_title(title_index, get_entry_title(new_entry)):
             # print(f"Der Eintrag '{new_entry}' ist bereits in der Ausschlussliste.")
             return text
         else:
@@ -3,22 +3,15 @@
 
 import re
 import pywikibot
+from wikidatabulk import get_entities_bulk
 
 CAS_PROPERTY = "P231"
 
 
-def get_cas_from_wikidata(repo, qid):
-    """Liest CAS-Nummer (P231) aus Wikidata."""
-    try:
-        item = pywikibot.ItemPage(repo, qid)
-        item.get()
-
-        if CAS_PROPERTY in item.claims:
-            claim = item.claims[CAS_PROPERTY][0]
-            return claim.getTarget()
-
-    except Exception as e:
-        print(f"Fehler bei {qid}: {e}")
+def get_cas_from_wikidata(item):
+    """Liest CAS-Nummer (P231) aus einem mit get_entities_bulk geladenen Element."""
+    if item and item["claims"].get(CAS_PROPERTY):
+        return item["claims"][CAS_PROPERTY][0]
 
     return None
 
@@ -45,6 +38,9 @@ def process_page():
         re.UNICODE
     )
 
+    # Elemente der Einträge ohne CAS-Nummer vorab in Blöcken laden
+    items = get_entities_bulk(repo, [match.group(3) for match in pattern.finditer(text) if not match.group(2)], props="claims")
+
     def replace_entry(match):
         nonlocal changed, total_checked, total_added
 
@@ -61,7 +57,7 @@ def process_page():
             print("   → CAS bereits vorhanden")
             return match.group(0)
 
-        cas_from_wd = get_cas_from_wikidata(repo, qid)
+        cas_from_wd = get_cas_from_wikidata(items[qid])
 
         if cas_from_wd:
             print(f"   → CAS ergänzt: {cas_from_wd}")
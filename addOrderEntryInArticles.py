@@ -2,10 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import pywikibot
-from pywikibot import pagegenerators
 import re
-import itertools
 import time
+from categorysnapshot import get_category_titles, pages_from_titles
 
 # Fix UnicodeEncodeError: 'charmap' codec can't encode characters
 import sys
@@ -185,20 +184,21 @@ def sort_umlaute_and_numbers(text):
     result = ''.join(main_part) + ''.join(umlaut_and_number_part)
     return result
 
-def add_text_to_page(page):
+def add_sort_key(page_title, original_text):
     """
-    Adds text to the end of a Wikipedia page.
+    Adds a sort key before the categories of a page text if the title needs one
+    and the text doesn't contain a sort key yet.
 
     Args:
-        page: The Wikipedia page to which text is to be added.
+        page_title: The title of the page.
+        original_text: The wikitext of the page.
+
+    Returns:
+        The changed wikitext (unchanged if no sort key is necessary).
     """
-    page_title = page.title()
     sorted = sort_patterns_to_end(page_title)
-    
-    if (sorted != page_title):
-        # Load the current content of the page
-        original_text = page.text
 
+    if (sorted != page_title):
         if ((original_text.find("{{SORTIERUNG:") == -1) and (original_text.find("{{DEFAULTSORT:") == -1)):
 
             text_to_add = "{{SORTIERUNG:" + sorted + "}}"
@@ -208,11 +208,30 @@ def add_text_to_page(page):
             
             if categories_pos != -1:
                 # Text unmittelbar vor den Kategorien einfügen
-                new_content = original_text[:categories_pos] + text_to_add + "\n" + original_text[categories_pos:]
+                return original_text[:categories_pos] + text_to_add + "\n" + original_text[categories_pos:]
             else:
                 # Text am Ende der Seite hinzufügen
-                new_content = original_text + "\n" + text_to_add
-            
+                return original_text + "\n" + text_to_add
+
+    return original_text
+
+
+def add_text_to_page(page):
+    """
+    Adds a sort key to a Wikipedia page.
+
+    Args:
+        page: The Wikipedia page to which text is to be added.
+    """
+    page_title = page.title()
+    sorted = sort_patterns_to_end(page_title)
+    
+    if (sorted != page_title):
+        # Load the current content of the page
+        original_text = page.text
+        new_content = add_sort_key(page_title, original_text)
+
+        if new_content != original_text:
             # Die Seite mit dem neuen Inhalt speichern
             try:
                 
@@ -246,53 +265,15 @@ def add_text_to_page(page):
                 print(f"Fehler beim Speichern der Seite {page_title}: {e}")
 
 
-def get_pages_in_category(category_name, site, content=True):
+def filter_titles(titles):
     """
-    Ruft alle Seiten in einer Kategorie und deren Unterkategorien ab.
-
-    Args:
-        category_name: Der Name der Kategorie.
-        site: Das pywikibot.Site-Objekt, das die Wikipedia-Site repräsentiert.
-
-    Returns:
-        Ein Generator für Seiten in der Kategorie und deren Unterkategorien.
-    """
-    
-    category = pywikibot.Category(site, category_name)
-    ret = pagegenerators.CategorizedPageGenerator(category, recurse=True, content=content)
-
-    return ret
-
-def filter_pages(target_pages_gen, exclusion_pages_gen):
-    """
-    Filters pages that are in target_pages but not in exclusion_pages
-    and prevents duplicate pages.
+    Filters titles with spaces and special excluded pages.
     """
     print("filter pages")
 
     special_excludes = ['T-2-Toxin', 'Fura-2AM', 'H12MDI', 'Biotin-PEG2-Amin', 'Cy5-Succinimidylester', 'HFPO-DA', 'Naphthol-AS-MX-Phosphat', 'L-Selektrid']
 
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
-
-    seen_titles = set()   # <-- HIER passiert die Magie
-
-    for page in target_pages_gen:
-        title = page.title()
-
-        if title in seen_titles:
-            continue  # Duplikat → überspringen
-
-        seen_titles.add(title)
-
-        if (
-            title not in exclusion_titles
-            and not page.isRedirectPage()
-            and title not in special_excludes
-            and " " not in title
-        ):
-            yield page
-
-    print("exit filter pages")
+    return [title for title in titles if title not in special_excludes and " " not in title]
 
 
 def process_category(category_names, exclusion_category_names, site):
@@ -303,30 +284,19 @@ def process_category(category_names, exclusion_category_names, site):
         category_name: The name of the category to process.
         site: The pywikibot.Site object representing the Wikipedia site.
     """
-    target_pages = []
-    # Get all pages in the exclusion category and its subcategories
-    for inclusion_category_name in category_names:
-        print(f"get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion category and its subcategories
-    print("get pages in exclusion category")
-    
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site, content=False))
+    # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+    titles = filter_titles(get_category_titles(site, category_names, exclusion_category_names))
 
-    # Subtract exclusion pages from target pages
-    print("filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    # Only pages whose title needs a sort key have to be loaded
+    titles = [title for title in titles if sort_patterns_to_end(title) != title]
+    filtered_pages = pages_from_titles(site, titles)
 
     print("process pages")
     for page in filtered_pages:
         global pages_checked
         pages_checked = pages_checked + 1
         print(f"{pages_checked}. {page.title()}")
-        if page.namespace() == 0 and not page.isRedirectPage():  # Only process articles (namespace 0)
+        if page.namespace() == 0:  # Only process articles (namespace 0)
             try:
                 add_text_to_page(page)
                 # print(f"Added text to page: {page.title()}")
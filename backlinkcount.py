@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Zählt eingehende Links für viele Seiten auf einmal, ohne die verlinkenden Seiten als
+Page-Objekte zu laden.
+
+Je 50 Titel werden mit prop=linkshere (lhprop=pageid) abgefragt, gezählt werden nur die
+Seiten-IDs. Mit at_least wird die Zählung abgebrochen, sobald alle Titel eines Blocks
+mindestens so viele Links haben ("mindestens N"). Die Ergebnisse werden in
+cache/backlink_counts.json gespeichert und gelten, solange sich der Zeitstempel
+"touched" der Zielseite nicht geändert hat. Da neue Links nicht jedes Mal "touched"
+ändern (und fehlende Seiten keinen Zeitstempel haben), gilt zusätzlich ein Höchstalter.
+
+Im Unterschied zu Page.backlinks() werden Links über Weiterleitungen nicht
+mitgezählt, nur die Weiterleitungen selbst (außer mit exclude_redirects).
+"""
+
+import time
+from helperfunctions import api_query, batched, cache_path, load_json_cache, save_json_cache
+
+BACKLINK_CACHE_FILE = cache_path("backlink_counts.json")
+
+# gespeicherte Zählungen werden spätestens nach einem Tag wiederholt
+BACKLINK_CACHE_TTL = 24 * 3600
+
+# Zustand des aktuellen Laufs
+_cache = None
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+counted = 0
+
+
+def get_cache():
+    """
+    Lädt den Cache der Linkzählungen (einmal pro Lauf).
+
+    Returns:
+        dict: {Variante: {Titel: [Anzahl, vollständig, touched, Zeitpunkt]}}
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_json_cache(BACKLINK_CACHE_FILE, {})
+    return _cache
+
+
+def get_variant(namespaces, exclude_redirects, exclude_self):
+    """
+    Liefert den Schlüssel für die Abfrageoptionen, unter dem die Zählungen gespeichert werden.
+    """
+    return f"ns={'|'.join(str(ns) for ns in namespaces)};redirects={not exclude_redirects};self={not exclude_self}"
+
+
+def get_page_infos(site, titles):
+    """
+    Fragt Seiten-ID und touched für bis zu 50 Titel mit einer Abfrage ab.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+
+    Returns:
+        tuple: ({normalisierter Titel: (Seiten-ID oder 0, touched oder "")},
+        {angefragter Titel: normalisierter Titel}), ungültige Titel fehlen.
+    """
+    infos = {}
+    normalized = {}
+    for data in api_query(site, prop="info", titles="|".join(titles)):
+        query = data.get("query", {})
+        for entry in query.get("normalized", []):
+            normalized[entry["from"]] = entry["to"]
+        for page in query.get("pages", []):
+            if page.get("invalid"):
+                continue
+            infos[page["title"]] = (page.get("pageid", 0), page.get("touched", ""))
+    return infos, normalized
+
+
+def query_backlink_counts(site, infos, namespaces, at_least, exclude_redirects, exclude_self):
+    """
+    Zählt die eingehenden Links für bis zu 50 (normalisierte) Titel.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        infos: {Titel: (Seiten-ID, touched)} aus get_page_infos.
+        namespaces: Namensräume der verlinkenden Seiten.
+        at_least: Abbruch, sobald alle Titel so viele Links haben (None = vollständig zählen).
+        exclude_redirects: Weiterleitungen nicht mitzählen.
+        exclude_self: Links einer Seite auf sich selbst nicht mitzählen.
+
+    Returns:
+        tuple: ({Titel: Anzahl}, vollständig gezählt)
+    """
+    counts = {title: 0 for title in infos}
+    params = {
+        "prop": "linkshere",
+        "lhprop": "pageid",
+        "lhlimit": "max",
+        "lhnamespace": "|".join(str(ns) for ns in namespaces),
+        "titles": "|".join(infos),
+    }
+    if exclude_redirects:
+        params["lhshow"] = "!redirect"
+
+    for data in api_query(site, **params):
+        for page in data.get("query", {}).get("pages", []):
+            title = page["title"]
+            if title not in counts:
+                continue
+            own_pageid = infos[title][0]
+            for link in page.get("linkshere", []):
+                if exclude_self and link["pageid"] == own_pageid:
+                    continue
+                counts[title] += 1
+
+        if at_least is not None and all(count >= at_least for count in counts.values()):
+            return counts, False
+
+    return counts, True
+
+
+def count_backlinks(site, titles, namespaces=(0,), at_least=None, exclude_redirects=False, exclude_self=False):
+    """
+    Zählt die eingehenden Links beliebig vieler Seiten (in Blöcken zu 50).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln (auch nicht existierende Seiten).
+        namespaces: Namensräume der verlinkenden Seiten.
+        at_least: Wenn gesetzt, wird nur bis "mindestens at_least" gezählt.
+        exclude_redirects: Weiterleitungen nicht mitzählen.
+        exclude_self: Links einer Seite auf sich selbst nicht mitzählen.
+
+    Returns:
+        dict: {Titel: Anzahl der Links}, mit at_least höchstens at_least.
+    """
+    global cache_hits, counted
+
+    cache = get_cache().setdefault(get_variant(namespaces, exclude_redirects, exclude_self), {})
+    now = time.time()
+    counts = {}
+
+    for batch in batched(list(dict.fromkeys(titles)), 50):
+        infos, normalized = get_page_infos(site, batch)
+
+        outdated = {}
+        for title, (pageid, touched) in infos.items():
+            entry = cache.get(title)
+            if entry:
+                count, complete, cached_touched, checked = entry
+                if cached_touched == touched and now - checked <= BACKLINK_CACHE_TTL and (complete or (at_least is not None and count >= at_least)):
+                    counts[title] = count
+                    cache_hits += 1
+                    continue
+            outdated[title] = (pageid, touched)
+
+        if outdated:
+            found, complete = query_backlink_counts(site, outdated, namespaces, at_least, exclude_redirects, exclude_self)
+            counted += len(found)
+            for title, count in found.items():
+                # bei Abbruch sind nur Titel mit weniger als at_least Links vollständig gezählt
+                cache[title] = [count, complete or count < at_least, outdated[title][1], now]
+                counts[title] = count
+
+        for title in batch:
+            canonical = normalized.get(title, title)
+            counts[title] = counts.get(canonical, 0)
+
+    save_json_cache(BACKLINK_CACHE_FILE, get_cache())
+
+    if at_least is not None:
+        return {title: min(counts[title], at_least) for title in titles}
+    return {title: counts[title] for title in titles}
+
+
+def has_more_backlinks(site, titles, threshold, namespaces=(0,), exclude_redirects=False, exclude_self=False):
+    """
+    Prüft, ob Seiten mehr als threshold eingehende Links haben (zählt nur bis threshold + 1).
+
+    Returns:
+        dict: {Titel: True/False}
+    """
+    counts = count_backlinks(site, titles, namespaces, threshold + 1, exclude_redirects, exclude_self)
+    return {title: count > threshold for title, count in counts.items()}
+
+
+def print_backlink_statistics():
+    """
+    Gibt aus, wie viele Zählungen aus dem Cache kamen.
+    """
+    print(f"Linkzählung: {cache_hits} aus dem Cache, {counted} neu gezählt")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Kompakter Index der CAS-Nummern aus GESTIS.txt, EPA_HPV.txt und OECD_HPV.txt.
+
+Jede CAS-Nummer wird nach Prüfung der Prüfziffer als Ganzzahl gespeichert (Ziffern ohne
+Bindestriche), die Zahlen liegen sortiert in einem array zusammen mit je einem Byte für
+die Listen, in denen die Nummer vorkommt, und der ZVG-Nummer aus GESTIS. Der Index wird
+in cache/cas_index.pickle gespeichert und nur neu aufgebaut, wenn sich eine der
+Textdateien geändert hat.
+"""
+
+import os
+import re
+from array import array
+from bisect import bisect_left
+from helperfunctions import cache_path, load_pickle_cache, save_pickle_cache
+
+CAS_INDEX_FILE = cache_path("cas_index.pickle")
+CAS_PATTERN = re.compile(r"\b\d{2,7}-\d{2}-\d\b")
+
+# Listen in Ausgabereihenfolge: (Name, Datei), Bit i der Flags steht für die i-te Liste
+CAS_SOURCES = [
+    ("GESTIS", "GESTIS.txt"),
+    ("EPA_HPV", "EPA_HPV.txt"),
+    ("OECD_HPV", "OECD_HPV.txt"),
+]
+
+
+def pack_cas(cas):
+    """
+    Wandelt eine CAS-Nummer in eine Ganzzahl um, nachdem die Prüfziffer kontrolliert wurde.
+
+    Args:
+        cas: Die CAS-Nummer, z.B. "7732-18-5".
+
+    Returns:
+        int: z.B. 7732185, oder None bei ungültigem Format oder falscher Prüfziffer.
+    """
+    parts = cas.strip().split("-")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    if not 2 <= len(parts[0]) <= 7 or len(parts[1]) != 2 or len(parts[2]) != 1:
+        return None
+
+    digits = parts[0] + parts[1]
+    checksum = sum(position * int(digit) for position, digit in enumerate(reversed(digits), start=1))
+    if checksum % 10 != int(parts[2]):
+        return None
+    return int(digits + parts[2])
+
+
+def unpack_cas(value):
+    """
+    Wandelt eine gepackte CAS-Nummer wieder in die übliche Schreibweise um.
+    """
+    digits = str(value)
+    return f"{digits[:-3]}-{digits[-3:-1]}-{digits[-1]}"
+
+
+def get_signature(sources):
+    """
+    Liefert Größe und Änderungszeit der Textdateien, um Änderungen zu erkennen.
+    """
+    signature = []
+    for name, filename in sources:
+        try:
+            stat = os.stat(filename)
+            signature.append((filename, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((filename, None, None))
+    return signature
+
+
+def build_cas_index(sources=CAS_SOURCES):
+    """
+    Liest die Textdateien und baut den Index auf.
+
+    Args:
+        sources: Liste von Tupeln (Name der Liste, Datei).
+
+    Returns:
+        dict: Der Index mit den sortierten arrays "values", "flags" und "zvg".
+    """
+    entries = {}
+    zvg_numbers = {}
+    invalid = 0
+
+    for bit, (name, filename) in enumerate(sources):
+        print(f"Lade CAS aus {filename}")
+        count = 0
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                for line in f:
+                    # GESTIS: ZVG-Nr. in der ersten Spalte
+                    fields = line.split("\t", 1)
+                    zvg = int(fields[0]) if name == "GESTIS" and fields[0].strip().isdigit() else 0
+
+                    for cas in CAS_PATTERN.findall(line):
+                        value = pack_cas(cas)
+                        if value is None:
+                            invalid += 1
+                            continue
+                        entries[value] = entries.get(value, 0) | (1 << bit)
+                        if zvg:
+                            zvg_numbers.setdefault(value, zvg)
+                        count += 1
+        except OSError as e:
+            print(f"{filename} nicht lesbar: {e}")
+        print(f"{count} CAS Nummern gefunden")
+
+    if invalid:
+        print(f"{invalid} CAS Nummern mit falscher Prüfziffer ignoriert")
+
+    values = sorted(entries)
+    return {
+        "signature": get_signature(sources),
+        "sources": [name for name, filename in sources],
+        "values": array("Q", values),
+        "flags": array("B", (entries[value] for value in values)),
+        "zvg": array("L", (zvg_numbers.get(value, 0) for value in values)),
+    }
+
+
+def load_cas_index(sources=CAS_SOURCES, cache_file=CAS_INDEX_FILE):
+    """
+    Lädt den gespeicherten Index, bei geänderten Textdateien wird er neu aufgebaut.
+
+    Args:
+        sources: Liste von Tupeln (Name der Liste, Datei).
+        cache_file: Pfad der Cache-Datei.
+
+    Returns:
+        dict: Der Index für lookup_cas und lookup_cas_bulk.
+    """
+    index = load_pickle_cache(cache_file, None)
+    if index is not None and index.get("signature") == get_signature(sources):
+        print(f"CAS-Index: {len(index['values'])} Nummern aus dem Cache")
+        return index
+
+    index = build_cas_index(sources)
+    save_pickle_cache(cache_file, index)
+    print(f"CAS-Index: {len(index['values'])} Nummern neu aufgebaut")
+    return index
+
+
+def describe_entry(index, position):
+    """
+    Liefert die Listen und die ZVG-Nummer eines Eintrags im Index.
+    """
+    flags = index["flags"][position]
+    sources = [name for bit, name in enumerate(index["sources"]) if flags & (1 << bit)]
+    return sources, index["zvg"][position] or None
+
+
+def lookup_cas(index, cas):
+    """
+    Sucht eine CAS-Nummer im Index (binäre Suche).
+
+    Args:
+        index: Der Index aus load_cas_index.
+        cas: Die CAS-Nummer.
+
+    Returns:
+        tuple: (Liste der Listen, in denen die Nummer vorkommt, ZVG-Nummer oder None)
+    """
+    value = pack_cas(cas)
+    if value is None:
+        return [], None
+    values = index["values"]
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        return describe_entry(index, position)
+    return [], None
+
+
+def lookup_cas_bulk(index, cas_numbers):
+    """
+    Sucht viele CAS-Nummern auf einmal: die gepackten Nummern werden sortiert und in
+    einem einzigen Durchlauf mit dem Index abgeglichen.
+
+    Args:
+        index: Der Index aus load_cas_index.
+        cas_numbers: Liste von CAS-Nummern.
+
+    Returns:
+        dict: {CAS-Nummer: (Liste der Listen, ZVG-Nummer oder None)}
+    """
+    results = {}
+    packed = []
+    for cas in set(cas_numbers):
+        value = pack_cas(cas) if cas else None
+        if value is None:
+            results[cas] = ([], None)
+        else:
+            packed.append((value, cas))
+    packed.sort()
+
+    values = index["values"]
+    position = 0
+    for value, cas in packed:
+        position = bisect_left(values, value, position)
+        if position < len(values) and values[position] == value:
+            results[cas] = describe_entry(index, position)
+        else:
+            results[cas] = ([], None)
+    return results
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Sucht CAS-Nummern zu (englischen) Substanznamen bei commonchemistry.cas.org und chemicalbook.com.
+
+Die Ergebnisse werden in cache/cas_cache.json gespeichert (Suchbegriff -> CAS-Nummer,
+Quelle, Zeitpunkt). Gefundene Nummern bleiben gültig, erfolglose Suchen werden nach
+CAS_NOT_FOUND_TTL Sekunden wiederholt, Netzwerkfehler werden nicht gespeichert.
+Die Anfragen laufen über eine Session mit Verbindungspool und Wiederholungen bei
+vorübergehenden Fehlern, mehrere Namen werden parallel gesucht.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from helperfunctions import cache_path, load_json_cache, save_json_cache
+
+CAS_CACHE_FILE = cache_path("cas_cache.json")
+CAS_PATTERN = re.compile(r"(\d{2,8}-\d{2}-\d)")
+TABLE_PATTERN = re.compile(r"(<table.*?</table>)", re.DOTALL)
+
+# erfolglose Suchen werden nach 30 Tagen wiederholt
+CAS_NOT_FOUND_TTL = 30 * 24 * 3600
+
+MAX_WORKERS = 4
+TIMEOUT = 10
+
+CHEMICALBOOK_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Referer": "https://www.chemicalbook.com/"
+}
+
+# Zustand des aktuellen Laufs
+_cache = None
+_session = None
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+lookups = 0
+
+
+def get_session():
+    """
+    Liefert die gemeinsame Session mit Verbindungspool und Wiederholungsstrategie.
+    """
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=MAX_WORKERS)
+        _session = requests.Session()
+        _session.mount("https://", adapter)
+    return _session
+
+
+def get_cache():
+    """
+    Lädt den CAS-Cache (einmal pro Lauf).
+
+    Returns:
+        dict: {Suchbegriff: [CAS-Nummer ("" = nicht gefunden), Quelle, Zeitpunkt]}
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_json_cache(CAS_CACHE_FILE, {})
+    return _cache
+
+
+def get_cached(query, now):
+    """
+    Liefert die gespeicherte CAS-Nummer, falls das Ergebnis noch gültig ist.
+
+    Returns:
+        String (leer = nicht gefunden) oder None, wenn neu gesucht werden muss.
+    """
+    entry = get_cache().get(query)
+    if not entry:
+        return None
+    cas, source, checked = entry
+    if not cas and now - checked > CAS_NOT_FOUND_TTL:
+        return None
+    return cas
+
+
+def lookup_cas(query):
+    """
+    Sucht einen Namen erst bei Common Chemistry, dann bei chemicalbook.
+
+    Args:
+        query: Der (englische) Substanzname.
+
+    Returns:
+        tuple: (CAS-Nummer oder "", Quelle) oder None bei Fehlern.
+    """
+    session = get_session()
+
+    url = f"https://commonchemistry.cas.org/results?q={query}"
+    try:
+        response = session.get(url, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Fehler: {e} für {query} {url}")
+        return None
+    if response.status_code != 200:
+        print(f"Fehler: {response.status_code} für {query} {url}")
+        return None
+
+    match = CAS_PATTERN.search(response.text)
+    if match:
+        print(f"\"{query}\" : commonchemistry = {match.group(1)}")
+        return match.group(1), "commonchemistry"
+
+    url = f"https://www.chemicalbook.com/Search_EN.aspx?keyword={query}"
+    try:
+        response = session.get(url, headers=CHEMICALBOOK_HEADERS, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Fehler: {e} für {query} {url}")
+        return None
+    if response.status_code != 200:
+        print(f"Fehler: {response.status_code} für {query} {url}")
+        return None
+
+    match = TABLE_PATTERN.search(response.text)
+    if match:
+        match = CAS_PATTERN.search(match.group(1))
+        if match:
+            print(f"\"{query}\" : chemicalbook = {match.group(1)}")
+            return match.group(1), "chemicalbook"
+
+    return "", ""
+
+
+def find_cas_numbers(queries):
+    """
+    Sucht die CAS-Nummern mehrerer Namen, bekannte Ergebnisse kommen aus dem Cache.
+
+    Args:
+        queries: Liste von (englischen) Substanznamen.
+
+    Returns:
+        dict: {Suchbegriff: CAS-Nummer oder ""}
+    """
+    global cache_hits, lookups
+
+    now = time.time()
+    results = {}
+    missing = []
+    for query in dict.fromkeys(queries):
+        cached = get_cached(query, now)
+        if cached is None:
+            missing.append(query)
+        else:
+            cache_hits += 1
+            results[query] = cached
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            found = dict(zip(missing, executor.map(lookup_cas, missing)))
+        lookups += len(found)
+
+        cache = get_cache()
+        for query, result in found.items():
+            if result is None:
+                results[query] = ""
+                continue
+            cas, source = result
+            cache[query] = [cas, source, now]
+            results[query] = cas
+        save_json_cache(CAS_CACHE_FILE, cache)
+
+    return results
+
+
+def search_cas_number(query):
+    """
+    Sucht die CAS-Nummer eines einzelnen Namens (siehe find_cas_numbers).
+
+    Returns:
+        String: Gefundene CAS-Nummer oder leerer String.
+    """
+    return find_cas_numbers([query])[query]
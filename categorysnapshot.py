@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Lokaler Snapshot von Kategoriebäumen und deren Mitgliedern.
+
+Statt bei jedem Lauf den kompletten Baum (z.B. "Kategorie:Chemische Verbindung nach Element")
+rekursiv abzufragen, wird der Baum in einer JSON-Datei gespeichert. Bei jedem Lauf werden
+nur die Kategorieinformationen (Anzahl Mitglieder, touched) in Blöcken zu 50 Kategorien
+abgefragt und nur die Kategorien neu gelesen, bei denen sich etwas geändert hat.
+"""
+
+import time
+import pywikibot
+from pagecache import cached_pages
+from helperfunctions import api_query, batched, cache_path, load_json_cache, save_json_cache, human_readable_time_difference
+
+SNAPSHOT_FILE = cache_path("category_snapshot.json")
+
+# bereits geladene Snapshots: {Dateiname: Snapshot}
+_snapshots = {}
+
+# in diesem Lauf bereits abgeglichene Kategorien: {Dateiname: set(Kategorien)}
+_refreshed_categories = {}
+
+# von der API normalisierte Kategorietitel: {angefragter Titel: normalisierter Titel}
+_normalized_titles = {}
+
+
+def load_snapshot(snapshot_file=SNAPSHOT_FILE):
+    """
+    Lädt den Snapshot aus der Datei (einmal pro Lauf).
+
+    Args:
+        snapshot_file: Pfad der Snapshot-Datei.
+
+    Returns:
+        dict: {"categories": {Kategorie: {"touched", "pages", "subcats", "files", "subcategories", "members"}}}
+    """
+    if snapshot_file not in _snapshots:
+        _snapshots[snapshot_file] = load_json_cache(snapshot_file, {"categories": {}})
+        _refreshed_categories[snapshot_file] = set()
+    return _snapshots[snapshot_file]
+
+
+def get_category_infos(site, category_titles):
+    """
+    Fragt Anzahl der Mitglieder und touched-Zeitstempel für Kategorien ab (50 je Anfrage).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        category_titles: Liste von Kategorietiteln.
+
+    Returns:
+        tuple: ({Titel: {"touched", "pages", "subcats", "files"}}, {angefragter Titel: normalisierter Titel})
+    """
+    infos = {}
+    normalized = {}
+
+    for batch in batched(category_titles, 50):
+        for data in api_query(site, prop="categoryinfo|info", titles="|".join(batch)):
+            query = data.get("query", {})
+            for entry in query.get("normalized", []):
+                normalized[entry["from"]] = entry["to"]
+            for page in query.get("pages", []):
+                categoryinfo = page.get("categoryinfo", {})
+                infos[page["title"]] = {
+                    "touched": page.get("touched", ""),
+                    "pages": categoryinfo.get("pages", 0),
+                    "subcats": categoryinfo.get("subcats", 0),
+                    "files": categoryinfo.get("files", 0),
+                }
+
+    return infos, normalized
+
+
+def get_category_members(site, category_title):
+    """
+    Liest die direkten Mitglieder einer Kategorie samt Namensraum und Weiterleitungs-Flag.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        category_title: Titel der Kategorie.
+
+    Returns:
+        tuple: ({Seitentitel: [Namensraum, ist Weiterleitung]}, [Unterkategorien])
+    """
+    members = {}
+    subcategories = []
+
+    for data in api_query(site, generator="categorymembers", gcmtitle=category_title, gcmlimit="max", prop="info"):
+        for page in data.get("query", {}).get("pages", []):
+            if page["ns"] == 14:
+                subcategories.append(page["title"])
+            else:
+                members[page["title"]] = [page["ns"], bool(page.get("redirect", False))]
+
+    return members, sorted(subcategories)
+
+
+def refresh_snapshot(site, category_names, snapshot_file=SNAPSHOT_FILE):
+    """
+    Gleicht den Snapshot für die angegebenen Kategoriebäume mit der Wikipedia ab.
+    Kategorien, deren Anzahl oder touched-Zeitstempel sich nicht geändert hat, werden nicht neu gelesen.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        category_names: Liste der Wurzelkategorien.
+        snapshot_file: Pfad der Snapshot-Datei.
+
+    Returns:
+        list: Die normalisierten Titel der Wurzelkategorien.
+    """
+    start_time = time.time()
+    snapshot = load_snapshot(snapshot_file)
+    categories = snapshot["categories"]
+    refreshed = _refreshed_categories[snapshot_file]
+
+    level = list(category_names)
+    visited = set()
+    reused = 0
+    reloaded = 0
+
+    while level:
+        to_check = [title for title in level if _normalized_titles.get(title, title) not in refreshed]
+        infos, normalized = get_category_infos(site, to_check) if to_check else ({}, {})
+        _normalized_titles.update(normalized)
+
+        next_level = []
+        for title in level:
+            title = _normalized_titles.get(title, title)
+            if title in visited:
+                continue
+            visited.add(title)
+
+            if title not in refreshed:
+                info = infos.get(title, {"touched": "", "pages": 0, "subcats": 0, "files": 0})
+                entry = categories.get(title)
+                if entry and all(entry.get(key) == info[key] for key in ("touched", "pages", "subcats", "files")):
+                    reused += 1
+                else:
+                    members, subcategories = get_category_members(site, title)
+                    entry = dict(info, members=members, subcategories=subcategories)
+                    categories[title] = entry
+                    reloaded += 1
+                refreshed.add(title)
+
+            next_level.extend(sub for sub in categories[title]["subcategories"] if sub not in visited)
+
+        level = next_level
+
+    if reloaded:
+        save_json_cache(snapshot_file, snapshot)
+
+    print(f"Kategorie-Snapshot: {reloaded} Kategorien neu gelesen, {reused} unverändert ({human_readable_time_difference(start_time, time.time())})")
+    return [_normalized_titles.get(title, title) for title in category_names]
+
+
+def collect_members(category_names, snapshot_file=SNAPSHOT_FILE):
+    """
+    Sammelt alle Mitglieder der Kategoriebäume aus dem Snapshot (ohne Abfrage).
+
+    Args:
+        category_names: Liste der normalisierten Wurzelkategorien.
+        snapshot_file: Pfad der Snapshot-Datei.
+
+    Returns:
+        dict: {Seitentitel: [Namensraum, ist Weiterleitung]}
+    """
+    categories = load_snapshot(snapshot_file)["categories"]
+    members = {}
+    visited = set()
+    stack = list(category_names)
+
+    while stack:
+        title = stack.pop()
+        if title in visited or title not in categories:
+            continue
+        visited.add(title)
+        members.update(categories[title]["members"])
+        stack.extend(categories[title]["subcategories"])
+
+    return members
+
+
+def get_category_titles(site, category_names, exclusion_category_names=(), special_excludes=(), namespaces=(0,), snapshot_file=SNAPSHOT_FILE):
+    """
+    Liefert alle Seiten der Kategoriebäume ohne Weiterleitungen, ohne Duplikate
+    und ohne die Seiten der Ausschlusskategorien.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        category_names: Liste der Zielkategorien.
+        exclusion_category_names: Liste der Kategorien, deren Seiten abgezogen werden.
+        special_excludes: Einzelne Seitentitel, die ausgelassen werden.
+        namespaces: Erlaubte Namensräume.
+        snapshot_file: Pfad der Snapshot-Datei.
+
+    Returns:
+        list: Sortierte Liste der Seitentitel.
+    """
+    roots = refresh_snapshot(site, category_names, snapshot_file)
+    members = collect_members(roots, snapshot_file)
+
+    exclusion_titles = set()
+    if exclusion_category_names:
+        exclusion_roots = refresh_snapshot(site, exclusion_category_names, snapshot_file)
+        exclusion_titles = set(collect_members(exclusion_roots, snapshot_file))
+
+    excluded = exclusion_titles | set(special_excludes)
+    titles = sorted(
+        title
+        for title, (ns, is_redirect) in members.items()
+        if ns in namespaces and not is_redirect and title not in excluded
+    )
+
+    print(f"{len(titles)} Seiten in {', '.join(category_names)} (ohne Ausschlusskategorien)")
+    return titles
+
+
+def pages_from_titles(site, titles, content=True):
+    """
+    Erzeugt pywikibot.Page-Objekte für Titel, bei content=True mit in Blöcken vorgeladenem Text
+    (unveränderte Seiten aus dem lokalen Seiten-Cache).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+        content: Seitentext vorladen.
+
+    Returns:
+        Ein Generator für Seiten.
+    """
+    if content:
+        return cached_pages(site, titles)
+    return (pywikibot.Page(site, title) for title in titles)
+
+
+def get_category_pages(site, category_names, exclusion_category_names=(), special_excludes=(), content=True, snapshot_file=SNAPSHOT_FILE):
+    """
+    Wie get_category_titles, liefert aber pywikibot.Page-Objekte.
+
+    Returns:
+        Ein Generator für Seiten in den Kategorien und deren Unterkategorien.
+    """
+    titles = get_category_titles(site, category_names, exclusion_category_names, special_excludes, snapshot_file=snapshot_file)
+    return pages_from_titles(site, titles, content)
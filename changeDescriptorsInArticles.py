@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import pywikibot
-from pywikibot import pagegenerators
 import re
-import itertools
 import time
+from categorysnapshot import get_category_pages, get_category_titles
+from dumpreader import dump_candidate_pages
+import argparse
 import traceback
 
 # Fix UnicodeEncodeError: 'charmap' codec can't encode characters
@@ -17,15 +18,17 @@ pages_checked = 0
 pages_changed = 0
 
 
-def change_text_of_page(page):
+def italicize_descriptors(page_title, text):
     """
-    Adds text to the end of a Wikipedia page.
+    Changes chemical descriptors in the text of a page to italic.
 
     Args:
-        page: The Wikipedia page to which text is to be added.
+        page_title: The title of the page (for messages).
+        text: The wikitext of the page.
+
+    Returns:
+        The changed wikitext (unchanged if nothing was found).
     """
-    page_title = page.title()
-    text = page.get()
     new_text = text
     
     # Text in Zeilen aufteilen
@@ -125,74 +128,46 @@ def change_text_of_page(page):
             print(page_title + ": " + line + " ->\n " + new_line + "\n\n")
             new_text = new_text.replace(line, new_line)
 
-    if (new_text != text):
-        # print(page_title)
-        page.text = new_text
-        page.save(summary="ChemoBot: Kursivschreibung von Descriptoren", minor=True)
-        global pages_changed
-        pages_changed = pages_changed + 1            
-
-    
-def get_pages_in_category(category_name, site):
-    """
-    Retrieves all pages in a given category and its subcategories.
+    return new_text
 
-    Args:
-        category_name: The name of the category.
-        site: The pywikibot.Site object representing the Wikipedia site.
-
-    Returns:
-        A set of pages in the category and its subcategories.
-    """
-    category = pywikibot.Category(site, category_name)
-    return pagegenerators.CategorizedPageGenerator(category, recurse=True)
 
-def filter_pages(target_pages_gen, exclusion_pages_gen):
+def change_text_of_page(page):
     """
-    Filters pages that are in target_pages but not in exclusion_pages.
+    Changes chemical descriptors of a Wikipedia page to italic and saves the page.
 
     Args:
-        target_pages_gen: A generator for pages in the target category.
-        exclusion_pages_gen: A generator for pages in the exclusion category.
-
-    Yields:
-        Pages that are in target_pages_gen but not in exclusion_pages_gen.
+        page: The Wikipedia page to be changed.
     """
-    
-    special_excludes = ['Isopulegole']
-    
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
+    page_title = page.title()
+    text = page.text
+    new_text = italicize_descriptors(page_title, text)
 
-    for page in target_pages_gen:
-        title = page.title()
-        if title not in exclusion_titles and not page.isRedirectPage() and (title not in special_excludes):
-            yield page
+    if (new_text != text):
+        # print(page_title)
+        page.text = new_text
+        page.save(summary="ChemoBot: Kursivschreibung von Descriptoren", minor=True)
+        global pages_changed
+        pages_changed = pages_changed + 1            
 
-def process_category(category_names, exclusion_category_names, site):
+    
+def process_category(category_names, exclusion_category_names, site, dump_file=None):
     """
     Adds text to all pages in a category and its subcategories.
 
     Args:
         category_name: The name of the category to process.
         site: The pywikibot.Site object representing the Wikipedia site.
+        dump_file: Optional XML dump, only pages with hits in the dump are loaded live.
     """
-    target_pages = []
-    # Get all pages in the exclusion category and its subcategories
-    for inclusion_category_name in category_names:
-        print(f"get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion category and its subcategories
-    print("get pages in exclusion category")
-    
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site))
+    special_excludes = ['Isopulegole']
 
-    # Subtract exclusion pages from target pages
-    print("filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    if dump_file:
+        # Check the dump texts offline, the hits are checked again with the live text
+        titles = get_category_titles(site, category_names, exclusion_category_names, special_excludes)
+        filtered_pages = dump_candidate_pages(site, dump_file, titles, lambda title, text: italicize_descriptors(title, text) != text)
+    else:
+        # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+        filtered_pages = get_category_pages(site, category_names, exclusion_category_names, special_excludes)
 
     print("process pages")
     for page in filtered_pages:
@@ -238,6 +213,13 @@ def human_readable_time_difference(start_time, end_time):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kursivschreibung von Deskriptoren")
+    parser.add_argument(
+        "--dump",
+        help="XML-Dump (z.B. dewiki-latest-pages-articles.xml.bz2) offline prüfen, nur Treffer werden live geladen"
+    )
+    args = parser.parse_args()
+
     zeitanfang = time.time()
     site = pywikibot.Site('de', 'wikipedia')  
 
@@ -252,6 +234,6 @@ if __name__ == "__main__":
     category_names = ["Kategorie:Chemische Verbindung nach Element", "Kategorie:Chemische Verbindung nach Strukturelement"]  
     exclusion_category_names = ["Kategorie:Mineral", "Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe"]
 
-    process_category(category_names, exclusion_category_names, site)
+    process_category(category_names, exclusion_category_names, site, args.dump)
     print(f"\npages_checked = {pages_checked}, pages_changed = {pages_changed}")
     print("\nLaufzeit: ",human_readable_time_difference(zeitanfang, time.time()))
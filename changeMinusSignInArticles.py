@@ -2,10 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import pywikibot
-from pywikibot import pagegenerators
 import re
-import itertools
 import time
+from categorysnapshot import get_category_pages
 
 # Fix UnicodeEncodeError: 'charmap' codec can't encode characters
 import sys
@@ -16,15 +15,18 @@ pages_checked = 0
 pages_changed = 0
 
 
-def change_text_of_page(page):
+def find_minus_signs(page_title, text):
     """
-    Adds text to the end of a Wikipedia page.
+    Searches lines with a normal minus sign in isomer names "(-)".
 
     Args:
-        page: The Wikipedia page to which text is to be added.
+        page_title: The title of the page.
+        text: The wikitext of the page.
+
+    Returns:
+        A list of (line number, line) tuples with findings.
     """
-    page_title = page.title()
-    text = page.get()
+    findings = []
     # Text in Zeilen aufteilen
     lines = text.splitlines()
 
@@ -49,55 +51,34 @@ def change_text_of_page(page):
                 if first_brace_pos > match_end:  # Wenn '}}' nach dem Match existiert
                     continue
            
-            global pages_changed
             if '[[Datei:' in before_match and '|' in after_match:
                 # Letztes Auftreten von '[[Datei:' vor dem Match und erstes Auftreten von '|' nach dem Match suchen
                 last_datei_pos = before_match.rfind('[[Datei:')
                 first_pipe_pos = after_match.find('|') + match_end  # relative Position korrigieren
                 
                 if not (last_datei_pos > match_start and first_pipe_pos > match_end):
-                    print(f"Gefunden in Zeile {line_number} of {page_title}: '{line.strip()}'")
-                    pages_changed = pages_changed + 1
+                    findings.append((line_number, line))
             else:
-                print(f"Gefunden in Zeile {line_number} of {page_title}: '{line.strip()}'")
-                pages_changed = pages_changed + 1
+                findings.append((line_number, line))
 
-            
-    
-def get_pages_in_category(category_name, site):
-    """
-    Retrieves all pages in a given category and its subcategories.
+    return findings
 
-    Args:
-        category_name: The name of the category.
-        site: The pywikibot.Site object representing the Wikipedia site.
-
-    Returns:
-        A set of pages in the category and its subcategories.
-    """
-    category = pywikibot.Category(site, category_name)
-    return pagegenerators.CategorizedPageGenerator(category, recurse=True)
 
-def filter_pages(target_pages_gen, exclusion_pages_gen):
+def change_text_of_page(page):
     """
-    Filters pages that are in target_pages but not in exclusion_pages.
+    Lists the lines of a Wikipedia page with a normal minus sign in isomer names.
 
     Args:
-        target_pages_gen: A generator for pages in the target category.
-        exclusion_pages_gen: A generator for pages in the exclusion category.
-
-    Yields:
-        Pages that are in target_pages_gen but not in exclusion_pages_gen.
+        page: The Wikipedia page to be checked.
     """
-    
-    special_excludes = []
-    
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
+    global pages_changed
+    page_title = page.title()
+    text = page.text
+
+    for line_number, line in find_minus_signs(page_title, text):
+        print(f"Gefunden in Zeile {line_number} of {page_title}: '{line.strip()}'")
+        pages_changed = pages_changed + 1
 
-    for page in target_pages_gen:
-        title = page.title()
-        if title not in exclusion_titles and not page.isRedirectPage() and (title not in special_excludes):
-            yield page
 
 def process_category(category_names, exclusion_category_names, site):
     """
@@ -107,23 +88,10 @@ def process_category(category_names, exclusion_category_names, site):
         category_name: The name of the category to process.
         site: The pywikibot.Site object representing the Wikipedia site.
     """
-    target_pages = []
-    # Get all pages in the exclusion category and its subcategories
-    for inclusion_category_name in category_names:
-        print(f"get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion category and its subcategories
-    print("get pages in exclusion category")
-    
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site))
-
-    # Subtract exclusion pages from target pages
-    print("filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    special_excludes = []
+
+    # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+    filtered_pages = get_category_pages(site, category_names, exclusion_category_names, special_excludes)
 
     print("process pages")
     for page in filtered_pages:
@@ -1,12 +1,15 @@
 import aiohttp
 import asyncio
+import codecs
+import collections
 import csv
 import re
 import pywikibot
-from pywikibot import pagegenerators
-import itertools
 import time
-from helperfunctions import human_readable_time_difference
+from helperfunctions import human_readable_time_difference, cache_path, load_json_cache, save_json_cache, load_pickle_cache, save_pickle_cache
+from categorysnapshot import get_category_pages, get_category_titles
+from dumpreader import dump_candidate_pages
+import argparse
 import traceback
 
 pages_checked = 0
@@ -23,29 +26,51 @@ URL = (
 CHUNK_SIZE = 1024 * 64
 MAX_RETRIES = 10
 
+# lokale Kopie der ausgewerteten Spalten und Metadaten des Datensatzes
+RETRACTION_DATA_FILE = cache_path("retraction_watch.pickle")
+RETRACTION_META_FILE = cache_path("retraction_watch_meta.json")
+RETRACTION_FIELDS = ("retraction_doi", "original_doi", "retraction_pmid", "original_pmid")
+
 
 # --------------------------------------------------
 # Robust streaming reader with resume
 # --------------------------------------------------
-async def stream_with_resume(session, url):
+async def stream_with_resume(session, url, request_headers=None, response_info=None):
+    """
+    Liest die Datei in Blöcken und setzt nach Verbindungsabbrüchen fort.
+
+    request_headers (z.B. If-None-Match) werden nur bei der ersten Anfrage gesendet.
+    In response_info werden ETag, Last-Modified und bei HTTP 304 "not_modified" abgelegt,
+    in diesem Fall werden keine Daten geliefert.
+    """
 
     downloaded = 0
     total = None
     retries = 0
+    if response_info is None:
+        response_info = {}
 
     while True:
         headers = {}
         if downloaded:
             headers["Range"] = f"bytes={downloaded}-"
             print(f"\nReconnect bei Byte {downloaded}")
+        elif request_headers:
+            headers.update(request_headers)
 
         try:
             async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    response_info["not_modified"] = True
+                    return
+
                 response.raise_for_status()
 
                 if total is None:
                     total = response.content_length
                     print("Gesamtgröße:", total or "unbekannt")
+                    response_info["etag"] = response.headers.get("ETag", "")
+                    response_info["last_modified"] = response.headers.get("Last-Modified", "")
 
                 async for chunk in response.content.iter_chunked(CHUNK_SIZE):
                     downloaded += len(chunk)
@@ -71,97 +96,181 @@ async def stream_with_resume(session, url):
 # --------------------------------------------------
 # CSV Parsing während Stream
 # --------------------------------------------------
-async def download_and_parse_csv(url):
+IDENTIFIER_COLUMNS = ("RetractionDOI", "OriginalPaperDOI", "RetractionPubMedID", "OriginalPaperPubMedID")
 
-    retraction_doi = []
-    original_doi = []
-    retraction_pmid = []
-    original_pmid = []
 
-    timeout = aiohttp.ClientTimeout(total=None)
+def create_identifier_parser():
+    """
+    Erzeugt den Zustand für das blockweise Einlesen der CSV-Datei.
 
-    async with aiohttp.ClientSession(timeout=timeout) as session:
+    Die Bytes laufen durch einen inkrementellen Decoder (Mehrbyte-Zeichen an Blockgrenzen
+    bleiben erhalten), die Zeilen werden an einen einzigen csv.reader übergeben, sobald
+    ein Datensatz vollständig ist (gerade Anzahl Anführungszeichen, so dass auch
+    Zeilenumbrüche in Feldern funktionieren). Nur die vier Kennungsspalten werden ausgewertet.
+    """
+    pending = collections.deque()
+    return {
+        "decoder": codecs.getincrementaldecoder("utf-8")(errors="ignore"),
+        "buffer": "",
+        "pending": pending,
+        "reader": csv.reader(iter(pending.popleft, None)),
+        "quotes": 0,
+        "columns": None,
+        "rows": 0,
+        "identifiers": ([], [], [], []),
+    }
 
-        buffer = ""
-        header = None
 
-        async for chunk in stream_with_resume(session, url):
+def handle_identifier_row(parser, row):
+    """
+    Übernimmt die Kennungen eines Datensatzes (die erste Zeile ist die Kopfzeile).
+    """
+    if not row:
+        return
+
+    if parser["columns"] is None:
+        parser["columns"] = [row.index(name) if name in row else None for name in IDENTIFIER_COLUMNS]
+        return
+
+    parser["rows"] += 1
+    retraction_doi, original_doi, retraction_pmid, original_pmid = parser["identifiers"]
+    r_doi_index, o_doi_index, r_pmid_index, o_pmid_index = parser["columns"]
+    size = len(row)
+
+    if r_doi_index is not None and r_doi_index < size:
+        doi = normalize_doi(row[r_doi_index].strip())
+        if len(doi) > 12:
+            retraction_doi.append(doi)
+    if o_doi_index is not None and o_doi_index < size:
+        doi = normalize_doi(row[o_doi_index].strip())
+        if len(doi) > 12:
+            original_doi.append(doi)
+    if r_pmid_index is not None and r_pmid_index < size:
+        pmid = row[r_pmid_index].strip()
+        if len(pmid) > 5:
+            retraction_pmid.append(pmid)
+    if o_pmid_index is not None and o_pmid_index < size:
+        pmid = row[o_pmid_index].strip()
+        if len(pmid) > 5:
+            original_pmid.append(pmid)
+
+
+def feed_identifier_parser(parser, chunk, final=False):
+    """
+    Verarbeitet einen Block der Datei, mit final=True wird der Rest am Dateiende verarbeitet.
+    """
+    lines = (parser["buffer"] + parser["decoder"].decode(chunk, final)).split("\n")
+    parser["buffer"] = lines.pop()
+    if final and parser["buffer"]:
+        # letzte Zeile ohne abschließenden Zeilenumbruch
+        lines.append(parser["buffer"])
+        parser["buffer"] = ""
+
+    pending = parser["pending"]
+    reader = parser["reader"]
+
+    for line in lines:
+        pending.append(line + "\n")
+        parser["quotes"] += line.count('"')
+        if parser["quotes"] % 2:
+            # Feld mit Zeilenumbruch, Datensatz geht in der nächsten Zeile weiter
+            continue
+        parser["quotes"] = 0
+        try:
+            while pending:
+                handle_identifier_row(parser, next(reader))
+        except IndexError:
+            print(f"\nUnvollständiger Datensatz nach Zeile {parser['rows']} verworfen")
+            pending.clear()
 
-            text = chunk.decode("utf-8", errors="ignore")
-            buffer += text
+    if final and pending:
+        print("\nDatei endet in einem Feld mit Anführungszeichen, Rest verworfen")
+        pending.clear()
 
-            lines = buffer.split("\n")
-            buffer = lines.pop()
 
-            for line in lines:
-                if not line.strip():
-                    continue
+async def download_and_parse_csv(url, request_headers=None, response_info=None):
 
-                if header is None:
-                    header = next(csv.reader([line]))
-                    continue
+    timeout = aiohttp.ClientTimeout(total=None)
+    parser = create_identifier_parser()
 
-                row = next(csv.reader([line]))
-                data = dict(zip(header, row))
+    async with aiohttp.ClientSession(timeout=timeout) as session:
 
-                doi = normalize_doi(data.get("RetractionDOI", "").strip())
-                if doi and len(doi)>12: 
-                    retraction_doi.append(doi)
-                doi = normalize_doi(data.get("OriginalPaperDOI", "").strip())
-                if doi and len(doi)>12: 
-                    original_doi.append(doi)
-                pmid = data.get("RetractionPubMedID", "").strip()
-                if pmid and len(pmid) > 5:
-                    retraction_pmid.append(pmid)
-                pmid = data.get("OriginalPaperPubMedID", "").strip()
-                if pmid and len(pmid) > 5:
-                    original_pmid.append(pmid)
+        async for chunk in stream_with_resume(session, url, request_headers, response_info):
+            feed_identifier_parser(parser, chunk)
 
-    print("\nDownload fertig")
+    if response_info is not None and response_info.get("not_modified"):
+        return None
 
-    return retraction_doi, original_doi, retraction_pmid, original_pmid
+    feed_identifier_parser(parser, b"", final=True)
 
+    print("\nDownload fertig")
+    if response_info is not None:
+        response_info["rows"] = parser["rows"]
 
-def get_pages_in_category(category_name, site):
-    """
-    Retrieves all pages in a given category and its subcategories.
+    return parser["identifiers"]
 
-    Args:
-        category_name: The name of the category.
-        site: The pywikibot.Site object representing the Wikipedia site.
 
-    Returns:
-        A set of pages in the category and its subcategories.
-    """
-    category = pywikibot.Category(site, category_name)
-    return pagegenerators.CategorizedPageGenerator(category, recurse=True)
-
-def filter_pages(target_pages_gen, exclusion_pages_gen):
-    """
-    Filters pages that are in target_pages but not in exclusion_pages
-    and prevents duplicate pages.
+# --------------------------------------------------
+# Lokale Kopie des Datensatzes
+# --------------------------------------------------
+async def load_retraction_data(url, data_file=RETRACTION_DATA_FILE, meta_file=RETRACTION_META_FILE):
     """
+    Liefert die DOI/PubMedID-Mengen des Retraction-Watch-Datensatzes.
 
-    special_excludes = {''}
+    Die Datei wird nur heruntergeladen, wenn sie sich laut ETag/Last-Modified geändert hat,
+    sonst werden die Mengen aus der lokalen Kopie geladen. Bei einer neuen Version werden
+    Version, Zeilenzahl und die Anzahl neu hinzugekommener Einträge gespeichert.
 
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
-
-    seen_titles = set()   # <-- HIER passiert die Magie
-
-    for page in target_pages_gen:
-        title = page.title()
-
-        if title in seen_titles:
-            continue  # Duplikat → überspringen
-
-        seen_titles.add(title)
+    Rückgabe:
+        tuple mit vier frozensets (retraction_doi, original_doi, retraction_pmid, original_pmid)
+    """
+    meta = load_json_cache(meta_file, {})
+    cached = load_pickle_cache(data_file, None)
+
+    request_headers = {}
+    if cached is not None:
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response_info = {}
+    try:
+        result = await download_and_parse_csv(url, request_headers, response_info)
+    except Exception as e:
+        if cached is None:
+            raise
+        traceback.print_exc()
+        print(f"Download fehlgeschlagen, verwende lokale Kopie (Version {meta.get('version')} vom {meta.get('downloaded')}): {e}")
+        result = None
+
+    if result is None:
+        if response_info.get("not_modified"):
+            print(f"Datensatz unverändert (Version {meta.get('version')} vom {meta.get('downloaded')}, {meta.get('rows')} Zeilen)")
+        return tuple(cached[field] for field in RETRACTION_FIELDS)
+
+    data = {field: frozenset(values) for field, values in zip(RETRACTION_FIELDS, result)}
+
+    # neu hinzugekommene Einträge seit der letzten Version
+    new_entries = {}
+    if cached is not None:
+        new_entries = {field: len(data[field] - cached[field]) for field in RETRACTION_FIELDS}
+        print("Neue Einträge seit der letzten Version: " + ", ".join(f"{field} = {count}" for field, count in new_entries.items()))
+
+    save_pickle_cache(data_file, data)
+    meta = {
+        "version": meta.get("version", 0) + 1,
+        "etag": response_info.get("etag", ""),
+        "last_modified": response_info.get("last_modified", ""),
+        "downloaded": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "rows": response_info.get("rows", 0),
+        "counts": {field: len(data[field]) for field in RETRACTION_FIELDS},
+        "new_entries": new_entries,
+    }
+    save_json_cache(meta_file, meta)
+    print(f"Datensatz Version {meta['version']} gespeichert ({meta['rows']} Zeilen)")
 
-        if (
-            title not in exclusion_titles
-            and not page.isRedirectPage()
-            and title not in special_excludes
-        ):
-            yield page
+    return tuple(data[field] for field in RETRACTION_FIELDS)
 
 
 # --------------------------------------------------
@@ -177,18 +286,109 @@ def normalize_doi(x):
     return x
 
 
+# --------------------------------------------------
+# Index der Kennungen
+# --------------------------------------------------
+DOI_START = "10."
+# PubMed-IDs, die nur aus Wortzeichen bestehen, entsprechen genau einem Wort im Text
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def create_doi_matcher(doi_list):
+    """
+    Baut die Suchstruktur für DOIs auf: ein Set und die vorkommenden Längen.
+    Eine DOI kommt genau dann als Teilstring vor, wenn der Text an einer Stelle,
+    an der "10." steht, mit ihr beginnt, deshalb reichen Set-Abfragen an diesen Stellen.
+    """
+    dois = set()
+    other = []
+    for doi in doi_list:
+        if doi.startswith(DOI_START):
+            dois.add(doi)
+        else:
+            other.append(doi)
+    return {
+        "dois": dois,
+        "lengths": sorted({len(doi) for doi in dois}),
+        "other": sorted(set(other)),
+    }
+
+
+def create_pmid_matcher(pmid_list):
+    """
+    Baut die Suchstruktur für PubMed-IDs auf: ein Set für reine Wort-Kennungen
+    und vorkompilierte Muster für die übrigen (z.B. mit Punkt).
+    """
+    tokens = set()
+    other = []
+    for pmid in set(str(pmid) for pmid in pmid_list):
+        if WORD_PATTERN.fullmatch(pmid):
+            tokens.add(pmid)
+        else:
+            other.append((pmid, re.compile(rf"\b{re.escape(pmid)}\b")))
+    return {"tokens": tokens, "other": other}
+
+
+def create_retraction_index(retraction_doi, original_doi, retraction_pmid, original_pmid):
+    """
+    Baut einmal pro Lauf die Suchstrukturen für alle vier Listen auf.
+
+    Rückgabe:
+        dict mit den Suchstrukturen je Liste
+    """
+    index = {
+        "retraction_doi": create_doi_matcher(retraction_doi),
+        "original_doi": create_doi_matcher(original_doi),
+        "retraction_pmid": create_pmid_matcher(retraction_pmid),
+        "original_pmid": create_pmid_matcher(original_pmid),
+    }
+    print(f"Suchindex: {len(index['retraction_doi']['dois'])} Retraction DOIs, {len(index['original_doi']['dois'])} Original DOIs, "
+          f"{len(index['retraction_pmid']['tokens'])} Retraction PubMedIDs, {len(index['original_pmid']['tokens'])} Original PubMedIDs")
+    return index
+
+
+def find_doi_matches(doi_matcher, reference_blob, doi_positions):
+    """
+    Liefert alle DOIs der Liste, die als Teilstring im Referenztext vorkommen.
+    """
+    matches = set()
+    dois = doi_matcher["dois"]
+    lengths = doi_matcher["lengths"]
+
+    for position in doi_positions:
+        for length in lengths:
+            candidate = reference_blob[position:position + length]
+            if len(candidate) < length:
+                break
+            if candidate in dois:
+                matches.add(candidate)
+
+    for doi in doi_matcher["other"]:
+        if doi in reference_blob:
+            matches.add(doi)
+
+    return matches
+
+
+def find_pmid_matches(pmid_matcher, reference_blob, words):
+    """
+    Liefert alle PubMed-IDs der Liste, die als ganzes Wort im Referenztext vorkommen.
+    """
+    matches = pmid_matcher["tokens"] & words
+    for pmid, pattern in pmid_matcher["other"]:
+        if pattern.search(reference_blob):
+            matches.add(pmid)
+    return matches
+
+
 # --------------------------------------------------
 # Hauptfunktion
 # --------------------------------------------------
-def find_retracted_in_references(
-    references,
-    retraction_doi,
-    original_doi,
-    retraction_pmid,
-    original_pmid
-):
+def find_retracted_in_references(references, retraction_index):
     """
     Prüft ob DOI oder PubMedID als Teilstring in references vorkommen.
+    Statt jede Kennung einzeln zu suchen, werden die möglichen DOI-Anfänge und die Wörter
+    des Textes einmal bestimmt und mit den Sets aus create_retraction_index verglichen.
 
     Rückgabe:
         dict mit Treffer-Sets
@@ -197,32 +397,21 @@ def find_retracted_in_references(
     # ---------- Referenzen vorbereiten ----------
     reference_blob = normalize_doi("\n".join(references))
 
-    # ---------- DOI Treffer ----------
-    def find_doi_matches(doi_list):
-        matches = set()
-
-        for doi in doi_list:
-            if doi in reference_blob:
-                matches.add(doi)
+    # ---------- mögliche DOI-Anfänge und Wörter ----------
+    doi_positions = []
+    position = reference_blob.find(DOI_START)
+    while position != -1:
+        doi_positions.append(position)
+        position = reference_blob.find(DOI_START, position + 1)
 
-        return matches
-
-    # ---------- PubMed Treffer ----------
-    # Wortgrenzen verhindern Teiltreffer (z.B. 123 in 12345)
-    def find_pmid_matches(pmid_list):
-        matches = set()
-        for pmid in pmid_list:
-            pattern = rf"\b{re.escape(str(pmid))}\b"
-            if re.search(pattern, reference_blob):
-                matches.add(pmid)
-        return matches
+    words = set(WORD_PATTERN.findall(reference_blob))
 
     # ---------- Ergebnis ----------
     result = {
-        "retraction_doi": find_doi_matches(retraction_doi),
-        "original_doi": find_doi_matches(original_doi),
-        "retraction_pmid": find_pmid_matches(retraction_pmid),
-        "original_pmid": find_pmid_matches(original_pmid),
+        "retraction_doi": find_doi_matches(retraction_index["retraction_doi"], reference_blob, doi_positions),
+        "original_doi": find_doi_matches(retraction_index["original_doi"], reference_blob, doi_positions),
+        "retraction_pmid": find_pmid_matches(retraction_index["retraction_pmid"], reference_blob, words),
+        "original_pmid": find_pmid_matches(retraction_index["original_pmid"], reference_blob, words),
     }
 
     result["any_match"] = any(result.values())
@@ -241,7 +430,7 @@ def extract_references(wikitext):
     )
     return references
 
-def process_category(category_names, exclusion_category_names, r_doi, o_doi, r_pmid, o_pmid, site):
+def process_category(category_names, exclusion_category_names, r_doi, o_doi, r_pmid, o_pmid, site, dump_file=None):
     """
     Processes all pages in the specified category and checks for external links in references.
 
@@ -250,23 +439,17 @@ def process_category(category_names, exclusion_category_names, r_doi, o_doi, r_p
         exclusion_category_names: List of category names to exclude.
         external_links: Set of external links to check.
         site: The pywikibot.Site object representing the Wikipedia site.
+        dump_file: Optional XML dump, only pages with hits in the dump are loaded live.
     """
-    target_pages = []
-    # Get all pages in the inclusion categories
-    for inclusion_category_name in category_names:
-        print(f"Get pages in category {inclusion_category_name}")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    # Get all pages in the exclusion categories
-    print("Get pages in exclusion categories")
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"Exclude pages from {exclusion_category_name}")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site))
-
-    # Subtract exclusion pages from target pages
-    print("Filter out exclusion category pages from category pages")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    retraction_index = create_retraction_index(r_doi, o_doi, r_pmid, o_pmid)
+
+    if dump_file:
+        # Check the references in the dump offline, the hits are checked again with the live text
+        titles = get_category_titles(site, category_names, exclusion_category_names)
+        filtered_pages = dump_candidate_pages(site, dump_file, titles, lambda title, text: find_retracted_in_references(extract_references(text), retraction_index)["any_match"])
+    else:
+        # Get all pages of the categories from the local category snapshot (without exclusion category pages and redirects)
+        filtered_pages = get_category_pages(site, category_names, exclusion_category_names)
 
     start_time = time.time()  # Startzeit der Schleife
     interval = 60  # Intervall in Sekunden
@@ -289,7 +472,7 @@ def process_category(category_names, exclusion_category_names, r_doi, o_doi, r_p
                 # Extrahiere Referenzen aus dem Wikitext
                 references = extract_references(page_text)                    
                 
-                result = find_retracted_in_references(references, r_doi, o_doi, r_pmid, o_pmid)
+                result = find_retracted_in_references(references, retraction_index)
                 
                 if result and result["any_match"]:
                     print(f"Seite: {page.title()} -> {result}")
@@ -305,8 +488,8 @@ def process_category(category_names, exclusion_category_names, r_doi, o_doi, r_p
 
 
 # --------------------------------------------------
-async def main(site):
-    r_doi, o_doi, r_pmid, o_pmid = await download_and_parse_csv(URL)
+async def main(site, dump_file=None):
+    r_doi, o_doi, r_pmid, o_pmid = await load_retraction_data(URL)
     
     print("\nErgebnis:")
     print("Retraction DOI:", len(r_doi))
@@ -316,19 +499,19 @@ async def main(site):
 
     # optional: Listen selbst ausgeben
     print("\nBeispielwerte:")
-    print("RetractionDOI:", r_doi[:5])
-    print("OriginalPaperDOI:", o_doi[:5])
-    print("RetractionPubMedID:", r_pmid[:5])
-    print("OriginalPaperPubMedID:", o_pmid[:5])
+    print("RetractionDOI:", sorted(r_doi)[:5])
+    print("OriginalPaperDOI:", sorted(o_doi)[:5])
+    print("RetractionPubMedID:", sorted(r_pmid)[:5])
+    print("OriginalPaperPubMedID:", sorted(o_pmid)[:5])
 
     #references = ["Smith et al. (2020) https://doi.org/10.3892/ol.2024.14676", "Smith et al. (2022) PMID 39345721"];
-    #testresult = find_retracted_in_references(references, r_doi, o_doi, r_pmid, o_pmid)
+    #testresult = find_retracted_in_references(references, create_retraction_index(r_doi, o_doi, r_pmid, o_pmid))
     #print(f"testresult = {testresult}")
     #exit(0)
 
     #page = pywikibot.Page(site, "Aliskiren")
     #references = extract_references(page.text)                    
-    #testresult = find_retracted_in_references(references, r_doi, o_doi, r_pmid, o_pmid)
+    #testresult = find_retracted_in_references(references, create_retraction_index(r_doi, o_doi, r_pmid, o_pmid))
     #print(f"testresult = {testresult}")
     #exit(0)
 
@@ -336,14 +519,21 @@ async def main(site):
     category_names = ["Kategorie:Chemische Verbindung nach Element", "Kategorie:Chemische Verbindung nach Strukturelement"]
     exclusion_category_names = ["Kategorie:Mineral"]
     
-    process_category(category_names, exclusion_category_names, r_doi, o_doi, r_pmid, o_pmid, site)
+    process_category(category_names, exclusion_category_names, r_doi, o_doi, r_pmid, o_pmid, site, dump_file)
     
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Prüfung auf zurückgezogene Publikationen")
+    parser.add_argument(
+        "--dump",
+        help="XML-Dump (z.B. dewiki-latest-pages-articles.xml.bz2) offline prüfen, nur Treffer werden live geladen"
+    )
+    args = parser.parse_args()
+
     zeitanfang = time.time()
     site = pywikibot.Site('de', 'wikipedia')  # Stelle sicher, dass du 'de' und 'wikipedia' korrekt konfigurierst
 
-    asyncio.run(main(site))
+    asyncio.run(main(site, args.dump))
 
     print(f"\npages_checked = {pages_checked}, pages_found = {pages_found}")
     print("\nLaufzeit: ", human_readable_time_difference(zeitanfang, time.time()))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Checkpoint-Journal für lange Läufe, die viele Einträge nacheinander anreichern.
+
+Jeder fertige Eintrag wird als JSON-Zeile an cache/checkpoint_<Name>.jsonl angehängt und
+sofort auf die Platte geschrieben. Die erste Zeile enthält die "Generation", einen
+Hash über alle Einträge des Laufs. Mit resume=True werden die Ergebnisse eines
+abgebrochenen Laufs derselben Generation übernommen, so dass nur die fehlenden
+Einträge neu abgefragt werden. Eine unvollständige letzte Zeile (Absturz beim
+Schreiben) wird ignoriert. Nach einem erfolgreichen Lauf wird das Journal gelöscht.
+"""
+
+import hashlib
+import json
+import os
+import re
+from helperfunctions import cache_path
+
+
+def checkpoint_path(name):
+    """
+    Liefert den Pfad des Journals für einen Lauf, z.B. für den Titel der Eingabeseite.
+    """
+    return cache_path("checkpoint_" + re.sub(r"\W+", "_", name).strip("_") + ".jsonl")
+
+
+def get_generation(entries):
+    """
+    Liefert einen Hash über alle Einträge des Laufs.
+    """
+    return hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def entry_key(entry):
+    """
+    Liefert den Schlüssel eines Eintrags (Tupel wie (Name, QID, CAS-Nummer)) im Journal.
+    """
+    return "\t".join(str(part) for part in entry)
+
+
+def read_checkpoint(path, generation):
+    """
+    Liest die Einträge eines Journals, wenn es zur Generation gehört.
+
+    Returns:
+        dict: {Schlüssel: Datensatz} oder None, wenn das Journal fehlt oder zu einem anderen Lauf gehört.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return None
+
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        return None
+    if header.get("generation") != generation:
+        return None
+
+    done = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # unvollständig geschriebene Zeile
+            continue
+        done[entry["key"]] = entry["record"]
+    return done
+
+
+def open_checkpoint(name, entries, resume=False):
+    """
+    Öffnet das Journal eines Laufs. Ohne resume (oder bei anderer Generation) wird neu begonnen.
+
+    Args:
+        name: Name des Laufs, z.B. der Titel der Eingabeseite.
+        entries: Liste aller Einträge des Laufs (JSON-fähig).
+        resume: Ergebnisse eines abgebrochenen Laufs übernehmen.
+
+    Returns:
+        dict: {"path", "file", "done": {Schlüssel: Datensatz}}
+    """
+    path = checkpoint_path(name)
+    generation = get_generation(entries)
+    done = read_checkpoint(path, generation) if resume else None
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if done is None:
+        if resume:
+            print(f"Kein passender Checkpoint in {path}, beginne von vorn")
+        done = {}
+        f = open(path, "w", encoding="utf-8")
+        f.write(json.dumps({"generation": generation}) + "\n")
+    else:
+        print(f"Checkpoint {path}: {len(done)} von {len(entries)} Einträgen übernommen")
+        f = open(path, "a+", encoding="utf-8")
+        # nach einem Absturz mitten in einer Zeile in einer neuen Zeile weiterschreiben
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+    f.flush()
+
+    return {"path": path, "file": f, "done": done}
+
+
+def record_entry(checkpoint, key, record):
+    """
+    Hängt einen fertigen Eintrag an das Journal an und schreibt ihn sofort auf die Platte.
+
+    Args:
+        checkpoint: Das Journal aus open_checkpoint.
+        key: Schlüssel des Eintrags (entry_key).
+        record: JSON-fähiger Datensatz mit den Ergebnissen des Eintrags.
+    """
+    checkpoint["done"][key] = record
+    f = checkpoint["file"]
+    f.write(json.dumps({"key": key, "record": record}, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def close_checkpoint(checkpoint, finished=False):
+    """
+    Schließt das Journal, nach einem erfolgreichen Lauf wird es gelöscht.
+    """
+    checkpoint["file"].close()
+    if finished:
+        os.remove(checkpoint["path"])
@@ -1,12 +1,20 @@
 import pywikibot
 import re
 import time
-import mwparserfromhell
 from collections import defaultdict
+from templatelinks import count_links_via_templates_bulk
 from helperfunctions import human_readable_time_difference
+from wikidatabulk import get_entities_bulk
+from backlinkcount import count_backlinks
+from searchcount import count_name_hits
+from checkpoint import open_checkpoint, close_checkpoint, entry_key, record_entry
+import argparse
 
 unknown_wikidata = "Q000000"
 
+# Einträge pro Block, nach jedem Block stehen die Ergebnisse im Checkpoint
+CHECKPOINT_CHUNK = 500
+
 def get_missing_entities(site, page_title):
     """Extrahiert die Liste der fehlenden Einträge von der Wikipedia-Seite."""
     page = pywikibot.Page(site, page_title)
@@ -26,62 +34,19 @@ def get_missing_entities(site, page_title):
         entities.append((name, unknown_wikidata))
     return entities
 
-def getWikidataItem(site, wikidata_id):
-    try:
-        repo = site.data_repository()
-        item = pywikibot.ItemPage(repo, wikidata_id)
-        while item.isRedirectPage():
-            item = pywikibot.ItemPage(repo, item.getRedirectTarget().title())
-        item.get()
-        return item
-    except Exception as e:
-        print(f"Fehler beim Abrufen von {wikidata_id}: {e}")
-        return None
-
-def count_incoming_links(site, title):
-    page = pywikibot.Page(site, title)
-    return len(list(page.backlinks(namespaces=[0])))
-
-def count_links_via_templates(site, target_title, namespaces=[0]):
-    target_page = pywikibot.Page(site, target_title)
-    refs = list(target_page.getReferences(only_template_inclusion=False, namespaces=namespaces))
-
-    direct_count = 0
-    template_count = 0
-
-    for page in refs:
-        try:
-            raw = page.text
-            wikicode_raw = mwparserfromhell.parse(raw)
-            raw_links = {str(link.title) for link in wikicode_raw.filter_wikilinks()}
-
-            expanded = page.expand_text()
-            wikicode_expanded = mwparserfromhell.parse(expanded)
-            expanded_links = {str(link.title) for link in wikicode_expanded.filter_wikilinks()}
-
-            if target_title in expanded_links:
-                if target_title in raw_links:
-                    direct_count += 1
-                else:
-                    template_count += 1
-        except Exception as e:
-            print(f"Fehler bei {page.title()}: {e}")
-
-    return {"direct": direct_count, "template": template_count, "total": direct_count + template_count}
-
 def has_german_wikipedia_link(item):
     if item:
-        german_page = item.sitelinks.get('dewiki', None)
+        german_page = item["sitelinks"].get('dewiki', None)
         return {
             "has_german_wikipedia_link": german_page is not None,
-            "german_page_name": german_page.title if german_page else ""
+            "german_page_name": german_page or ""
         }
     else:
         return {"has_german_wikipedia_link": False, "german_page_name": ""}
 
 def count_wikipedia_languages(item):
     if item:
-        wikipedia_links = [site for site in item.sitelinks if (site.endswith('wiki') and not site == "commonswiki")]
+        wikipedia_links = [site for site in item["sitelinks"] if (site.endswith('wiki') and not site == "commonswiki")]
         return len(wikipedia_links)
     else:
         return -1
@@ -142,49 +107,104 @@ def update_wikipedia_page(site, output_page_title, results, wikidata_description
     page.text = new_content
     page.save(summary=f"Automatische Aktualisierung der Zusatzinformationen für {len(results)} Seiten")
 
-def getSearchCount(site, name):
-    results = list(site.search("\""+name+"\"", total=500, namespaces=[0]))
-    return len(results)
-
-def main(input_page_title, output_page_title, wikidata_description):
+def load_entity_infos(site, entities):
+    """
+    Lädt Sitelinks, Links und Suchtreffer für mehrere Einträge.
+
+    Returns:
+        dict: {"items", "links", "templates", "search"} mit den Ergebnissen der Abfragen.
+    """
+    names = [name for name, wikidata_id in entities]
+    # nur die Sitelinks werden gebraucht, in Blöcken zu 50 Elementen laden
+    items = get_entities_bulk(site.data_repository(), [wikidata_id for name, wikidata_id in entities if wikidata_id != unknown_wikidata], props="sitelinks")
+    link_counts = count_backlinks(site, names)
+    template_counts = count_links_via_templates_bulk(site, [name for name in names if link_counts[name] > 3])
+    search_counts = count_name_hits(site, names)
+    return {"items": items, "links": link_counts, "templates": template_counts, "search": search_counts}
+
+def get_entity_record(entity, done):
+    """
+    Wertet die geladenen Informationen für einen Eintrag aus.
+
+    Args:
+        entity: Tupel (Name, QID).
+        done: Ergebnis von load_entity_infos.
+
+    Returns:
+        dict: JSON-fähiger Datensatz für merge_entity_record und den Checkpoint.
+    """
+    name, wikidata_id = entity
+    searchcount = done["search"][name]
+    incoming_links = done["links"][name]
+    incoming_links_templates = done["templates"][name]["template"] if incoming_links > 3 else 0
+
+    record = {
+        "key": name,
+        "name": name,
+        "links": incoming_links,
+        "template_links": incoming_links_templates,
+        "searchcount": searchcount,
+        "has_german": False,
+        "german_name": "",
+        "langs": -1,
+    }
+
+    if wikidata_id == unknown_wikidata:
+        print(f"{name}: {incoming_links} Links, Vorlagen {incoming_links_templates}, Suchtreffer {searchcount}, Deutscher Artikel: False, Sprachen: -1")
+        return record
+
+    item = done["items"][wikidata_id]
+    result = has_german_wikipedia_link(item)
+    language_count = count_wikipedia_languages(item)
+
+    print(f"{name}: {incoming_links} Links, Vorlagen {incoming_links_templates}, Suchtreffer {searchcount}, Deutscher Artikel: {result['has_german_wikipedia_link']}, Sprachen: {language_count}")
+
+    record["key"] = wikidata_id
+    record["has_german"] = result["has_german_wikipedia_link"]
+    record["german_name"] = result["german_page_name"]
+    record["langs"] = language_count
+    return record
+
+def merge_entity_record(results, record):
+    """
+    Fasst den Datensatz eines Eintrags unter seinem Wikidata-Element (oder Namen) zusammen.
+    """
+    entry = results[record["key"]]
+    entry["entities"].append(record["name"])
+    entry["links"].append(record["links"])
+    entry["template_links"].append(record["template_links"])
+    entry["has_german"] |= record["has_german"]
+    entry["german_name"] = record["german_name"]
+    entry["langs"] = max(entry["langs"], record["langs"])
+    entry["searchcount"].append(record["searchcount"])
+
+def main(input_page_title, output_page_title, wikidata_description, resume=False):
     zeitanfang = time.time()	
     print("Start ... ")
     site = pywikibot.Site('de', 'wikipedia')
 
     print(f"Bearbeite Einträge von {input_page_title}")
     entities = get_missing_entities(site, input_page_title)
-    
+
+    # fertige Einträge stehen im Checkpoint, mit resume werden sie nicht erneut abgefragt
+    checkpoint = open_checkpoint(output_page_title, entities, resume)
+    records = dict(checkpoint["done"])
+    pending = [entity for entity in dict.fromkeys(entities) if entry_key(entity) not in records]
+
+    count = 0
+    for start in range(0, len(pending), CHECKPOINT_CHUNK):
+        chunk = pending[start:start + CHECKPOINT_CHUNK]
+        done = load_entity_infos(site, chunk)
+        for entity in chunk:
+            count += 1
+            print(f"{count}/{len(pending)} ", end="")
+            record = get_entity_record(entity, done)
+            records[entry_key(entity)] = record
+            record_entry(checkpoint, entry_key(entity), record)
+
     results = defaultdict(lambda: {"entities": [], "links": [], "template_links": [], "searchcount": [], "has_german": False, "german_name": "", "langs": -1})
-    
-    for count, (name, wikidata_id) in enumerate(entities, start=1):
-        searchcount = getSearchCount(site, name)
-        
-        if wikidata_id == unknown_wikidata:
-            incoming_links = count_incoming_links(site, name)
-            incoming_links_templates = count_links_via_templates(site, name)["template"] if incoming_links > 3 else 0
-            print(f"{count}/{len(entities)} {name}: {incoming_links} Links, Vorlagen {incoming_links_templates}, Suchtreffer {searchcount}, Deutscher Artikel: False, Sprachen: -1")
-            
-            results[name]["entities"].append(name)
-            results[name]["links"].append(incoming_links)
-            results[name]["template_links"].append(incoming_links_templates)
-            results[name]["searchcount"].append(searchcount)
-        
-        else:
-            incoming_links = count_incoming_links(site, name)
-            incoming_links_templates = count_links_via_templates(site, name)["template"] if incoming_links > 3 else 0
-            item = getWikidataItem(site, wikidata_id)
-            result = has_german_wikipedia_link(item)
-            language_count = count_wikipedia_languages(item)
-            
-            print(f"{count}/{len(entities)} {name}: {incoming_links} Links, Vorlagen {incoming_links_templates}, Suchtreffer {searchcount}, Deutscher Artikel: {result['has_german_wikipedia_link']}, Sprachen: {language_count}")
-            
-            results[wikidata_id]["entities"].append(name)
-            results[wikidata_id]["links"].append(incoming_links)
-            results[wikidata_id]["template_links"].append(incoming_links_templates)
-            results[wikidata_id]["has_german"] |= result["has_german_wikipedia_link"]
-            results[wikidata_id]["german_name"] = result["german_page_name"]
-            results[wikidata_id]["langs"] = max(results[wikidata_id]["langs"], language_count)
-            results[wikidata_id]["searchcount"].append(searchcount)
+    for entity in entities:
+        merge_entity_record(results, records[entry_key(entity)])
     
     print("Sorting results ...")
     sorted_results = dict(sorted(results.items(), key=lambda x: (
@@ -198,27 +218,36 @@ def main(input_page_title, output_page_title, wikidata_description):
 
     print("Update page ...")
     update_wikipedia_page(site, output_page_title, sorted_results, wikidata_description)
+    close_checkpoint(checkpoint, finished=True)
 
     print("\nLaufzeit:", human_readable_time_difference(zeitanfang, time.time()))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zusatzinformationen für fehlende Einträge")
+    parser.add_argument("--resume", action="store_true", help="Ergebnisse abgebrochener Läufe aus dem Checkpoint übernehmen")
+    args = parser.parse_args()
+
     main(
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Sonstige Themen",
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Sonstige Themen/Zusatzinformationen",
-        ""
+        "",
+        args.resume
     )
     main(
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Unternehmen",
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Unternehmen/Zusatzinformationen",
-        "chemische%20Verbindung"
+        "chemische%20Verbindung",
+        args.resume
     )
     main(
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Journals",
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Journals/Zusatzinformationen",
-        "wissenschaftliches Journal"
+        "wissenschaftliches Journal",
+        args.resume
     )
     main(
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Taxa",
         "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Fehlende Taxa/Zusatzinformationen",
-        "Organismus"
+        "Organismus",
+        args.resume
     )
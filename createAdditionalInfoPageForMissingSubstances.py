@@ -1,42 +1,36 @@
 import pywikibot
 import re
 import time
-import mwparserfromhell
 from collections import defaultdict
-from pywikibot import pagegenerators
+from templatelinks import count_links_via_templates_bulk, print_link_set_statistics
+from searchcount import count_name_hits, print_search_statistics
+from casindex import load_cas_index, lookup_cas_bulk
 import random
-from pywikibot.data.sparql import SparqlQuery
+from wikidatabulk import get_qids_by_cas_bulk, get_entities_bulk, get_labels_bulk, get_label, print_label_statistics
+from backlinkcount import count_backlinks, print_backlink_statistics
+from helperfunctions import run_stages, set_api_rate_limit
+from checkpoint import open_checkpoint, close_checkpoint, entry_key, record_entry
+import argparse
 
 unknown_wikidata = "Q000000"
 unknown_cas = "-"
 
-def load_cas_numbers(filename, unique=True):
-    """
-    Liest eine Textdatei und extrahiert alle CAS-Nummern.
-
-    Args:
-        filename (str): Pfad zur Textdatei
-        unique (bool): True → Duplikate entfernen
-
-    Returns:
-        list[str]: Liste gefundener CAS-Nummern
-    """
-    
-    print(f"Lade CAS aus {filename}")
-    
-    cas_pattern = re.compile(r"\b\d{2,7}-\d{2}-\d\b")
-
-    found = []
-
-    with open(filename, "r", encoding="utf-8") as f:
-        for line in f:
-            found.extend(cas_pattern.findall(line))
-            
-    ret = sorted(set(found)) if unique else found
+# Typen (P31), die für eine Substanz unverdächtig sind
+INSTANCE_OF_WHITELIST = frozenset(["Q917125", "Q159226","Q119896085", "Q718074", "Q12140", "Q1069267", "Q1200715","Q8047", 
+    "Q67015883","Q1259977","Q1075", "Q169336", "Q55640599", "Q15711994","Q84467700", 
+    "Q59199015","Q56256173","Q56256178","Q60280","Q37756", "Q2030064", "Q161179","Q81163", 
+    "Q409766","Q134219", "Q8054", "Q898273", "Q417841","Q81505329","Q7251477","Q208467", 
+    "Q924146", "Q12370", "Q2286901","Q12870","Q17339814","Q47154513", "Q6714735", "Q2585617", 
+    "Q43460564","Q11173", "Q79529", "Q22683747","Q113145171","Q119892838","Q78155096", "Q170409", 
+    "Q55662456", "Q67101749", "Q741844", "Q10400865","Q2468248","Q3965272", "Q2330866","Q78782478", 
+    "Q67101072" ])
 
-    print(f"{len(ret)} CAS Nummern gefunden")
+# parallel laufende Abfragen und gemeinsame Obergrenze der API-Anfragen pro Sekunde
+ENRICHMENT_WORKERS = 4
+API_CALLS_PER_SECOND = 10
 
-    return ret
+# Einträge pro Block, nach jedem Block stehen die Ergebnisse im Checkpoint
+CHECKPOINT_CHUNK = 500
 
 
 def get_missing_substances(site, page_title):
@@ -65,117 +59,13 @@ def get_missing_substances(site, page_title):
     # print(substances)
     return substances
 
-def get_qids_by_cas(repo, cas_number, retries=10, delay=5):
-    sparql = f"""
-    SELECT ?item WHERE {{
-      ?item wdt:P231 "{cas_number}".
-    }}
-    """
-
-    for attempt in range(1, retries + 1):
-        try:
-            return sorted([
-                item.id
-                for item in pagegenerators.WikidataSPARQLPageGenerator(
-                    sparql, site=repo
-                )
-            ])
-        except Exception as e:
-            if attempt >= retries:
-                raise  # letzte Exception weiterreichen
-
-            pywikibot.warning(
-                f"SPARQL fehlgeschlagen für CAS {cas_number} "
-                f"(Versuch {attempt}/{retries}): {e}"
-            )
-            time.sleep(delay*attempt)
-
-    print(f"max attempts reached for {cas_number}")
-    return []  # wird praktisch nie erreicht
-
-
-def getWikidataItem(repo, wikidata_id, max_retries=3, wait_seconds=60):
-    for attempt in range(1, max_retries + 1):
-        try:
-            item = pywikibot.ItemPage(repo, wikidata_id)
-
-            # Redirects auflösen (kann mehrfach verschachtelt sein)
-            while item.isRedirectPage():
-                item = pywikibot.ItemPage(repo, item.getRedirectTarget().title())
-
-            item.get()
-            return item  # Erfolg
-
-        except Exception as e:
-            print(f"Fehler bei {wikidata_id} (Versuch {attempt}/{max_retries}): {e}")
-
-            if attempt < max_retries:
-                print(f"Warte {wait_seconds} Sekunden vor erneutem Versuch...")
-                time.sleep(wait_seconds)
-            else:
-                print(f"Endgültig fehlgeschlagen: {wikidata_id}")
-                return None
-            
-def count_incoming_links(site, title):
-    """Zählt die Anzahl der eingehenden Links auf eine Seite in der Wikipedia."""
-    page = pywikibot.Page(site, title)
-    return len(list(page.backlinks(namespaces=[0])))  # Nur Artikel-Namensraum
-
-def count_links_via_templates(site, target_title, namespaces=[0]):
-    """
-    Zählt, wie viele Links auf `target_title` direkt im Wikitext vorkommen
-    und wie viele über Vorlagen erzeugt werden.
-
-    Args:
-        site (pywikibot.Site): Wikipedia-Site, z. B. Site("de", "wikipedia")
-        target_title (str): Titel der Zielseite, z. B. "Berlin"
-        namespaces (list): Liste von Namespaces, in denen gesucht werden soll (Standard: [0] = Artikel)
-
-    Returns:
-        dict: {"direct": int, "template": int, "total": int}
-    """
-    target_page = pywikibot.Page(site, target_title)
-    refs = list(target_page.getReferences(only_template_inclusion=False, namespaces=namespaces))
-
-    direct_count = 0
-    template_count = 0
-
-    for page in refs:
-        try:
-            # Roh-Wikitext
-            raw = page.text
-            wikicode_raw = mwparserfromhell.parse(raw)
-            raw_links = {str(link.title) for link in wikicode_raw.filter_wikilinks()}
-
-            # Expandierter Text (inkl. Vorlagen)
-            expanded = page.expand_text()
-            wikicode_expanded = mwparserfromhell.parse(expanded)
-            expanded_links = {str(link.title) for link in wikicode_expanded.filter_wikilinks()}
-
-            # Entscheidung: direkt oder via Vorlage?
-            if target_title in expanded_links:
-                if target_title in raw_links:
-                    direct_count += 1
-                else:
-                    template_count += 1
-
-        except Exception as e:
-            print(f"Fehler bei {page.title()}: {e}")
-
-    return {
-        "direct": direct_count,
-        "template": template_count,
-        "total": direct_count + template_count,
-    }
-
-
 def has_german_wikipedia_link(site, item):
     
     if item:
-        german_page = item.sitelinks.get('dewiki', None)
+        german_page = item["sitelinks"].get('dewiki', None)
         return {
             "has_german_wikipedia_link": german_page is not None,
-            "german_page_name": german_page.title if german_page else ""
+            "german_page_name": german_page or ""
             }
     else:
         return {"has_german_wikipedia_link": False, "german_page_name":""}
@@ -185,10 +75,10 @@ def count_wikipedia_languages(site, item):
     if item:
         # Filtere nur Wikipedia-Sprachlinks (die Endung '.wikipedia.org' haben)
 
-        language_count = len(item.sitelinks)  # Anzahl der Sprachlinks zählen
+        language_count = len(item["sitelinks"])  # Anzahl der Sprachlinks zählen
         # print(f"{wikidata_id} hat {language_count} Links zu Wikipedia-Artikeln.")
  
-        wikipedia_links = [site for site in item.sitelinks if (site.endswith('wiki') and not site == "commonswiki" )]
+        wikipedia_links = [site for site in item["sitelinks"] if (site.endswith('wiki') and not site == "commonswiki" )]
         language_count = len(wikipedia_links)  # Anzahl der Wikipedia-Sprachlinks
 
         # print(f"{wikidata_id} hat Wikipedia-Artikel in {language_count} Sprachen.")
@@ -198,51 +88,42 @@ def count_wikipedia_languages(site, item):
 
 
 
-def get_cas_rejection_reason(qid):
-    try:
-        site = pywikibot.Site("wikidata", "wikidata")
-        repo = site.data_repository()
-
-        item = pywikibot.ItemPage(repo, qid)
-        item.get()
-
-        reasons = []
-
-        if "P231" not in item.claims:
-            return ""
-
-        for claim in item.claims["P231"]:
-            if claim.rank == "deprecated":
-                cas = claim.getTarget()
+def get_cas_rejection_reason(repo, rejections):
+    """
+    Liefert die Gründe, aus denen CAS-Nummern im Wikidata-Element abgelehnt wurden
+    (missbilligter Rang mit P2241), die Bezeichnungen der Gründe kommen aus dem QID-Cache.
 
-                if "P2241" in claim.qualifiers:
-                    for q in claim.qualifiers["P2241"]:
-                        reason_item = q.getTarget()
-                        reason_item.get()
-                        label = reason_item.labels.get("de") or reason_item.labels.get("en") or reason_item.id
-                        reasons.append(f"{cas}: {label}")
-                else:
-                    reasons.append(f"{cas}: kein Grund angegeben")
+    Args:
+        repo: Das Wikidata-Repository.
+        rejections: [[CAS-Nummer, [QIDs der Gründe]]] aus dem Datensatz des Elements.
+    """
+    labels = get_labels_bulk(repo, [reason for cas, reasons in rejections for reason in reasons])
+    reasons = []
+
+    for cas, reason_ids in rejections:
+        if reason_ids:
+            for reason_id in reason_ids:
+                label = get_label(labels[reason_id][1], reason_id) if reason_id in labels else reason_id
+                reasons.append(f"{cas}: {label}")
+        else:
+            reasons.append(f"{cas}: kein Grund angegeben")
 
-        # doppelte Gründe entfernen
-        reasons = list(dict.fromkeys(reasons))
+    # doppelte Gründe entfernen
+    reasons = list(dict.fromkeys(reasons))
 
-        return "; ".join(reasons)
-    except Exception as e:
-        print(f"Fehler bei {qid}: {e}")
-        return ""
+    return "; ".join(reasons)
     
     
 def update_wikipedia_page(site, results):
+    repo = site.data_repository()
     page = pywikibot.Page(site, "Wikipedia:Redaktion Chemie/Fehlende Substanzen/Zusatzinformationen")
     # page = pywikibot.Page(site, "Benutzer:ChemoBot/Tests/Zusatzinformationen")
     content = page.text
     
     counter = 1
     
-    GESTIS_List = load_cas_numbers("GESTIS.txt")    
-    EPA_HPV = load_cas_numbers("EPA_HPV.txt")
-    OECD_HPV = load_cas_numbers("OECD_HPV.txt")
+    # GESTIS/EPA_HPV/OECD_HPV für alle CAS-Nummern auf einmal nachschlagen
+    cas_lists = lookup_cas_bulk(load_cas_index(), [data["cas_nr"] for data in results.values() if len(data["cas_nr"]) > 1])
     
     # Trenne den vorhandenen Inhalt in den Teil vor "Zusatzinformationen" und den Rest
     match = re.search(r'(^.*?)(=+\s*Zusatzinformationen\s*=+)', content, re.DOTALL)
@@ -281,12 +162,8 @@ def update_wikipedia_page(site, results):
         
         if len(cas_nr)>1:
             AddOn = ""
-            if cas_nr in GESTIS_List:
-                AddOn += ", in GESTIS"
-            if cas_nr in EPA_HPV:
-                AddOn += ", in EPA_HPV"
-            if cas_nr in OECD_HPV:
-                AddOn += ", in OECD_HPV"
+            for list_name in cas_lists[cas_nr][0]:
+                AddOn += f", in {list_name}"
             cas_nrs = data['cas_nrs']
             qids =  data['qids']
             
@@ -294,8 +171,8 @@ def update_wikipedia_page(site, results):
                 if qids:
                    if wikidata in qids:
                        if len(qids) > 1:
-                          qids.remove(wikidata) 
-                          links = ", ".join(f"[[:d:{qid}]]" for qid in qids)
+                          others = [qid for qid in qids if qid != wikidata]
+                          links = ", ".join(f"[[:d:{qid}]]" for qid in others)
                           AddOn += f", WD-Fehler (zusätzlich weitere Wikidata Elemente mit der angegeben CAS vorhanden: {links})"
                           warning = True
                    else:
@@ -308,13 +185,13 @@ def update_wikipedia_page(site, results):
                           AddOn += f", CAS-Wikidata-Zuordnungsfehler (CAS Nummer in einem anderem Wikidata Element {links} vorhanden, aber nicht im angegebenen Wikidata Element)"
                           warning = True
                        if cas_nr in cas_nrs:
-                          reason = get_cas_rejection_reason(wikidata)
+                          reason = get_cas_rejection_reason(repo, data.get("cas_rejections", []))
                           if reason:
                              AddOn += f", CAS {cas_nr} in angebenem Wikidata Element wurde abgelehnt wegen: {reason}"
                 else:
                     if cas_nr in cas_nrs:
                         print(f"cas {cas_nr} in cas nummers {cas_nrs}, but qids empty !!!")
-                        reason = get_cas_rejection_reason(wikidata)
+                        reason = get_cas_rejection_reason(repo, data.get("cas_rejections", []))
                         if reason:
                             warning = True
                             AddOn += f", CAS {cas_nr} in angebenem Wikidata Element wurde abgelehnt wegen: {reason}"
@@ -323,7 +200,7 @@ def update_wikipedia_page(site, results):
                         if cas_nrs: # {{CASRN|"+cas_nr+"}}
                             links = ", ".join(f"{{{{CASRN|{cas}}}}}" for cas in cas_nrs)
                             AddOn += f", WD-Fehler (CAS Nummer in keinem Wikidata Element, auch nicht im angegeben, aber andere CAS Nummer(n) {links} im angegeben Wikidata Eintrag)"
-                            reason = get_cas_rejection_reason(wikidata)
+                            reason = get_cas_rejection_reason(repo, data.get("cas_rejections", []))
                             if reason:
                                 AddOn += f", CAS {cas_nr} in angebenem Wikidata Element wurde abgelehnt wegen: {reason}"
                         else:
@@ -431,17 +308,9 @@ def human_readable_time_difference(start_time, end_time):
     
     return ', '.join(result)
 
-def getSearchCount(site, name):
-    results = list(site.search("\""+name+"\"", total=500, namespaces=[0]))
-    #print(f"Treffer für '{name}' im Artikelnamensraum: {len(results)}")
-    return len(results)
-
 def get_cas_numbers(item):
 
-    return [
-        claim.getTarget()
-        for claim in item.claims.get("P231", [])
-    ]
+    return list(item["claims"].get("P231", []))
 
 def get_infos_for_substances_test(site, substances):
     """
@@ -516,136 +385,216 @@ def get_infos_for_substances_test(site, substances):
 
     return results
 
-def get_suspicious_instance_of_item(item):
+def get_suspicious_instance_of_item(repo, item):
     """
     Prüft die P31-Einträge eines Wikidata-Items.
     Gibt einen Text zurück, wenn keiner der P31-Werte in der Whitelist ist.
     """
-    whitelist = ["Q917125", "Q159226","Q119896085", "Q718074", "Q12140", "Q1069267", "Q1200715","Q8047", 
-    "Q67015883","Q1259977","Q1075", "Q169336", "Q55640599", "Q15711994","Q84467700", 
-    "Q59199015","Q56256173","Q56256178","Q60280","Q37756", "Q2030064", "Q161179","Q81163", 
-    "Q409766","Q134219", "Q8054", "Q898273", "Q417841","Q81505329","Q7251477","Q208467", 
-    "Q924146", "Q12370", "Q2286901","Q12870","Q17339814","Q47154513", "Q6714735", "Q2585617", 
-    "Q43460564","Q11173", "Q79529", "Q22683747","Q113145171","Q119892838","Q78155096", "Q170409", 
-    "Q55662456", "Q67101749", "Q741844", "Q10400865","Q2468248","Q3965272", "Q2330866","Q78782478", 
-    "Q67101072" ]
-    
     if not item:
         return ""
 
-    if "P31" not in item.claims:
-        return f", für ({item.id}) ist kein Typ im Wikidata Element angegeben"
+    if "P31" not in item["claims"]:
+        return f", für ({item['id']}) ist kein Typ im Wikidata Element angegeben"
 
-    found_instances = []
+    instance_ids = item["claims"]["P31"]
+    if not INSTANCE_OF_WHITELIST.isdisjoint(instance_ids):
+        return ""   # alles ok → keine Ausgabe
 
-    for claim in item.claims["P31"]:
-
-        target = claim.getTarget()
+    # Bezeichnungen und Weiterleitungsziele der Typen kommen aus dem QID-Cache
+    targets = get_labels_bulk(repo, instance_ids)
+    found_instances = []
 
-        try:
-            if target.isRedirectPage():
-                target = target.getRedirectTarget()
-        except Exception as e:
-            print(f"Fehler bei {item.id}: {e}")
+    for target_id in instance_ids:
+        if target_id not in targets:
+            print(f"Fehler bei {item['id']}: {target_id} nicht geladen")
             return ""
 
-        if target.id in whitelist:
+        resolved_id, labels = targets[target_id]
+        if resolved_id in INSTANCE_OF_WHITELIST:
             return ""   # alles ok → keine Ausgabe
 
-        target.get()
-        target_label = target.labels.get("de") or target.labels.get("en") or target_id
-        found_instances.append(target_label)
+        found_instances.append(get_label(labels, resolved_id))
 
 
     # Wenn wir hier sind: kein P31 in der Whitelist
-    label = item.labels.get("de") or item.labels.get("en") or item.id
+    label = get_label(item["labels"], item["id"])
+
+    return f", Wikidata Element {label} ({item['id']}) hat einen verdächtigen Typ: \"{', '.join(found_instances)}\" (nicht in Whitelist)"
+
+def load_substance_infos(site, repo, substances):
+    """
+    Lädt CAS-Nummern, Wikidata-Elemente, Bezeichnungen, Links und Suchtreffer für mehrere Substanzen.
+
+    Returns:
+        dict: {Stufe: Ergebnis der Stufe}
+    """
+    names = [name for name, wikidata_id, cas_nr in substances]
+
+    def load_labels(done):
+        # Typen und Ablehnungsgründe aller Elemente gesammelt in den QID-Cache laden
+        loaded = [item for item in done["Wikidata items"].values() if item]
+        return get_labels_bulk(repo, [qid for item in loaded for qid in item["claims"].get("P31", []) if qid not in INSTANCE_OF_WHITELIST]
+                               + [reason for item in loaded for cas, reasons in item["deprecated"].get("P231", []) for reason in reasons])
+
+    # unabhängige Abfragen laufen parallel, die API-Anfragen teilen sich die Begrenzung aus main()
+    stages = {
+        "CAS numbers": (lambda done: get_qids_by_cas_bulk(repo, [cas_nr for name, wikidata_id, cas_nr in substances]), []),
+        "Wikidata items": (lambda done: get_entities_bulk(repo, [wikidata_id for name, wikidata_id, cas_nr in substances if wikidata_id != unknown_wikidata]), []),
+        "labels": (load_labels, ["Wikidata items"]),
+        "incoming links": (lambda done: count_backlinks(site, names), []),
+        "links via templates": (lambda done: count_links_via_templates_bulk(site, [name for name in names if done["incoming links"][name] > 3]), ["incoming links"]),
+        "search hits": (lambda done: count_name_hits(site, names), []),
+    }
+    print("Load information for pages ...")
+    done, timings = run_stages(stages, max_workers=ENRICHMENT_WORKERS)
+    for stage in stages:
+        print(f"  {stage}: {round(timings[stage], 1)} Sekunden")
+    print_label_statistics()
+    print_backlink_statistics()
+    print_link_set_statistics()
+    print_search_statistics()
+    return done
+
+def get_substance_record(site, repo, substance, done):
+    """
+    Wertet die geladenen Informationen für eine Substanz aus.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        repo: Das Wikidata-Repository.
+        substance: Tupel (Name, QID, CAS-Nummer).
+        done: Ergebnis von load_substance_infos.
+
+    Returns:
+        dict: JSON-fähiger Datensatz für merge_substance_record und den Checkpoint.
+    """
+    name, wikidata_id, cas_nr = substance
+    qids = done["CAS numbers"][cas_nr]
+    searchcount = done["search hits"][name]
+    incoming_links = done["incoming links"][name]
+    if (incoming_links > 3):
+        incoming_links_templates = done["links via templates"][name]["template"]
+    else:
+        incoming_links_templates = 0
+
+    record = {
+        "key": name,
+        "name": name,
+        "links": incoming_links,
+        "template_links": incoming_links_templates,
+        "searchcount": searchcount,
+        "has_german": False,
+        "german_name": "",
+        "langs": -1,
+        "cas_nr": cas_nr,
+        "cas_nrs": [],
+        # eigene Kopie, die Liste gehört allen Substanzen mit dieser CAS-Nummer
+        "qids": list(qids),
+        "fetch_failed": False,
+        "cas_rejections": [],
+        "suspicious": "",
+    }
+
+    if wikidata_id == unknown_wikidata:
+        print(f"{name}: {incoming_links} Links, davon Vorlagen {incoming_links_templates}, Suchtreffer: {searchcount}, Deutscher Artikel: {False}, Sprachen: {-1}, cas: {cas_nr}, qids: {qids}")
+        return record
+
+    item = done["Wikidata items"][wikidata_id]
+    cas_numbers = []
+    if item:
+        wikidata_id = item["id"] # use redirect id, if it is a redirect
+        cas_numbers = get_cas_numbers(item)
+    else:
+        record["fetch_failed"] = True
+
+    result = has_german_wikipedia_link(site, item)
+    language_count = count_wikipedia_languages(site, item) if item else 0
+
+    suspicious_instance_text = get_suspicious_instance_of_item(repo, item)
 
-    return f", Wikidata Element {label} ({item.id}) hat einen verdächtigen Typ: \"{', '.join(found_instances)}\" (nicht in Whitelist)"
+    print(f"{name}: {incoming_links} Links, aus Vorlagen {incoming_links_templates}, Suchtreffer: {searchcount}, Deutscher Artikel: {result["has_german_wikipedia_link"]}, Sprachen: {language_count}, cas: {cas_nr}, cas_nrs: {cas_numbers} ({cas_nr not in cas_numbers}), qids: {qids}{suspicious_instance_text}")
 
-def get_infos_for_substances(site, substances):
-    results = defaultdict(lambda: {"substances": [], "links": [], "template_links": [], "searchcount": [], "has_german": False, "german_name": "", "langs": -1, "cas_nr" : "", "suspicious_instances": [], "fetch_failed": False})
+    record["key"] = wikidata_id
+    record["has_german"] = result["has_german_wikipedia_link"]
+    record["german_name"] = result["german_page_name"]
+    record["langs"] = language_count
+    record["cas_nrs"] = cas_numbers
+    record["cas_rejections"] = item["deprecated"].get("P231", []) if item else []
+    record["suspicious"] = suspicious_instance_text
+    return record
+
+def merge_substance_record(results, record):
+    """
+    Fasst den Datensatz einer Substanz unter ihrem Wikidata-Element (oder Namen) zusammen.
+    """
+    entry = results[record["key"]]
+    entry["substances"].append(record["name"])
+    entry["links"].append(record["links"])
+    entry["template_links"].append(record["template_links"])
+    entry["has_german"] |= record["has_german"]
+    entry["german_name"] = record["german_name"]
+    entry["langs"] = max(entry["langs"], record["langs"])
+    entry["cas_nr"] = record["cas_nr"]
+    entry["cas_nrs"] = record["cas_nrs"]
+    entry["cas_rejections"] = record["cas_rejections"]
+    entry["qids"] = record["qids"]
+    entry["searchcount"].append(record["searchcount"])
+    entry["fetch_failed"] = record["fetch_failed"]
+    if record["suspicious"]:
+        entry["suspicious_instances"].append(record["suspicious"])
+
+def get_infos_for_substances(site, substances, checkpoint=None):
+    """
+    Sammelt die Zusatzinformationen für alle Substanzen.
+
+    Die Substanzen werden in Blöcken zu CHECKPOINT_CHUNK angereichert. Mit einem Checkpoint
+    wird jeder fertige Eintrag ins Journal geschrieben, bereits erledigte Einträge werden übersprungen.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        substances: Liste von Tupeln (Name, QID, CAS-Nummer).
+        checkpoint: Journal aus open_checkpoint oder None.
+
+    Returns:
+        dict: {QID oder Name: zusammengefasste Informationen}
+    """
+    results = defaultdict(lambda: {"substances": [], "links": [], "template_links": [], "searchcount": [], "has_german": False, "german_name": "", "langs": -1, "cas_nr" : "", "suspicious_instances": [], "fetch_failed": False, "cas_rejections": []})
     repo = site.data_repository()  # Daten-Repository für Wikidata
-    
-    count = 0
-    print("Get information for pages ...")
-    for count, (name, wikidata_id, cas_nr) in enumerate(substances, start=1):
-        
-        qids = get_qids_by_cas(repo, cas_nr)
 
-        searchcount = getSearchCount(site, name)
-        
-        if wikidata_id == unknown_wikidata:
-            incoming_links = count_incoming_links(site, name)
-            if (incoming_links > 3):
-                incoming_links_templates = count_links_via_templates(site, name)["template"]
-            else:
-                incoming_links_templates = 0
-                
-            print(f"{count}/{len(substances)} {name}: {incoming_links} Links, davon Vorlagen {incoming_links_templates}, Suchtreffer: {searchcount}, Deutscher Artikel: {False}, Sprachen: {-1}, cas: {cas_nr}, qids: {qids}")
-            
-            results[name]["substances"].append(name)
-            results[name]["links"].append(incoming_links)
-            results[name]["template_links"].append(incoming_links_templates)
-            results[name]["has_german"] |= False
-            results[name]["german_name"] = ""
-            results[name]["langs"] = -1
-            results[name]["cas_nr"] = cas_nr
-            results[name]["cas_nrs"] = []
-            results[name]["qids"] = qids
-            results[name]["searchcount"].append(searchcount)
-            results[name]["fetch_failed"] = False
-        
-        else:
-            incoming_links = count_incoming_links(site, name)
-            if (incoming_links > 3):
-                incoming_links_templates = count_links_via_templates(site, name)["template"]
-            else:
-                incoming_links_templates = 0
-            item = getWikidataItem(repo, wikidata_id)
-            cas_numbers = []
-            fetch_failed = False
-            if item:
-                wikidata_id = item.id # use redirect id, if it is a redirect
-                cas_numbers = get_cas_numbers(item)
-            else:
-                fetch_failed = True
-                        
-            result = has_german_wikipedia_link(site, item)
-            language_count = count_wikipedia_languages(site, item) if item else 0
-            
-            suspicious_instance_text = get_suspicious_instance_of_item(item)
-            
-            print(f"{count}/{len(substances)} {name}: {incoming_links} Links, aus Vorlagen {incoming_links_templates}, Suchtreffer: {searchcount}, Deutscher Artikel: {result["has_german_wikipedia_link"]}, Sprachen: {language_count}, cas: {cas_nr}, cas_nrs: {cas_numbers} ({cas_nr not in cas_numbers}), qids: {qids}{suspicious_instance_text}")
-            
-            results[wikidata_id]["substances"].append(name)
-            results[wikidata_id]["links"].append(incoming_links)
-            results[wikidata_id]["template_links"].append(incoming_links_templates)
-            results[wikidata_id]["has_german"] |= result["has_german_wikipedia_link"]
-            results[wikidata_id]["german_name"] = result["german_page_name"]
-            results[wikidata_id]["langs"] = max(results[wikidata_id]["langs"], language_count)
-            results[wikidata_id]["cas_nr"] = cas_nr
-            results[wikidata_id]["cas_nrs"] = cas_numbers
-            results[wikidata_id]["qids"] = qids
-            results[wikidata_id]["searchcount"].append(searchcount)
-            results[wikidata_id]["fetch_failed"] = fetch_failed
-            if suspicious_instance_text:
-                results[wikidata_id]["suspicious_instances"].append(suspicious_instance_text)
-        
-        # if (count >= 100):
-        #    break
+    records = dict(checkpoint["done"]) if checkpoint else {}
+    pending = [substance for substance in dict.fromkeys(substances) if entry_key(substance) not in records]
+
+    count = 0
+    for start in range(0, len(pending), CHECKPOINT_CHUNK):
+        chunk = pending[start:start + CHECKPOINT_CHUNK]
+        done = load_substance_infos(site, repo, chunk)
+
+        print("Get information for pages ...")
+        for substance in chunk:
+            count += 1
+            print(f"{count}/{len(pending)} ", end="")
+            record = get_substance_record(site, repo, substance, done)
+            records[entry_key(substance)] = record
+            if checkpoint:
+                record_entry(checkpoint, entry_key(substance), record)
+
+    for substance in substances:
+        merge_substance_record(results, records[entry_key(substance)])
     return results
 
-def main():
+def main(resume=False):
     zeitanfang = time.time()	
     print("Start ...")
     site = pywikibot.Site('de', 'wikipedia')
+    set_api_rate_limit(API_CALLS_PER_SECOND)
     
     page_title = "Wikipedia:Redaktion Chemie/Fehlende Substanzen"
     
     print("Get missing substances ...")
     substances = get_missing_substances(site, page_title)
     
-    results = get_infos_for_substances(site, substances)
+    checkpoint = open_checkpoint(page_title, substances, resume)
+    results = get_infos_for_substances(site, substances, checkpoint)
     #results = get_infos_for_substances_test(site, substances)
     
     print("Sorting results ...")
@@ -660,8 +609,12 @@ def main():
 
     print("Update page ...")
     update_wikipedia_page(site, sorted_results)
+    close_checkpoint(checkpoint, finished=True)
 
     print("\nLaufzeit: ",human_readable_time_difference(zeitanfang, time.time()))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Zusatzinformationen für fehlende Substanzen")
+    parser.add_argument("--resume", action="store_true", help="Ergebnisse eines abgebrochenen Laufs aus dem Checkpoint übernehmen")
+    args = parser.parse_args()
+    main(args.resume)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Prüft, ob DOIs bei Crossref bekannt sind.
+
+Die Ergebnisse werden in cache/doi_cache.json gespeichert: bekannte DOIs gelten
+DOI_FOUND_TTL Sekunden, unbekannte DOIs (404) DOI_MISSING_TTL Sekunden, danach wird
+erneut gefragt. Netzwerkfehler werden nicht gespeichert. Neue Abfragen laufen über eine
+gemeinsame Session (Keep-Alive) mit wenigen parallelen Threads und einer Begrenzung der
+Anfragen pro Sekunde, wie es Crossref für den "polite pool" verlangt.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from helperfunctions import cache_path, load_json_cache, save_json_cache, make_rate_limiter
+
+DOI_CACHE_FILE = cache_path("doi_cache.json")
+DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$", re.IGNORECASE)
+CROSSREF_URL = "https://api.crossref.org/works/"
+
+# Gültigkeit der gespeicherten Ergebnisse in Sekunden
+DOI_FOUND_TTL = 90 * 24 * 3600
+DOI_MISSING_TTL = 7 * 24 * 3600
+
+# Crossref erlaubt im polite pool wenige parallele Verbindungen und ca. 10 Anfragen pro Sekunde
+MAX_WORKERS = 3
+REQUESTS_PER_SECOND = 10
+MAX_RETRIES = 3
+
+HEADERS = {
+    "User-Agent": "ChemoBot/1.0 (https://de.wikipedia.org/wiki/Benutzer:ChemoBot; mailto:mail@example.org)"
+}
+
+# Zustand des aktuellen Laufs
+_cache = None
+_session = None
+_wait = make_rate_limiter(REQUESTS_PER_SECOND)
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+lookups = 0
+
+
+def get_session():
+    """
+    Liefert die gemeinsame Session mit einem Verbindungspool für alle Threads.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def get_cache():
+    """
+    Lädt den DOI-Cache (einmal pro Lauf).
+
+    Returns:
+        dict: {DOI in Kleinbuchstaben: [bekannt, Zeitpunkt der Prüfung]}
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_json_cache(DOI_CACHE_FILE, {})
+    return _cache
+
+
+def get_cached(doi, now=None):
+    """
+    Liefert das gespeicherte Ergebnis für eine DOI, falls es noch gültig ist.
+
+    Args:
+        doi: Die DOI in Kleinbuchstaben.
+        now: Aktueller Zeitpunkt (Sekunden seit Epoch).
+
+    Returns:
+        True/False oder None, wenn die DOI neu geprüft werden muss.
+    """
+    entry = get_cache().get(doi)
+    if not entry:
+        return None
+    exists, checked = entry
+    ttl = DOI_FOUND_TTL if exists else DOI_MISSING_TTL
+    if (now or time.time()) - checked > ttl:
+        return None
+    return exists
+
+
+def lookup_doi(doi, timeout=15):
+    """
+    Fragt eine DOI bei Crossref ab.
+
+    Args:
+        doi: Die DOI.
+        timeout: Timeout der Anfrage in Sekunden.
+
+    Returns:
+        True (bekannt), False (404) oder None bei Fehlern.
+    """
+    session = get_session()
+    for attempt in range(MAX_RETRIES):
+        _wait()
+        try:
+            response = session.get(CROSSREF_URL + doi, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"Netzwerkfehler: {e}")
+            return None
+
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            print(f"DOI existiert nicht (404): {doi}")
+            return False
+        if response.status_code in (429, 503):
+            # zu viele Anfragen: so lange warten, wie Crossref verlangt
+            retry_after = response.headers.get("Retry-After", "")
+            time.sleep(int(retry_after) if retry_after.isdigit() else 2 ** attempt)
+            continue
+
+        print(f"Unerwarteter Statuscode: {response.status_code}")
+        return None
+
+    return None
+
+
+def check_dois(dois):
+    """
+    Prüft mehrere DOIs, gespeicherte Ergebnisse werden ohne Anfrage zurückgegeben.
+
+    Args:
+        dois: Liste von DOIs.
+
+    Returns:
+        dict: {DOI: bei Crossref bekannt}, ungültige DOIs und Fehler ergeben False.
+    """
+    global cache_hits, lookups
+
+    now = time.time()
+    results = {}
+    missing = {}
+    for doi in dois:
+        if not doi:
+            results[doi] = False
+            continue
+        key = doi.strip().lower()
+        if not DOI_PATTERN.match(key):
+            print(f"DOI hat ungültiges Format: {doi}")
+            results[doi] = False
+            continue
+        cached = get_cached(key, now)
+        if cached is None:
+            missing.setdefault(key, []).append(doi)
+        else:
+            cache_hits += 1
+            results[doi] = cached
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            verdicts = dict(zip(missing, executor.map(lookup_doi, missing)))
+        lookups += len(verdicts)
+
+        cache = get_cache()
+        for key, exists in verdicts.items():
+            if exists is not None:
+                cache[key] = [exists, now]
+            for doi in missing[key]:
+                results[doi] = bool(exists)
+        save_json_cache(DOI_CACHE_FILE, cache)
+
+    return results
+
+
+def doi_exists(doi):
+    """
+    Prüft eine einzelne DOI (siehe check_dois).
+    """
+    return check_dois([doi])[doi]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Offline-Durchlauf über einen XML-Dump (z.B. dewiki-latest-pages-articles.xml.bz2).
+
+Der Dump wird beim Lesen entpackt und Seite für Seite mit iterparse verarbeitet,
+bereits gelesene Elemente werden sofort freigegeben, so dass der Speicherbedarf
+unabhängig von der Dumpgröße bleibt. Die Skripte prüfen die Dumptexte lokal und
+laden nur die Treffer live, um sie mit dem aktuellen Text erneut zu prüfen und zu speichern.
+"""
+
+import bz2
+import time
+import xml.etree.ElementTree as ET
+from helperfunctions import human_readable_time_difference
+
+
+def local_name(tag):
+    """
+    Entfernt den XML-Namensraum aus einem Tag ("{http://...}page" -> "page").
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def open_dump(dump_file):
+    """
+    Öffnet einen Dump, .bz2-Dateien werden beim Lesen entpackt.
+
+    Args:
+        dump_file: Pfad des Dumps.
+
+    Returns:
+        Ein binäres Dateiobjekt.
+    """
+    if dump_file.endswith(".bz2"):
+        return bz2.open(dump_file, "rb")
+    return open(dump_file, "rb")
+
+
+def iter_dump_pages(dump_file, titles=None, namespaces=(0,)):
+    """
+    Liest die Seiten eines XML-Dumps nacheinander.
+
+    Args:
+        dump_file: Pfad des Dumps.
+        titles: Menge der gewünschten Seitentitel (None = alle).
+        namespaces: Erlaubte Namensräume.
+
+    Yields:
+        tuple: (Titel, Wikitext, revid) für jede passende Seite mit Text, die keine Weiterleitung ist.
+    """
+    with open_dump(dump_file) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        root = None
+
+        for event, elem in context:
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            if local_name(elem.tag) != "page":
+                continue
+
+            title = None
+            ns = None
+            revid = None
+            text = None
+            is_redirect = False
+            for child in elem:
+                name = local_name(child.tag)
+                if name == "title":
+                    title = child.text
+                elif name == "ns":
+                    ns = int(child.text)
+                elif name == "redirect":
+                    is_redirect = True
+                elif name == "revision":
+                    for field in child:
+                        field_name = local_name(field.tag)
+                        if field_name == "id":
+                            revid = int(field.text)
+                        elif field_name == "text":
+                            # leerer oder gelöschter Text (<text/>, <text deleted="deleted"/>) wird übergangen
+                            text = field.text
+
+            # Speicher sofort freigeben
+            elem.clear()
+            root.clear()
+
+            if ns not in namespaces or is_redirect or text is None:
+                continue
+            if titles is not None and title not in titles:
+                continue
+
+            yield title, text, revid
+
+
+def find_dump_candidates(dump_file, titles, check):
+    """
+    Prüft die Texte aus dem Dump und liefert die Titel der Treffer.
+
+    Args:
+        dump_file: Pfad des Dumps.
+        titles: Menge der zu prüfenden Seitentitel.
+        check: Funktion check(title, text) -> True bei einem Treffer.
+
+    Returns:
+        list: Titel der Seiten, bei denen check angeschlagen hat.
+    """
+    start_time = time.time()
+    titles = set(titles)
+    candidates = []
+    pages_read = 0
+
+    for title, text, revid in iter_dump_pages(dump_file, titles):
+        pages_read += 1
+        if check(title, text):
+            candidates.append(title)
+
+    print(f"Dump: {pages_read} von {len(titles)} Seiten gefunden, {len(candidates)} Treffer ({human_readable_time_difference(start_time, time.time())})")
+    return candidates
+
+
+def dump_candidate_pages(site, dump_file, titles, check):
+    """
+    Wie find_dump_candidates, liefert aber die Treffer als live geladene Seiten,
+    damit sie mit dem aktuellen Text erneut geprüft und gespeichert werden können.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        dump_file: Pfad des Dumps.
+        titles: Menge der zu prüfenden Seitentitel.
+        check: Funktion check(title, text) -> True bei einem Treffer.
+
+    Returns:
+        Ein Generator für Seiten.
+    """
+    # Import erst hier, damit iter_dump_pages auch ohne pywikibot nutzbar ist (z.B. mit einem kleinen Test-Dump)
+    from categorysnapshot import pages_from_titles
+    return pages_from_titles(site, find_dump_candidates(dump_file, titles, check))
@@ -3,6 +3,7 @@ from pywikibot import pagegenerators
 import time
 import re
 from helperfunctions import translate_substance_name_to_englisch, human_readable_time_difference
+from backlinkcount import has_more_backlinks
 
 def get_all_pages_in_category(cat, recurse=True):
     """Rekursiv alle Seiten in einer Kategorie sammeln, mit Fortschrittsanzeige."""
@@ -43,6 +44,11 @@ def main(kategoriename):
 
     print("\nLaufzeit Kats: ", human_readable_time_difference(start_time, time.time()))
     
+    # direkte Links (ohne Weiterleitungen und Selbstlinks) in Blöcken zu 50 prüfen, nur bis zum ersten Link
+    linked = has_more_backlinks(site, [page.title() for page in all_pages], 0, exclude_redirects=True, exclude_self=True)
+
+    print("\nLaufzeit Links: ", human_readable_time_difference(start_time, time.time()))
+
     preloaded_pages = pagegenerators.PreloadingGenerator(all_pages, groupsize=50)
 
     unlinked_pages = []
@@ -51,6 +57,10 @@ def main(kategoriename):
         if page.isRedirectPage():
             continue
 
+        if linked[page.title()]:
+            continue
+
+        # ohne direkten Link: auch Links über Weiterleitungen berücksichtigen
         backlinks = list(page.backlinks(filter_redirects=False, namespaces=[0]))
         backlinks = [bl for bl in backlinks if bl.title() != page.title()]
         
@@ -1,110 +1,288 @@
 import re
+import os
+import heapq
+import json
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+# Verzeichnis für lokal gespeicherte Zwischenstände (Snapshots, Caches)
+CACHE_DIR = "cache"
+
+
+def trie_to_regex(node):
+    """
+    Wandelt einen Präfixbaum in einen regulären Ausdruck um, so dass an jeder Position
+    nur die möglichen nächsten Zeichen geprüft werden. Der Ausdruck passt auf den
+    längsten Eintrag, der an einer Position beginnt.
+    """
+    alternatives = [re.escape(char) + trie_to_regex(child) for char, child in sorted(node.items()) if char]
+    if not alternatives:
+        return ""
+    regex = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        # hier endet bereits ein Eintrag, die Fortsetzung ist optional
+        regex = "(?:" + regex + ")?"
+    return regex
+
+
+def create_literal_matcher(literals):
+    """
+    Übersetzt feste Texte einmal in einen regulären Ausdruck, mit dem find_literals alle
+    in einem Text vorkommenden Einträge in einem Durchlauf findet (auch überlappende).
+
+    Args:
+        literals: Menge von Texten.
+
+    Returns:
+        dict: Der Matcher für find_literals.
+    """
+    literals = {literal for literal in literals if literal}
+
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        # "" markiert das Ende eines Eintrags
+        node[""] = literal
+
+    # Zu jedem Eintrag die Einträge, die an derselben Stelle beginnen und in ihm enthalten sind
+    # (z.B. "Journal of Chemistry" in "Journal of Chemistry and Applied Chemical Engineering")
+    prefixes = {literal: tuple(literal[:end] for end in range(1, len(literal) + 1) if literal[:end] in literals) for literal in literals}
+
+    # Der Lookahead findet an jeder Position den längsten Eintrag
+    pattern = re.compile("(?=(" + trie_to_regex(trie) + "))") if literals else None
+
+    return {"prefixes": prefixes, "pattern": pattern}
+
+
+def find_literals(matcher, text):
+    """
+    Liefert alle Einträge des Matchers, die im Text vorkommen (wie "literal in text").
+    """
+    found = set()
+    if matcher["pattern"] is None:
+        return found
+
+    prefixes = matcher["prefixes"]
+    for longest in matcher["pattern"].findall(text):
+        found.update(prefixes[longest])
+    return found
+
+
+# Ersetzungen für translate_substance_name_to_englisch, die Reihenfolge ist die Anwendungsreihenfolge
+SUBSTANCE_NAME_REPLACEMENTS = [
+    ("essigsäure", "acetic acid"),
+    ("benzoesäure", "benzoic acid"),
+    ("propansäure", "propanoic acid"),
+    ("andelsäure", "andelic acid"),
+    ("salicylsäure", "salicylic acid"),
+    ("catechusäure", "catechuic acid"),
+    ("allussäure", "allic acid"),
+    ("phthalsäure", "phthalic acid"),
+    ("uttersäure", "utyric acid"),
+    ("hosphonsäure", "hosphorous acid"),
+    ("cyansäure", "cyanic acid"),
+    ("diensäure", "dienoic acid"),
+    ("weinsäure", "tartaric acid"),
+    ("ylsäure", "ylic acid"),
+    ("insäure", "inic acid"),
+    ("ilsäure", "ilic acid"),
+    ("onsäure", "onic acid"),
+    ("olsäure", "olic acid"),
+    ("oesäure", "oic acid"),
+    ("säure", " acid"),
+    ("naphthalin", "naphthalene"),
+    ("chinone", "quinone"),
+    ("chinon", "quinone"),
+    ("cumarin", "coumarin"),
+    ("Natrium", "Sodium "),
+    ("natrium", "sodium "),
+    ("Kalium", "Potassium "),
+    ("kalium", "potassium "),
+    ("Mangan", "Manganese "),
+    ("mangan", "manganese "),
+    ("enzol", "enzene"),
+    ("oxazol", "oxazole"),
+    ("azetat", "acetate"),
+    ("aldehyd", "aldehyde"),
+    ("azin", "azine"),
+    ("pikryl", "picryl"),
+    ("zucker", " sugar"),
+    ("ethinyl", "ethynyl"),
+    ("citrat", "citrate"),
+    ("laurin", "laurine"),
+    ("phosphat", "phosphate"),
+    ("phenolat", "phenolate"),
+    ("silicat", "silicate"),
+    ("than", "thane"),
+    ("phthalat", "phthalate"),
+    ("oluol", "oluene"),
+    ("resorcin", "resorcinol"),
+    ("imonen-", "imonene-"),
+    ("Brenzcatechin", "Catechol"),
+    ("brenzcatechin", "catechol"),
+    ("farbstoff", " dye"),
+    (" (Chemie)", ""),
+    ("Salz", "Salt"),
+    ("salz", "salt"),
+    ("harz", "resin"),
+    ("blei", "lead "),
+    ("Blei", "Lead "),
+    ("Eisen", "Iron "),
+    ("eisen", "iron "),
+    ("Titan", "Titanium "),
+    ("titan", "titanium "),
+    ("Zink", "Zinc "),
+    ("zink", "zinc "),
+    ("Wolfram", "Tungsten "),
+    ("wolfram", "tungsten "),
+    ("Zinn", "Tin "),
+    ("zinn", "tin "),
+    ("Quecksilber", "Mercury "),
+    ("quecksilber", "mercury "),
+    ("Silber", "Silver "),
+    ("silber", "silver "),
+    ("molybdän", "molybdenum "),
+    ("Molybdän", "Molybdenum "),
+    ("folin", "foline"),
+]
+
+# bereits übersetzte Namen: {deutscher Name: englischer Name}
+_translation_cache = {}
+
+
+def replacements_interfere(pattern, text):
+    """
+    Prüft, ob ein Treffer von pattern einen Text (z.B. die Ersetzung einer früheren Regel)
+    ganz oder teilweise überdecken kann.
+    """
+    if pattern in text or text in pattern:
+        return True
+    for length in range(1, min(len(pattern), len(text))):
+        if pattern[:length] == text[-length:] or pattern[-length:] == text[:length]:
+            return True
+    return False
+
+
+def compile_replacements(replacements):
+    """
+    Bereitet eine geordnete Ersetzungstabelle für apply_replacements vor.
+
+    Args:
+        replacements: Liste von Tupeln (Suchtext, Ersetzung) in Anwendungsreihenfolge.
+
+    Returns:
+        dict: Die Tabelle, {Suchtext: Position}, ein Matcher über alle Suchtexte und zu jeder
+        Regel die späteren Regeln, deren Suchtext durch ihre Ersetzung entstehen kann.
+    """
+    created = [
+        [later for later in range(index + 1, len(replacements)) if replacements_interfere(replacements[later][0], replacement)]
+        for index, (pattern, replacement) in enumerate(replacements)
+    ]
+    return {
+        "replacements": replacements,
+        "positions": {pattern: index for index, (pattern, replacement) in reversed(list(enumerate(replacements)))},
+        "matcher": create_literal_matcher(pattern for pattern, replacement in replacements),
+        "created": created,
+    }
+
+
+def apply_replacements(compiled, text):
+    """
+    Wendet die Ersetzungen an, mit demselben Ergebnis wie die str.replace-Aufrufe nacheinander.
+    Ein Durchlauf des Matchers bestimmt, welche Regeln greifen, nur diese werden ausgeführt.
+    Nach einer Ersetzung werden nur die späteren Regeln geprüft, deren Suchtext dabei entstanden sein kann.
+    """
+    replacements = compiled["replacements"]
+    created = compiled["created"]
+
+    pending = [compiled["positions"][pattern] for pattern in find_literals(compiled["matcher"], text)]
+    heapq.heapify(pending)
+    last_index = -1
+    while pending:
+        index = heapq.heappop(pending)
+        if index == last_index:
+            continue
+        last_index = index
+        pattern, replacement = replacements[index]
+        text = text.replace(pattern, replacement)
+        for later in created[index]:
+            if replacements[later][0] in text:
+                heapq.heappush(pending, later)
+    return text
+
+
+SUBSTANCE_NAME_RULES = compile_replacements(SUBSTANCE_NAME_REPLACEMENTS)
+ENDING_S_PATTERN = re.compile(r"e$")
+NO_ENDING_S_PATTERN = re.compile(r"(säure|ose|ase)$")
+ENDING_E_PATTERN = re.compile(r"(on|id|en|din|mid|dol)$")
+
 
 def translate_substance_name_to_englisch(substance_name):
-    if bool(re.search(r"e$" , substance_name)) and not re.search(r"(säure|ose|ase)$", substance_name):
+    """
+    Übersetzt einen deutschen Substanznamen näherungsweise ins Englische (für Suchen).
+    Die Ergebnisse werden für den ganzen Lauf gemerkt.
+
+    Args:
+        substance_name: Der deutsche Name, z.B. "Benzoesäure".
+
+    Returns:
+        String: Der englische Name.
+    """
+    translated = _translation_cache.get(substance_name)
+    if translated is None:
+        translated = _translation_cache[substance_name] = _translate_substance_name(substance_name)
+    return translated
+
+
+def translate_substance_names_to_englisch(substance_names):
+    """
+    Übersetzt viele Namen auf einmal, jeder Name wird nur einmal übersetzt.
+
+    Args:
+        substance_names: Liste deutscher Namen.
+
+    Returns:
+        dict: {deutscher Name: englischer Name}
+    """
+    return {name: translate_substance_name_to_englisch(name) for name in substance_names}
+
+
+def _translate_substance_name(substance_name):
+    if ENDING_S_PATTERN.search(substance_name) and not NO_ENDING_S_PATTERN.search(substance_name):
         substance_name += "s"
-    elif re.search(r"(on|id|en|din|mid|dol)$", substance_name):
+    elif ENDING_E_PATTERN.search(substance_name):
         substance_name += "e"
-#    else:
-#        print("nothing")
-    substance_name = substance_name.replace("essigsäure", "acetic acid")
-    substance_name = substance_name.replace("benzoesäure", "benzoic acid")
-    substance_name = substance_name.replace("propansäure", "propanoic acid")
-    substance_name = substance_name.replace("andelsäure", "andelic acid")
-    substance_name = substance_name.replace("salicylsäure", "salicylic acid")
-    substance_name = substance_name.replace("catechusäure", "catechuic acid")
-    substance_name = substance_name.replace("allussäure", "allic acid")
-    substance_name = substance_name.replace("phthalsäure", "phthalic acid")
-    substance_name = substance_name.replace("uttersäure", "utyric acid")
-    substance_name = substance_name.replace("hosphonsäure", "hosphorous acid")
-    substance_name = substance_name.replace("cyansäure", "cyanic acid")
-    substance_name = substance_name.replace("diensäure", "dienoic acid")
-    substance_name = substance_name.replace("weinsäure", "tartaric acid")
-    substance_name = substance_name.replace("ylsäure", "ylic acid")
-    substance_name = substance_name.replace("insäure", "inic acid")
-    substance_name = substance_name.replace("ilsäure", "ilic acid")
-    substance_name = substance_name.replace("onsäure", "onic acid")
-    substance_name = substance_name.replace("olsäure", "olic acid")
-    substance_name = substance_name.replace("oesäure", "oic acid")
-    substance_name = substance_name.replace("säure", " acid")
-    substance_name = substance_name.replace("naphthalin", "naphthalene")
-    substance_name = substance_name.replace("chinone", "quinone")
-    substance_name = substance_name.replace("chinon", "quinone")
-    substance_name = substance_name.replace("cumarin", "coumarin")
-    substance_name = substance_name.replace("Natrium", "Sodium ")
-    substance_name = substance_name.replace("natrium", "sodium ")
-    substance_name = substance_name.replace("Kalium", "Potassium ")
-    substance_name = substance_name.replace("kalium", "potassium ")
-    substance_name = substance_name.replace("Mangan", "Manganese ")
-    substance_name = substance_name.replace("mangan", "manganese ")
-    substance_name = substance_name.replace("enzol", "enzene")
-    substance_name = substance_name.replace("oxazol", "oxazole")
-    substance_name = substance_name.replace("azetat", "acetate")
-    substance_name = substance_name.replace("aldehyd", "aldehyde")
-    substance_name = substance_name.replace("azin", "azine")
-    substance_name = substance_name.replace("pikryl", "picryl")
-    substance_name = substance_name.replace("zucker", " sugar")
-    substance_name = substance_name.replace("ethinyl", "ethynyl")
-    substance_name = substance_name.replace("citrat", "citrate")
-    substance_name = substance_name.replace("laurin", "laurine")
-    substance_name = substance_name.replace("phosphat", "phosphate")
-    substance_name = substance_name.replace("phenolat", "phenolate")
-    substance_name = substance_name.replace("silicat", "silicate")
-    substance_name = substance_name.replace("than", "thane")
-    substance_name = substance_name.replace("phthalat", "phthalate")
-    substance_name = substance_name.replace("oluol", "oluene")
-    substance_name = substance_name.replace("resorcin", "resorcinol")
-    substance_name = substance_name.replace("imonen-", "imonene-")
-    substance_name = substance_name.replace("Brenzcatechin", "Catechol")
-    substance_name = substance_name.replace("brenzcatechin", "catechol")
-    substance_name = substance_name.replace("farbstoff", " dye")
-    substance_name = substance_name.replace(" (Chemie)", "")
-    substance_name = substance_name.replace("Salz", "Salt")
-    substance_name = substance_name.replace("salz", "salt")
-    substance_name = substance_name.replace("harz", "resin")
-    substance_name = substance_name.replace("blei", "lead ")
-    substance_name = substance_name.replace("Blei", "Lead ")
-    substance_name = substance_name.replace("Eisen", "Iron ")
-    substance_name = substance_name.replace("eisen", "iron ")
-    substance_name = substance_name.replace("Titan", "Titanium ")
-    substance_name = substance_name.replace("titan", "titanium ")
-    substance_name = substance_name.replace("Zink", "Zinc ")
-    substance_name = substance_name.replace("zink", "zinc ")
-    substance_name = substance_name.replace("Wolfram", "Tungsten ")
-    substance_name = substance_name.replace("wolfram", "tungsten ")
-    substance_name = substance_name.replace("Zinn", "Tin ")
-    substance_name = substance_name.replace("zinn", "tin ")
-    substance_name = substance_name.replace("Quecksilber", "Mercury ")
-    substance_name = substance_name.replace("quecksilber", "mercury ")
-    substance_name = substance_name.replace("Silber", "Silver ")
-    substance_name = substance_name.replace("silber", "silver ")
-    substance_name = substance_name.replace("molybdän", "molybdenum ")
-    substance_name = substance_name.replace("Molybdän", "Molybdenum ")
-    substance_name = substance_name.replace("folin", "foline")
-   
-    if not "bromid" in substance_name.lower():
-        substance_name = substance_name.replace("brom", "bromo")    
-        substance_name = substance_name.replace("Brom", "bromo")
-
-    if "fluoranthen" in substance_name.lower():
-        substance_name = substance_name.replace("fluoranthen", "fluoranthene")        
-        substance_name = substance_name.replace("fluoranthenee", "fluoranthene")        
-    elif "fluoranthen" in substance_name.lower(): 
-        substance_name = substance_name.replace("fluoriden", "fluorene")
-    elif "fluorenon" in substance_name.lower(): 
+
+    substance_name = apply_replacements(SUBSTANCE_NAME_RULES, substance_name)
+
+    # Kleinschreibung nur neu berechnen, wenn sich der Name geändert hat
+    lower_name = substance_name.lower()
+
+    if not "bromid" in lower_name:
+        substance_name = substance_name.replace("brom", "bromo").replace("Brom", "bromo")
+        lower_name = substance_name.lower()
+
+    if "fluoranthen" in lower_name:
+        substance_name = substance_name.replace("fluoranthen", "fluoranthene").replace("fluoranthenee", "fluoranthene")
+        lower_name = substance_name.lower()
+    elif "fluorenon" in lower_name:
         substance_name = substance_name.replace("fluorenon", "fluorenone")
-    else:
-        if not "fluorid" in substance_name.lower() and not "fluoren" in substance_name.lower():
-            substance_name = substance_name.replace("fluor", "fluoro")
-            substance_name = substance_name.replace("Fluor", "fluoro")
+        lower_name = substance_name.lower()
+    elif not "fluorid" in lower_name and not "fluoren" in lower_name:
+        substance_name = substance_name.replace("fluor", "fluoro").replace("Fluor", "fluoro")
+        lower_name = substance_name.lower()
 
-    if not "chlorid" in substance_name.lower():
-        substance_name = substance_name.replace("chlor", "chloro")
-        substance_name = substance_name.replace("Chlor", "chloro")
+    if not "chlorid" in lower_name:
+        substance_name = substance_name.replace("chlor", "chloro").replace("Chlor", "chloro")
+        lower_name = substance_name.lower()
 
-    if not "iodid" in substance_name.lower() and not "iodo" in substance_name.lower():
-        substance_name = substance_name.replace("iod", "iodo")
-        substance_name = substance_name.replace("Iod", "Iodo")
+    if not "iodid" in lower_name and not "iodo" in lower_name:
+        substance_name = substance_name.replace("iod", "iodo").replace("Iod", "Iodo")
 
     return substance_name
 
@@ -137,3 +315,218 @@ def human_readable_time_difference(start_time, end_time):
 
     return ', '.join(result)
 
+
+def cache_path(filename):
+    """
+    Liefert den Pfad einer Datei im lokalen Cache-Verzeichnis.
+
+    Args:
+        filename: Name der Cache-Datei.
+
+    Returns:
+        String: Pfad zur Cache-Datei.
+    """
+    return os.path.join(CACHE_DIR, filename)
+
+
+def load_json_cache(filename, default):
+    """
+    Lädt eine JSON-Cache-Datei.
+
+    Args:
+        filename: Pfad der Cache-Datei.
+        default: Rückgabewert, falls die Datei fehlt oder nicht lesbar ist.
+
+    Returns:
+        Der Inhalt der Datei oder default.
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        if os.path.exists(filename):
+            print(f"Cache {filename} nicht lesbar, beginne neu: {e}")
+        return default
+
+
+def save_json_cache(filename, data):
+    """
+    Speichert eine JSON-Cache-Datei. Es wird erst in eine temporäre Datei
+    geschrieben und diese dann umbenannt, damit ein Abbruch keinen halben Cache hinterlässt.
+
+    Args:
+        filename: Pfad der Cache-Datei.
+        data: Zu speichernde Daten.
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_filename, filename)
+
+
+def load_pickle_cache(filename, default):
+    """
+    Lädt eine binäre Cache-Datei (pickle), z.B. für große Sets, die schnell geladen werden sollen.
+
+    Args:
+        filename: Pfad der Cache-Datei.
+        default: Rückgabewert, falls die Datei fehlt oder nicht lesbar ist.
+
+    Returns:
+        Der Inhalt der Datei oder default.
+    """
+    try:
+        with open(filename, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        if os.path.exists(filename):
+            print(f"Cache {filename} nicht lesbar, beginne neu: {e}")
+        return default
+
+
+def save_pickle_cache(filename, data):
+    """
+    Speichert eine binäre Cache-Datei (pickle), ebenfalls über eine temporäre Datei.
+
+    Args:
+        filename: Pfad der Cache-Datei.
+        data: Zu speichernde Daten.
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_filename, filename)
+
+
+def batched(items, size=50):
+    """
+    Teilt eine Folge in Listen mit höchstens size Elementen auf
+    (50 ist die Obergrenze für titles=/ids= bei API-Abfragen ohne Bot-Recht).
+
+    Args:
+        items: Beliebiges Iterable.
+        size: Maximale Größe eines Blocks.
+
+    Yields:
+        list: Der jeweils nächste Block.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# gemeinsame Begrenzung der API-Anfragen über alle Threads (siehe set_api_rate_limit)
+_api_wait = None
+
+
+def set_api_rate_limit(calls_per_second):
+    """
+    Begrenzt alle Anfragen über api_query auf calls_per_second pro Sekunde, auch wenn
+    mehrere Threads gleichzeitig abfragen.
+
+    Args:
+        calls_per_second: Erlaubte Anfragen pro Sekunde oder None für keine Begrenzung.
+    """
+    global _api_wait
+    _api_wait = make_rate_limiter(calls_per_second) if calls_per_second else None
+
+
+def api_query(site, **params):
+    """
+    Führt eine API-Abfrage aus und folgt allen Fortsetzungen (continue).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        **params: Parameter der Abfrage, action=query und formatversion=2 werden ergänzt.
+
+    Yields:
+        dict: Die Antwort jeder Teilabfrage.
+    """
+    params.setdefault("action", "query")
+    params.setdefault("formatversion", 2)
+
+    while True:
+        if _api_wait:
+            _api_wait()
+        data = site.simple_request(**params).submit()
+        yield data
+
+        if "continue" in data:
+            params.update(data["continue"])
+        else:
+            break
+
+
+def make_rate_limiter(calls_per_second):
+    """
+    Erzeugt eine Funktion, die vor jedem Aufruf so lange wartet, dass insgesamt (auch über
+    mehrere Threads) höchstens calls_per_second Aufrufe pro Sekunde stattfinden.
+
+    Args:
+        calls_per_second: Erlaubte Aufrufe pro Sekunde.
+
+    Returns:
+        Funktion ohne Argumente, die vor jeder Anfrage aufgerufen wird.
+    """
+    interval = 1.0 / calls_per_second
+    lock = threading.Lock()
+    state = {"next": 0.0}
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            start = max(now, state["next"])
+            state["next"] = start + interval
+        if start > now:
+            time.sleep(start - now)
+
+    return wait
+
+
+def run_stages(stages, max_workers=4):
+    """
+    Führt voneinander unabhängige Arbeitsschritte parallel aus. Ein Schritt startet,
+    sobald alle Schritte, von denen er abhängt, fertig sind.
+
+    Args:
+        stages: dict {Name: (Funktion, [Namen der vorausgesetzten Schritte])}, die Funktion
+            bekommt das dict der bisherigen Ergebnisse.
+        max_workers: Anzahl gleichzeitig laufender Schritte.
+
+    Returns:
+        tuple: ({Name: Ergebnis}, {Name: Laufzeit in Sekunden})
+    """
+    results = {}
+    timings = {}
+    pending = dict(stages)
+    running = {}
+
+    def timed(name, func):
+        start = time.monotonic()
+        result = func(results)
+        timings[name] = time.monotonic() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, (func, requires) in list(pending.items()):
+                if all(required in results for required in requires):
+                    running[executor.submit(timed, name, func)] = name
+                    del pending[name]
+            if not running:
+                raise ValueError(f"Schritte mit unerfüllten Abhängigkeiten: {', '.join(pending)}")
+
+            done, not_done = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return results, timings
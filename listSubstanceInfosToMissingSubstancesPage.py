@@ -4,6 +4,7 @@ from collections import defaultdict
 import re
 import time
 import traceback
+from titleindex import create_title_index, find_title
 
 pages_checked = 0
 pages_changed = 0
@@ -231,6 +232,11 @@ def main():
     # fehlende Substanzen Seite auswerten 
     missing_substances_list, missing_substances_list_wikidata = get_missing_substances_list(site)
 
+    # Titelindex für schnelle Abfragen, unabhängig von der Schreibweise (Unterstriche, erster Buchstabe, HTML-Entities)
+    known_titles = create_title_index({"Fehlende Substanzen": missing_substances_list, "Ausschlussliste": ignore_list})
+    excluded_pages = create_title_index({"Gruppenausschluss": exclusion_list})
+    missing_substances_list_wikidata = set(missing_substances_list_wikidata)
+
     # Vorlage, nach der gesucht werden soll
     template_name = "Substanzinfo"
 
@@ -256,7 +262,7 @@ def main():
     # Seiten mit der Vorlage auflisten und Parameter extrahieren
     for page in pages:
         # if not page.isRedirectPage() and ((page.namespace() == 0) or (page.title() == "Benutzer:Anagkai/Substanzinfos")):
-        if not page.isRedirectPage() and ((page.namespace() == 0) and not page.title() in exclusion_list):
+        if not page.isRedirectPage() and ((page.namespace() == 0) and find_title(excluded_pages, page.title()) is None):
             global pages_checked
             pages_checked += 1
 
@@ -282,7 +288,7 @@ def main():
                     wikidata = parameters['Wikidata']
                     # print(wikidata)
                     if name or wikidata:
-                        if (name not in missing_substances_list) and (name not in ignore_list) and (not wikidata or (wikidata not in missing_substances_list_wikidata)):
+                        if (find_title(known_titles, name) is None) and (not wikidata or (wikidata not in missing_substances_list_wikidata)):
                             key = (name, wikidata)
                             data_to_pages[key].append("[[" + page.title() + "]]")
                             if 'CAS' in parameters:
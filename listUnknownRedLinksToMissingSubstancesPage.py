@@ -2,21 +2,23 @@
 # -*- coding: utf-8 -*-
 
 import pywikibot
-from pywikibot import pagegenerators
-import itertools
 import time
 import traceback
 import re
 import requests
 import mwparserfromhell
-from helperfunctions import translate_substance_name_to_englisch, human_readable_time_difference
-from typing import Optional
+from helperfunctions import translate_substance_name_to_englisch, human_readable_time_difference, batched
+from categorysnapshot import get_category_titles
+from redlinkresolver import find_red_links_bulk
+from titleindex import create_title_index, find_title
+import caslookup
+from taxonomy import classify_taxa, print_taxonomy_statistics
 import argparse
 from datetime import datetime, timedelta, timezone, UTC
 
 # Globale Variablen
 pages_checked = 0
-rotlinks = {}  # Dictionary der Rotlinks: {Rotlink: [Seitennamen]}
+rotlinks = {}  # Dictionary der Rotlinks: {Rotlink: set(Seitennamen)}
 
 def get_missing_substances_list(site, page_title):
     """
@@ -206,68 +208,13 @@ def find_red_links(page):
     """
     try:
         # Filtere nur nicht existierende Seiten
-        return [
-            linked_page.title()
-            for linked_page in page.linkedPages()
-            if not linked_page.exists() and linked_page.namespace() == 0 and not linked_page.title().startswith("Vorlage:")
-        ]
+        return find_red_links_bulk(page.site, [page.title()])[page.title()]
     except Exception as e:
         traceback.print_exc()
         print(f"Fehler beim Abrufen der verlinkten Artikel: {e}")
         return []
 
 
-def get_pages_in_category(category_name, site, content=True):
-    """
-    Ruft alle Seiten in einer Kategorie und deren Unterkategorien ab.
-
-    Args:
-        category_name: Der Name der Kategorie.
-        site: Das pywikibot.Site-Objekt, das die Wikipedia-Site repräsentiert.
-
-    Returns:
-        Ein Generator für Seiten in der Kategorie und deren Unterkategorien.
-    """
-    category = pywikibot.Category(site, category_name)
-    ret = pagegenerators.CategorizedPageGenerator(category, recurse=True, content=False)
-    
-    count = sum(1 for _ in ret)
-    print(f"Anzahl der Seiten in der Kategorie: {count}")
-    print(f"content: {content}")
-    
-    ret = pagegenerators.CategorizedPageGenerator(category, recurse=True, content=content)
-
-    return ret
-
-
-def filter_pages(target_pages_gen, exclusion_pages_gen):
-    """
-    Filters pages that are in target_pages but not in exclusion_pages
-    and prevents duplicate pages.
-    """
-
-    special_excludes = {''}
-
-    exclusion_titles = {page.title() for page in exclusion_pages_gen}
-
-    seen_titles = set()   # <-- HIER passiert die Magie
-
-    for page in target_pages_gen:
-        title = page.title()
-
-        if title in seen_titles:
-            continue  # Duplikat → überspringen
-
-        seen_titles.add(title)
-
-        if (
-            title not in exclusion_titles
-            and not page.isRedirectPage()
-            and title not in special_excludes
-        ):
-            yield page
-
-
 def search_wikidata_number(cas_number):
     url = f"https://tools.wmflabs.org/wikidata-todo/resolver.php?prop=231&value={cas_number}"  # Beispiel für eine umleitende URL
     response = requests.get(url, allow_redirects=True)
@@ -281,161 +228,37 @@ def search_wikidata_number(cas_number):
         return q_number
     return ""
 
-def search_cas_number(chemical_name):
+def cas_query(chemical_name):
     """
-    Ruft die Common Chemistry-Suchseite mit dem angegebenen Namen auf
-    und prüft, ob eine CAS-Nummer enthalten ist.
-    
+    Liefert den englischen Suchbegriff für die CAS-Suche.
+
     Args:
         chemical_name (str): Der Name der chemischen Verbindung.
-    
+
     Returns:
-        str: Gefundene CAS-Nummer oder leerer String, wenn keine gefunden wurde.
+        str: Suchbegriff oder leerer String, wenn der Name nicht gesucht werden soll.
     """
-    
     # don't check suspicious names
     if " " in chemical_name:
-       return ""         
-        
-    chemical_name_org = chemical_name
-    chemical_name = translate_substance_name_to_englisch(chemical_name)
-    
-    url = f"https://commonchemistry.cas.org/results?q={chemical_name}"
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        match = re.search(r"(\d{2,8}-\d{2}-\d)", response.text)
-        
-        if match:
-            print(f"\"{chemical_name_org}\" -> \"{chemical_name}\" : commonchemistry = {match.group(1)}")
-            return match.group(1)
-        else:
-            url = f"https://www.chemicalbook.com/Search_EN.aspx?keyword={chemical_name}"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-                "Referer": "https://www.chemicalbook.com/" 
-                }
-
-            try:
-                response = requests.get(url, headers=headers,timeout=5)
-                response = requests.get(url, headers=headers,timeout=5) # retry
-            except Exception as e:
-                response.status_code = 408
-
-            if response.status_code == 200:
-                #print(response.text)
-                match = re.search(r"(<table.*?</table>)", response.text, re.DOTALL)
-                if match:
-                    # print(match.group(1))
-                    match = re.search(r"(\d{2,8}-\d{2}-\d)", match.group(1))
-                    if match:
-                        print(f"\"{chemical_name_org}\" -> \"{chemical_name}\" : chemicalbook = {match.group(1)}")
-                        return match.group(1)
-            else:
-                print(f"Fehler: {response.status_code} für {chemical_name} {url}")
-    else:
-        print(f"Fehler: {response.status_code} für {chemical_name} {url}")
-
-    #print(f"\"{chemical_name_org}\" -> \"{chemical_name}\" : None")
-    return ""
-
-TAXON_QID = "Q16521"
-GROUPS = {
-    "Q756": "tfpf", #"Pflanze",
-    "Q729": "tfti", #"Tier",
-    "Q764": "tfpi", #"Pilz",
-    "Q7868": "tfmi", #"Mikroorganismus", # Oberbegriff
-    "Q10876": "tfmi", #"Mikroorganismus",# Bacteria
-    "Q10850": "tfmi", #"Mikroorganismus",# Archaea
-    "Q808": "tfmi", #"Mikroorganismus",  # Virus
-    "Q474548": "tfmi", #"Mikroorganismus" # Protist
-}
-
-# globaler Cache: QID -> Liste der Parent-QIDs
-parent_cache: dict[str, list[str]] = {}
-
+        return ""
+    return translate_substance_name_to_englisch(chemical_name)
 
-def get_parents(item: pywikibot.ItemPage) -> list[str]:
-    """Hole Eltern (P171) eines Items, benutze Cache falls vorhanden."""
-    if item.id in parent_cache:
-        return parent_cache[item.id]
 
-    parents = []
-    for claim in item.claims.get("P171", []):
-        target = claim.getTarget()
-        if isinstance(target, pywikibot.ItemPage):
-            parents.append(target.id)
-
-    parent_cache[item.id] = parents
-    return parents
-
-
-def classify_taxon(name: str, language: str = "de") -> Optional[tuple[str, Optional[str]]]:
-    """
-    Suche ein Taxon nach Name und klassifiziere es als Pflanze, Tier, Pilz oder Mikroorganismus.
-    Gibt (QID, Gruppe) zurück oder None, falls kein Taxon gefunden.
+def search_cas_number(chemical_name):
     """
-    
-    if not " " in name:
-        return None, None
-    
-    site = pywikibot.Site("wikidata", "wikidata")
-    repo = site.data_repository()
-
-    # Suche Item
-    req = pywikibot.data.api.Request(
-        site=site,
-        parameters={
-            "action": "wbsearchentities",
-            "search": name,
-            "language": language,
-            "type": "item",
-            "limit": 5,
-        },
-    )
-    results = req.submit().get("search", [])
-    if not results:
-        return None, None
-
-    for hit in results:
-        qid = hit.get("id")
-        if not qid:
-            continue
-
-        item = pywikibot.ItemPage(repo, qid)
-        item.get()  # einmal laden
-
-        # Prüfen, ob es ein Taxon ist (P31 = taxon)
-        if not any(
-            (c.getTarget().id == TAXON_QID)
-            for c in item.claims.get("P31", [])
-            if c.getTarget()
-        ):
-            continue
-
-        # Baum hochlaufen (mit Cache durch Pywikibot intern)
-        visited = set()
-        queue = [item.id]
-        while queue:
-            cur_qid = queue.pop()
-            if cur_qid in visited:
-                continue
-            visited.add(cur_qid)
+    Sucht die CAS-Nummer zu einem Namen (über den gemeinsamen CAS-Cache).
 
-            # Prüfen, ob Obergruppe erreicht
-            if cur_qid in GROUPS:
-                return qid, GROUPS[cur_qid]
-
-            # Eltern holen
-            cur_item = pywikibot.ItemPage(repo, cur_qid)
-            cur_item.get()
-            queue.extend(get_parents(cur_item))
+    Args:
+        chemical_name (str): Der Name der chemischen Verbindung.
 
-        # kein Treffer im Baum → trotzdem QID zurück, Gruppe = None
-        return qid, None
+    Returns:
+        str: Gefundene CAS-Nummer oder leerer String, wenn keine gefunden wurde.
+    """
+    query = cas_query(chemical_name)
+    if not query:
+        return ""
+    return caslookup.search_cas_number(query)
 
-    return None, None
-    
 def update_wikipedia_page(site, rotlinks, last_page_name, reason):
 
     global pages_checked
@@ -461,6 +284,15 @@ def update_wikipedia_page(site, rotlinks, last_page_name, reason):
 
         print(f"Number of Redlinks = {len(sorted(rotlinks.keys()))}")
 
+        # CAS-Nummern der neuen Rotlinks vorab parallel suchen (bekannte Namen kommen aus dem Cache)
+        new_links = [red_link.strip() for red_link in rotlinks if f"[[{red_link.strip()}]]" not in section_content]
+        queries = {red_link: cas_query(red_link) for red_link in new_links}
+        cas_numbers = caslookup.find_cas_numbers([query for query in queries.values() if query])
+
+        # neue Rotlinks ohne CAS-Nummer gemeinsam als Taxa einordnen (Stammbäume aus dem Cache)
+        taxa = classify_taxa(site.data_repository(), [red_link for red_link in new_links if not cas_numbers.get(queries[red_link])])
+        print_taxonomy_statistics()
+
         for red_link in sorted(rotlinks.keys()):
 
             red_link = red_link.strip()
@@ -489,7 +321,7 @@ def update_wikipedia_page(site, rotlinks, last_page_name, reason):
                     else:
                         addon = f"{cas}"
                 else:
-                    wikidata, group = classify_taxon(red_link)
+                    wikidata, group = taxa.get(red_link, (None, None))
                     if (wikidata and wikidata != ""):
                         addon = f"{wikidata}"
                     if (group and addon2 == ""):
@@ -572,49 +404,6 @@ def get_changedate_of_comment(page, comment_filter):
 
     return None
 
-def get_all_category_members(site, cat_title):
-    visited_cats = set()
-    pages = set()
-
-    def walk_category(cat):
-        if cat in visited_cats:
-            return
-        visited_cats.add(cat)
-
-        params = {
-            "action": "query",
-            "list": "categorymembers",
-            "cmtitle": cat,
-            "cmlimit": "max",
-        }
-
-        while True:
-            data = site.simple_request(**params).submit()
-            members = data["query"]["categorymembers"]
-
-            for m in members:
-                title = m["title"]
-                ns = m["ns"]
-
-                # ns=14 → Kategorie
-                if ns == 14:
-                    walk_category(title)
-                else:
-                    pages.add(title)
-
-            if "continue" in data:
-                params.update(data["continue"])
-            else:
-                break
-
-    start_time = time.time()
-
-    walk_category(cat_title)
-    
-    print(f"{len(pages)} in Kategorie {cat_title} mit {len(visited_cats)} Unterkategorien in {human_readable_time_difference(start_time, time.time())}")
-    
-    return pages
-
 def get_recently_changed_new_articles_in_list(site, page_title, section_title, chemistry_article_list, days):
     """
     Liest den Abschnitt 'Rotlinks' einer Seite aus, extrahiert alle verlinkten Artikelnamen
@@ -807,7 +596,28 @@ def get_recently_changed_rotlinks_articles(site, page_title, section_title, days
 
     return younger_articles, unchanged_article_redlinks
 
-def process_category(category_names, exclusion_category_names, site, missing_substances_list, ignore_list, exclusion_list, intermediate_list):
+def add_red_links(page_title, red_links, known_titles):
+    """
+    Trägt die Rotlinks einer Seite ein, sofern sie in keiner der bekannten Listen stehen.
+
+    Args:
+        page_title: Titel der Seite, auf der die Rotlinks stehen.
+        red_links: Liste der Rotlinks der Seite.
+        known_titles: Titelindex der fehlenden, ignorierten und zwischengelagerten Einträge.
+
+    Returns:
+        int: Anzahl der neu gefundenen Rotlinks.
+    """
+    new_red_links = 0
+    for red_link in red_links:
+        if find_title(known_titles, red_link) is None:
+            if red_link not in rotlinks:
+                rotlinks[red_link] = set()
+                new_red_links += 1
+            rotlinks[red_link].add("[[" + page_title + "]]")
+    return new_red_links
+
+def process_category(category_names, exclusion_category_names, site, known_titles, excluded_pages):
     """
     Analysiert alle Seiten in einer Kategorie und deren Unterkategorien, um Rotlinks zu finden.
 
@@ -815,71 +625,41 @@ def process_category(category_names, exclusion_category_names, site, missing_sub
         category_names: Eine Liste von Zielkategorien.
         exclusion_category_names: Eine Liste von Kategorien, die ausgeschlossen werden sollen.
         site: Das pywikibot.Site-Objekt, das die Wikipedia-Site repräsentiert.
+        known_titles: Titelindex der fehlenden, ignorierten und zwischengelagerten Einträge.
+        excluded_pages: Titelindex der Seiten, deren Rotlinks nicht ausgewertet werden.
     """
-    target_pages = []
-    for inclusion_category_name in category_names:
-        print(f"Seiten in Kategorie {inclusion_category_name} abrufen...")
-        target_pages = itertools.chain(target_pages, get_pages_in_category(inclusion_category_name, site))
-
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"Seiten aus Kategorie {exclusion_category_name} ausschließen...")
-        exclusion_pages = itertools.chain(exclusion_pages, get_pages_in_category(exclusion_category_name, site, content=False))
-        
-    print("Filterung der Zielseiten...")
-    filtered_pages = filter_pages(target_pages, exclusion_pages)
+    # Seiten aus dem lokalen Kategorie-Snapshot (ohne Ausschlusskategorien und Weiterleitungen)
+    filtered_titles = get_category_titles(site, category_names, exclusion_category_names)
 
     redlink_count = 0
     last_page = ""
 
     print("Analyse der Seiten...")
-    for page in filtered_pages:
-        global pages_checked, rotlinks
-        pages_checked += 1
-
-        print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page.title()}")
-
-        if page.namespace() == 0 and not page.isRedirectPage() and not page.title() in exclusion_list:  # Nur Artikel im Hauptnamensraum analysieren
-            try:
-                red_links = find_red_links(page)
-                for red_link in red_links:
-                    if (red_link not in missing_substances_list):
-                        if (red_link not in ignore_list and red_link not in intermediate_list):
-                            if red_link not in rotlinks:
-                                rotlinks[red_link] = []
-                                redlink_count = redlink_count + 1
-                            title = "[[" + page.title() + "]]"
-                            if title not in rotlinks[red_link]:
-                                rotlinks[red_link].append(title)
-                            #if (redlink_count >= 500):
-                            #    return page.title()
-                        # else:
-                        #     print(red_link + " bereits auf Ausschlussseite")
-                    # else:
-                    #    print(red_link + " bereits auf fehlender Seite")
-            except Exception as e:
-                traceback.print_exc()
-                print(f"Fehler beim Verarbeiten der Seite {page.title()}: {e}")
-        last_page = page.title()
+    # Rotlinks für jeweils 50 Seiten auf einmal ermitteln
+    for batch in batched(filtered_titles, 50):
+        try:
+            red_links_of_pages = find_red_links_bulk(site, [page_title for page_title in batch if find_title(excluded_pages, page_title) is None])
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Fehler beim Abrufen der verlinkten Artikel: {e}")
+            red_links_of_pages = {}
+
+        for page_title in batch:
+            global pages_checked, rotlinks
+            pages_checked += 1
+
+            print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page_title}")
+
+            redlink_count += add_red_links(page_title, red_links_of_pages.get(page_title, []), known_titles)
+            last_page = page_title
     return last_page
 
-def process_current_new(category_names, exclusion_category_names, site, chemical_article_list, ignore_list, exclusion_list, intermediate_list):
+def process_current_new(category_names, exclusion_category_names, site, known_titles, excluded_pages):
 
     print("Analyse der Seiten...")
 
-    target_pages = []
-    for inclusion_category_name in category_names:
-        print(f"Seiten in Kategorie {inclusion_category_name} abrufen...")
-        target_pages += get_all_category_members(site, inclusion_category_name)
-
-    exclusion_pages = []
-    for exclusion_category_name in exclusion_category_names:
-        print(f"Seiten aus Kategorie {exclusion_category_name} ausschließen...")
-        exclusion_pages += get_all_category_members(site, exclusion_category_name)
-
-    print("Filterung der Zielseiten...")
-    filtered_pages = list(set(target_pages) - set(exclusion_pages))
-    print(len(filtered_pages))
+    # Seiten aus dem lokalen Kategorie-Snapshot (ohne Ausschlusskategorien und Weiterleitungen)
+    filtered_pages = get_category_titles(site, category_names, exclusion_category_names)
     
     younger, unchanged_article_redlinks = get_recently_changed_new_articles_in_list(
         site,
@@ -896,48 +676,32 @@ def process_current_new(category_names, exclusion_category_names, site, chemical
     for page_title, red_links in unchanged_article_redlinks.items():
         pages_checked += 1
         #print(f"{pages_checked} / {len(rotlinks)} page_title = {page_title}, red_links = {red_links}")
-        for red_link in red_links:
-            if (red_link not in chemical_article_list):
-                if (red_link not in ignore_list and red_link not in intermediate_list):
-                    if red_link not in rotlinks:
-                        rotlinks[red_link] = []
-                        redlink_count = redlink_count + 1
-                    title = "[[" + page_title + "]]"
-                    if title not in rotlinks[red_link]:
-                        rotlinks[red_link].append(title)
+        redlink_count += add_red_links(page_title, red_links, known_titles)
         print(f"{pages_checked}. Anzahl bisheriger bekannter Rotlinks: {redlink_count}, aktuelle Seite: {page_title}")
 
     print(f"Artikel jünger als 7 Tage: {len(younger)}")    
 
+    # Rotlinks aller jüngeren Artikel auf einmal ermitteln (50 Seiten pro Anfrage)
+    try:
+        red_links_of_pages = find_red_links_bulk(site, [page_title for page_title in younger if find_title(excluded_pages, page_title) is None])
+    except Exception as e:
+        traceback.print_exc()
+        print(f"Fehler beim Abrufen der verlinkten Artikel: {e}")
+        red_links_of_pages = {}
+
     for i, page_title in enumerate(younger, start=1):
 
         pages_checked += 1
 
-        page = pywikibot.Page(site, page_title)
-
-        print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page.title()}")
-
-        if page.namespace() == 0 and not page.isRedirectPage() and not page.title() in exclusion_list:  # Nur Artikel im Hauptnamensraum analysieren
-            try:
-                red_links = find_red_links(page)
-                for red_link in red_links:
-                    if (red_link not in missing_substances_list):
-                        if (red_link not in ignore_list and red_link not in intermediate_list):
-                            if red_link not in rotlinks:
-                                rotlinks[red_link] = []
-                                redlink_count = redlink_count + 1
-                            title = "[[" + page.title() + "]]"
-                            if title not in rotlinks[red_link]:
-                                rotlinks[red_link].append(title)
-            except Exception as e:
-                traceback.print_exc()
-                print(f"Fehler beim Verarbeiten der Seite {page.title()}: {e}")
-        last_page = page.title()
+        print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page_title}")
+
+        redlink_count += add_red_links(page_title, red_links_of_pages.get(page_title, []), known_titles)
+        last_page = page_title
 
     return last_page
 
 
-def process_current_list(site, missing_substances_list, ignore_list, exclusion_list, intermediate_list):
+def process_current_list(site, known_titles, excluded_pages):
 
     print("Analyse der Seiten...")
 
@@ -955,43 +719,27 @@ def process_current_list(site, missing_substances_list, ignore_list, exclusion_l
     for page_title, red_links in unchanged_article_redlinks.items():
         pages_checked += 1
         #print(f"{pages_checked} / {len(rotlinks)} page_title = {page_title}, red_links = {red_links}")
-        for red_link in red_links:
-            if (red_link not in missing_substances_list):
-                if (red_link not in ignore_list and red_link not in intermediate_list):
-                    if red_link not in rotlinks:
-                        rotlinks[red_link] = []
-                        redlink_count = redlink_count + 1
-                    title = "[[" + page_title + "]]"
-                    if title not in rotlinks[red_link]:
-                        rotlinks[red_link].append(title)
+        redlink_count += add_red_links(page_title, red_links, known_titles)
         print(f"{pages_checked}. Anzahl bisheriger bekannter Rotlinks: {redlink_count}, aktuelle Seite: {page_title}")
 
     print(f"Artikel jünger als 7 Tage: {len(younger)}")
 
+    # Rotlinks aller jüngeren Artikel auf einmal ermitteln (50 Seiten pro Anfrage)
+    try:
+        red_links_of_pages = find_red_links_bulk(site, [page_title for page_title in younger if find_title(excluded_pages, page_title) is None])
+    except Exception as e:
+        traceback.print_exc()
+        print(f"Fehler beim Abrufen der verlinkten Artikel: {e}")
+        red_links_of_pages = {}
+
     for i, page_title in enumerate(younger, start=1):
 
         pages_checked += 1
 
-        page = pywikibot.Page(site, page_title)
-
-        print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page.title()}")
-
-        if page.namespace() == 0 and not page.isRedirectPage() and not page.title() in exclusion_list:  # Nur Artikel im Hauptnamensraum analysieren
-            try:
-                red_links = find_red_links(page)
-                for red_link in red_links:
-                    if (red_link not in missing_substances_list):
-                        if (red_link not in ignore_list and red_link not in intermediate_list):
-                            if red_link not in rotlinks:
-                                rotlinks[red_link] = []
-                                redlink_count = redlink_count + 1
-                            title = "[[" + page.title() + "]]"
-                            if title not in rotlinks[red_link]:
-                                rotlinks[red_link].append(title)
-            except Exception as e:
-                traceback.print_exc()
-                print(f"Fehler beim Verarbeiten der Seite {page.title()}: {e}")
-        last_page = page.title()
+        print(f"{pages_checked}. Anzahl bisheriger unbekannter Rotlinks: {redlink_count}, aktuelle Seite: {page_title}")
+
+        redlink_count += add_red_links(page_title, red_links_of_pages.get(page_title, []), known_titles)
+        last_page = page_title
 
     return last_page
     
@@ -1039,6 +787,14 @@ if __name__ == "__main__":
     exclusion_list = get_exclusion_list(site)
     intermediate_list = get_intermediate_list(site)
 
+    # Titelindex für schnelle Abfragen, unabhängig von der Schreibweise (Unterstriche, erster Buchstabe, HTML-Entities)
+    known_titles = create_title_index({
+        "Fehlende Substanzen": missing_substances_list,
+        "Ausschlussliste": ignore_list,
+        "Zwischenlager": intermediate_list,
+    })
+    excluded_pages = create_title_index({"Gruppenausschluss": exclusion_list})
+
     # Kategorien und Ausschlüsse
     category_names = ["Kategorie:Chemische Verbindung nach Element", "Kategorie:Chemische Verbindung nach Strukturelement", "Kategorie:Mineral"]
     #exclusion_category_names = ["Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe"]
@@ -1049,15 +805,15 @@ if __name__ == "__main__":
     if args.only_update_list:
         print("Nur die Liste wird aktualisiert.")
         reason = "geänderte Artikel aus Neuzugänge"
-        last_page_name= process_current_list(site, missing_substances_list, ignore_list, exclusion_list, intermediate_list)
+        last_page_name= process_current_list(site, known_titles, excluded_pages)
     elif args.update_new_and_changed_and_listed:
         reason = "geänderte Artikel aus Neuzugänge und Chemie Kategorie"
         print("Neue, geänderte und gelistete Artikel werden aktualisiert.")
-        last_page_name= process_current_new(category_names, exclusion_category_names, site, missing_substances_list, ignore_list, exclusion_list, intermediate_list)
+        last_page_name= process_current_new(category_names, exclusion_category_names, site, known_titles, excluded_pages)
     else:
         # Analyse starten
         reason = "Artikel in Chemie-Kategorie"
-        last_page_name= process_category(category_names, exclusion_category_names, site, missing_substances_list, ignore_list, exclusion_list, intermediate_list)
+        last_page_name= process_category(category_names, exclusion_category_names, site, known_titles, excluded_pages)
     
     # Rotlinks speichern
     update_wikipedia_page(site, rotlinks, last_page_name, reason)
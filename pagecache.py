@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Lokaler, über die Revisions-ID abgesicherter Cache für Seitentexte.
+
+Die Texte werden in einer SQLite-Datenbank (Titel -> revid, Zeitstempel, Wikitext)
+gespeichert. Vor der Verwendung wird für jeweils 50 Titel mit einer einzigen
+prop=info-Abfrage die aktuelle Revisions-ID geholt. Nur Seiten, deren revid sich
+geändert hat oder die noch nicht im Cache sind, werden neu geladen.
+"""
+
+import os
+import sqlite3
+import threading
+import zlib
+import pywikibot
+from pywikibot.data.api import update_page
+from helperfunctions import api_query, batched, cache_path
+
+PAGE_CACHE_FILE = cache_path("page_cache.sqlite")
+
+# geöffnete Datenbanken: {Dateiname: Verbindung}
+_connections = {}
+_lock = threading.Lock()
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+cache_misses = 0
+
+
+def get_connection(cache_file=PAGE_CACHE_FILE):
+    """
+    Öffnet die Cache-Datenbank (einmal pro Lauf) und legt die Tabelle bei Bedarf an.
+
+    Args:
+        cache_file: Pfad der Datenbank.
+
+    Returns:
+        sqlite3.Connection: Die Verbindung.
+    """
+    if cache_file not in _connections:
+        os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+        connection = sqlite3.connect(cache_file, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "title TEXT PRIMARY KEY, revid INTEGER NOT NULL, timestamp TEXT, text BLOB NOT NULL)"
+        )
+        connection.commit()
+        _connections[cache_file] = connection
+    return _connections[cache_file]
+
+
+def load_cached(titles, cache_file=PAGE_CACHE_FILE):
+    """
+    Liest die gespeicherten Einträge für Titel.
+
+    Args:
+        titles: Liste von Seitentiteln.
+        cache_file: Pfad der Datenbank.
+
+    Returns:
+        dict: {Titel: (revid, Zeitstempel, Wikitext)}
+    """
+    titles = list(titles)
+    if not titles:
+        return {}
+    with _lock:
+        connection = get_connection(cache_file)
+        placeholders = ",".join("?" * len(titles))
+        rows = connection.execute(
+            f"SELECT title, revid, timestamp, text FROM pages WHERE title IN ({placeholders})", titles
+        ).fetchall()
+    return {title: (revid, timestamp, zlib.decompress(text).decode("utf-8")) for title, revid, timestamp, text in rows}
+
+
+def store_cached(entries, cache_file=PAGE_CACHE_FILE):
+    """
+    Speichert Einträge im Cache.
+
+    Args:
+        entries: dict {Titel: (revid, Zeitstempel, Wikitext)}
+        cache_file: Pfad der Datenbank.
+    """
+    if not entries:
+        return
+    with _lock:
+        connection = get_connection(cache_file)
+        connection.executemany(
+            "INSERT OR REPLACE INTO pages (title, revid, timestamp, text) VALUES (?, ?, ?, ?)",
+            [(title, revid, timestamp, zlib.compress(text.encode("utf-8"))) for title, (revid, timestamp, text) in entries.items()],
+        )
+        connection.commit()
+
+
+def query_page_infos(site, titles):
+    """
+    Fragt prop=info für bis zu 50 Titel mit einer Abfrage ab.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+
+    Returns:
+        tuple: ({normalisierter Titel: Seitendaten der API}, {angefragter Titel: normalisierter Titel})
+    """
+    infos = {}
+    normalized = {}
+    for data in api_query(site, prop="info", titles="|".join(titles)):
+        query = data.get("query", {})
+        for entry in query.get("normalized", []):
+            normalized[entry["from"]] = entry["to"]
+        for page in query.get("pages", []):
+            infos[page["title"]] = page
+    return infos, normalized
+
+
+def get_latest_revids(site, titles):
+    """
+    Fragt die aktuelle Revisions-ID für bis zu 50 Titel mit einer Abfrage ab.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+
+    Returns:
+        tuple: ({normalisierter Titel: revid (0 bei fehlender Seite)}, {angefragter Titel: normalisierter Titel})
+    """
+    infos, normalized = query_page_infos(site, titles)
+    revids = {title: 0 if page.get("missing") or page.get("invalid") else page.get("lastrevid", 0)
+              for title, page in infos.items()}
+    return revids, normalized
+
+
+def fetch_texts(site, titles):
+    """
+    Lädt den aktuellen Wikitext für bis zu 50 Titel.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 (normalisierten) Seitentiteln.
+
+    Returns:
+        dict: {Titel: (revid, Zeitstempel, Wikitext)}
+    """
+    entries = {}
+    for data in api_query(site, prop="revisions", rvprop="ids|timestamp|content", rvslots="main", titles="|".join(titles)):
+        for page in data.get("query", {}).get("pages", []):
+            revisions = page.get("revisions")
+            if not revisions:
+                continue
+            revision = revisions[0]
+            content = revision.get("slots", {}).get("main", {}).get("content")
+            if content is None:
+                continue
+            entries[page["title"]] = (revision["revid"], revision.get("timestamp", ""), content)
+    return entries
+
+
+def get_batch(site, titles, cache_file=PAGE_CACHE_FILE, page_infos=None):
+    """
+    Liefert die aktuellen Texte für bis zu 50 Titel, unveränderte Seiten aus dem Cache.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+        cache_file: Pfad der Datenbank.
+        page_infos: Optionales dict, in das die Seitendaten von prop=info je angefragtem Titel eingetragen werden.
+
+    Returns:
+        dict: {angefragter Titel: (revid, Zeitstempel, Wikitext)}, fehlende Seiten sind nicht enthalten.
+    """
+    global cache_hits, cache_misses
+
+    infos, normalized = query_page_infos(site, titles)
+    latest = {title: 0 if page.get("missing") or page.get("invalid") else page.get("lastrevid", 0)
+              for title, page in infos.items()}
+    canonical = {title: normalized.get(title, title) for title in titles}
+    if page_infos is not None:
+        page_infos.update({title: infos[canonical[title]] for title in titles if canonical[title] in infos})
+    cached = load_cached(set(canonical.values()), cache_file)
+
+    entries = {}
+    outdated = []
+    for title, revid in latest.items():
+        if not revid:
+            continue
+        if title in cached and cached[title][0] == revid:
+            entries[title] = cached[title]
+            cache_hits += 1
+        else:
+            outdated.append(title)
+
+    if outdated:
+        fetched = fetch_texts(site, outdated)
+        cache_misses += len(fetched)
+        store_cached(fetched, cache_file)
+        entries.update(fetched)
+
+    return {title: entries[canonical[title]] for title in titles if canonical[title] in entries}
+
+
+def get_texts(site, titles, cache_file=PAGE_CACHE_FILE):
+    """
+    Liefert die aktuellen Texte beliebig vieler Seiten (in Blöcken zu 50).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+        cache_file: Pfad der Datenbank.
+
+    Returns:
+        dict: {Titel: Wikitext}, fehlende Seiten sind nicht enthalten.
+    """
+    texts = {}
+    for batch in batched(list(dict.fromkeys(titles)), 50):
+        for title, (revid, timestamp, text) in get_batch(site, batch, cache_file).items():
+            texts[title] = text
+    return texts
+
+
+def attach_revision(page, info, revid, timestamp, text):
+    """
+    Hängt eine Revision aus dem Cache an ein pywikibot.Page-Objekt an.
+
+    Die Seitendaten werden wie eine API-Antwort aufgebaut und mit update_page übernommen
+    (wie beim PreloadingGenerator). page.text, page.get() und page.latest_revision werden
+    danach aus dem Cache beantwortet. Beim Speichern wird der Zeitstempel dieser Revision
+    als Basis verwendet, so dass spätere Bearbeitungen als Bearbeitungskonflikt erkannt werden.
+
+    Args:
+        page: Das pywikibot.Page-Objekt.
+        info: Die Seitendaten von prop=info.
+        revid: Die Revisions-ID.
+        timestamp: Der Zeitstempel der Revision im ISO-Format.
+        text: Der Wikitext der Revision.
+    """
+    pagedict = {
+        "title": info["title"],
+        "ns": info["ns"],
+        "pageid": info["pageid"],
+        "lastrevid": revid,
+        "contentmodel": info.get("contentmodel", "wikitext"),
+        "revisions": [{
+            "revid": revid,
+            "timestamp": timestamp,
+            # pywikibot fragt mit formatversion=1 ab, der Text steht dort unter "*"
+            "slots": {"main": {"contentmodel": info.get("contentmodel", "wikitext"), "*": text}},
+        }],
+    }
+    if info.get("redirect"):
+        pagedict["redirect"] = True
+    # mit "info" übernimmt update_page auch den Weiterleitungsstatus, den get() prüft
+    update_page(page, pagedict, ["info", "revisions"])
+
+
+def cached_pages(site, titles, cache_file=PAGE_CACHE_FILE):
+    """
+    Erzeugt pywikibot.Page-Objekte, deren Text aus dem Cache bzw. in Blöcken zu 50 geladen wird.
+    Ersatz für den PreloadingGenerator.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+        cache_file: Pfad der Datenbank.
+
+    Yields:
+        pywikibot.Page: Die Seite mit der Revision aus dem Cache (fehlende Seiten ohne Revision).
+    """
+    for batch in batched(titles, 50):
+        infos = {}
+        entries = get_batch(site, batch, cache_file, infos)
+        for title in batch:
+            page = pywikibot.Page(site, title)
+            if title in entries:
+                attach_revision(page, infos[title], *entries[title])
+            yield page
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gemeinsamer Durchlauf über Artikel für mehrere Prüfungen und Korrekturen.
+
+Jede Prüfung bzw. Korrektur wird als Plugin (dict) registriert. Der Seitentext wird
+pro Seite nur einmal geladen, alle Prüfungen laufen auf dem Originaltext, die
+Korrekturen werden nacheinander auf den Text angewendet und die Seite wird
+höchstens einmal mit einer zusammengefassten Bearbeitungszusammenfassung gespeichert.
+"""
+
+import time
+import traceback
+import pywikibot
+from categorysnapshot import pages_from_titles
+from helperfunctions import human_readable_time_difference
+
+pages_checked = 0
+pages_changed = 0
+
+
+def create_plugin(name, check=None, fix=None, summary="", minor=True, report=None, titles=None):
+    """
+    Erzeugt ein Plugin für scan_pages.
+
+    Args:
+        name: Name des Plugins (für Ausgaben).
+        check: Funktion check(page, text) -> Liste von Funden, oder None.
+        fix: Funktion fix(page_title, text) -> neuer Text, oder None.
+        summary: Bearbeitungszusammenfassung der Korrektur (ohne "ChemoBot: ").
+        minor: Ob die Korrektur eine kleine Änderung ist.
+        report: Funktion report(findings), die am Ende mit allen Funden aufgerufen wird, oder None.
+        titles: Menge der Seitentitel, auf die das Plugin angewendet wird (None = alle).
+
+    Returns:
+        dict: Das Plugin.
+    """
+    return {
+        "name": name,
+        "check": check,
+        "fix": fix,
+        "summary": summary,
+        "minor": minor,
+        "report": report,
+        "titles": set(titles) if titles is not None else None,
+        "findings": [],
+        "changed": 0,
+    }
+
+
+def scan_page(page, plugins):
+    """
+    Wendet alle passenden Plugins auf eine Seite an und speichert sie höchstens einmal.
+
+    Args:
+        page: Die Seite (Text bereits vorgeladen).
+        plugins: Liste der Plugins.
+
+    Returns:
+        bool: True, wenn die Seite gespeichert wurde.
+    """
+    page_title = page.title()
+    active = [plugin for plugin in plugins if plugin["titles"] is None or page_title in plugin["titles"]]
+    if not active:
+        return False
+
+    original_text = page.text
+
+    # Prüfungen auf dem Originaltext
+    for plugin in active:
+        if plugin["check"]:
+            try:
+                plugin["findings"].extend(plugin["check"](page, original_text))
+            except Exception as e:
+                traceback.print_exc()
+                print(f"{plugin['name']}: Fehler bei Seite {page_title}: {e}")
+
+    # Korrekturen nacheinander auf den Text anwenden
+    new_text = original_text
+    applied = []
+    for plugin in active:
+        if plugin["fix"]:
+            fixed_text = plugin["fix"](page_title, new_text)
+            if fixed_text != new_text:
+                new_text = fixed_text
+                applied.append(plugin)
+
+    if not applied:
+        return False
+
+    global pages_changed
+    try:
+        page.text = new_text
+        page.save(
+            summary="ChemoBot: " + "; ".join(plugin["summary"] for plugin in applied),
+            minor=all(plugin["minor"] for plugin in applied),
+        )
+        pages_changed += 1
+        for plugin in applied:
+            plugin["changed"] += 1
+        print(f"{pages_changed}. {page_title}: {', '.join(plugin['name'] for plugin in applied)}")
+        return True
+    except pywikibot.exceptions.OtherPageSaveError as e:
+        print(f"Fehler beim Speichern der Seite {page_title}: {e}")
+        return False
+
+
+def scan_pages(site, titles, plugins):
+    """
+    Lädt die Seiten in Blöcken und wendet alle Plugins an. Am Ende werden die Berichte geschrieben.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste der Seitentitel.
+        plugins: Liste der Plugins.
+    """
+    global pages_checked
+
+    # nur Seiten laden, für die mindestens ein Plugin zuständig ist
+    if all(plugin["titles"] is not None for plugin in plugins):
+        wanted = set().union(*(plugin["titles"] for plugin in plugins))
+        titles = [title for title in titles if title in wanted]
+
+    start_time = time.time()
+    interval = 60  # Intervall in Sekunden
+    zeitanfang = start_time
+
+    print(f"Prüfe {len(titles)} Seiten mit {', '.join(plugin['name'] for plugin in plugins)}")
+    for page in pages_from_titles(site, titles):
+        pages_checked += 1
+        if time.time() - start_time >= interval:
+            start_time = time.time()
+            print(f"{pages_checked}. Seite: {page.title()}")
+
+        try:
+            scan_page(page, plugins)
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Fehler bei Seite {page.title()}: {e}")
+
+    for plugin in plugins:
+        print(f"{plugin['name']}: {len(plugin['findings'])} Funde, {plugin['changed']} Seiten geändert")
+        if plugin["report"]:
+            plugin["report"](plugin["findings"])
+
+    print(f"\npages_checked = {pages_checked}, pages_changed = {pages_changed}")
+    print("Laufzeit: ", human_readable_time_difference(zeitanfang, time.time()))
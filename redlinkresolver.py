@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ermittelt Rotlinks für viele Seiten auf einmal.
+
+Die Links werden mit prop=links für 50 Quellseiten pro Anfrage gelesen, die Existenz
+der Linkziele wird mit prop=info für 50 Ziele pro Anfrage geprüft. Das Ergebnis der
+Existenzprüfung wird für den ganzen Lauf gemerkt, da viele Artikel dieselben fehlenden
+Verbindungen verlinken.
+"""
+
+from helperfunctions import api_query, batched
+
+# Existenz der Linkziele im aktuellen Lauf: {Titel: existiert}
+existence_cache = {}
+
+
+def get_links(site, titles, namespace=0):
+    """
+    Liest die Links von bis zu 50 Seiten.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von höchstens 50 Seitentiteln.
+        namespace: Namensraum der Linkziele.
+
+    Returns:
+        dict: {Seitentitel: [Linkziele]}, jeder angefragte Titel ist enthalten.
+    """
+    links = {title: [] for title in titles}
+    normalized = {}
+    for data in api_query(site, prop="links", pllimit="max", plnamespace=namespace, titles="|".join(titles)):
+        query = data.get("query", {})
+        for entry in query.get("normalized", []):
+            normalized[entry["to"]] = entry["from"]
+        for page in query.get("pages", []):
+            title = normalized.get(page["title"], page["title"])
+            links.setdefault(title, []).extend(link["title"] for link in page.get("links", []))
+    return links
+
+
+def resolve_existence(site, titles):
+    """
+    Prüft, ob Seiten existieren. Bereits geprüfte Titel werden nicht erneut abgefragt.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+
+    Returns:
+        dict: {Titel: existiert} für alle angefragten Titel.
+    """
+    unknown = [title for title in dict.fromkeys(titles) if title not in existence_cache]
+
+    for batch in batched(unknown, 50):
+        for data in api_query(site, prop="info", titles="|".join(batch)):
+            for page in data.get("query", {}).get("pages", []):
+                # ungültige Titel werden wie existierende behandelt (kein Rotlink)
+                existence_cache[page["title"]] = not page.get("missing", False) or page.get("invalid", False)
+        for title in batch:
+            existence_cache.setdefault(title, True)
+
+    return {title: existence_cache[title] for title in titles}
+
+
+def find_red_links_bulk(site, titles):
+    """
+    Liefert die Rotlinks (Artikelnamensraum) für beliebig viele Seiten.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+
+    Returns:
+        dict: {Seitentitel: [Rotlinks]} in der Reihenfolge der Links.
+    """
+    red_links = {}
+    for batch in batched(titles, 50):
+        links = get_links(site, batch)
+        existence = resolve_existence(site, [target for targets in links.values() for target in targets])
+        for title in batch:
+            red_links[title] = [target for target in links.get(title, []) if not existence[target]]
+    return red_links
@@ -2,6 +2,7 @@ import pywikibot
 import re
 import time
 from helperfunctions import human_readable_time_difference
+from wikidatabulk import get_entities_bulk
 
 # Liste der zu bearbeitenden Seiten
 PAGES = [
@@ -15,7 +16,7 @@ PAGES = [
 # Regex: Artikelname + optionale QID ([[:d:Qxxxxx|wd]])
 ENTRY_RE = re.compile(r"\[\[([^\]|#]+)\]\].*?\[\[:d:(Q\d+)\|")
 
-def should_remove(site, title, qid, cache, repo):
+def should_remove(site, title, qid, cache, items):
     """
     Prüft, ob die Zeile entfernt werden soll:
     1. Artikel im Hauptnamensraum existiert -> löschen
@@ -47,17 +48,15 @@ def should_remove(site, title, qid, cache, repo):
 
     # Keine Backlinks → Wikidata prüfen
     if qid:
-        item = pywikibot.ItemPage(repo, qid)
-        try:
-            item.get()
-            if "dewiki" in item.sitelinks:
-                cache[key] = True
-                print(f"delete entry for not linked page {title} with german page")
-                return True
-        except Exception as e:
-            print(f"Fehler beim Laden von {qid}: {e}")
+        item = items.get(qid)
+        if item is None:
+            print(f"Fehler beim Laden von {qid}")
             cache[key] = False
             return False
+        if "dewiki" in item["sitelinks"]:
+            cache[key] = True
+            print(f"delete entry for not linked page {title} with german page")
+            return True
 
     cache[key] = False
     return False
@@ -74,13 +73,17 @@ def process_page(site, repo, page_title):
     total = len(lines)
     print(f"Starte Verarbeitung von {page_title} ({total} Zeilen)")
 
+    # Sitelinks aller Wikidata-Elemente der Seite in Blöcken zu 50 laden
+    qids = [m.group(2) for m in map(ENTRY_RE.search, lines) if m]
+    items = get_entities_bulk(repo, qids, props="sitelinks")
+
     for i, line in enumerate(lines, start=1):
         m = ENTRY_RE.search(line)
         if not m:
             new_lines.append(line)
         else:
             title, qid = m.groups()
-            if should_remove(site, title.strip(), qid, cache, repo):
+            if should_remove(site, title.strip(), qid, cache, items):
                 removed.append(title.strip())
             else:
                 new_lines.append(line)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Führt alle Artikelprüfungen für Chemie-Artikel in einem einzigen Durchlauf aus:
+Sortierschlüssel, Kursivschreibung von Deskriptoren, Minuszeichen,
+predatory Links, predatory Journal Namen und zurückgezogene Publikationen.
+
+Jede Seite wird nur einmal geladen und höchstens einmal gespeichert.
+"""
+
+import asyncio
+import time
+import pywikibot
+from categorysnapshot import get_category_titles
+from pagescanner import create_plugin, scan_pages
+from helperfunctions import human_readable_time_difference
+import addOrderEntryInArticles
+import changeDescriptorsInArticles
+import changeMinusSignInArticles
+import CheckPredatory
+import CheckPredatoryNames
+import checkForRetractedDoiPmed
+
+
+def build_plugins(site, category_names):
+    """
+    Erstellt die Plugins mit den Titelmengen der einzelnen Prüfungen.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        category_names: Liste der Zielkategorien.
+
+    Returns:
+        tuple: (Liste aller Titel, Liste der Plugins)
+    """
+    # Die Ausschlusskategorien der Einzelskripte unterscheiden sich, der Snapshot liefert alle Mengen ohne erneute Abfrage
+    all_titles = get_category_titles(site, category_names, ["Kategorie:Mineral"])
+    descriptor_titles = get_category_titles(site, category_names, ["Kategorie:Mineral", "Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe"], ['Isopulegole'])
+    minus_titles = get_category_titles(site, category_names, ["Kategorie:Mineral", "Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe"])
+    sort_titles = addOrderEntryInArticles.filter_titles(get_category_titles(site, category_names, ["Kategorie:Mineral", "Kategorie:Stoffgruppe", "Kategorie:Chemikaliengruppe", "Kategorie:Wirkstoffgruppe", "Kategorie:Proteinkomplex", "Kategorie:Stoffgemisch"]))
+    sort_titles = [title for title in sort_titles if addOrderEntryInArticles.sort_patterns_to_end(title) != title]
+
+    predatory_links = CheckPredatory.extract_external_links(site, "Benutzer:Rjh/predatory")
+    print(f"Gefundene externe Links: {len(predatory_links)} Links")
+    domain_index = CheckPredatory.create_domain_index(predatory_links)
+    external_names = CheckPredatoryNames.extract_external_names(site, "Benutzer:Rjh/predatory_names")
+    print(f"Gefundene externe Namen: {len(external_names)} Namen")
+    name_matcher = CheckPredatoryNames.create_name_matcher(external_names)
+    r_doi, o_doi, r_pmid, o_pmid = asyncio.run(checkForRetractedDoiPmed.load_retraction_data(checkForRetractedDoiPmed.URL))
+    retraction_index = checkForRetractedDoiPmed.create_retraction_index(r_doi, o_doi, r_pmid, o_pmid)
+
+    def check_minus_signs(page, text):
+        return [(page.title(), line_number, line) for line_number, line in changeMinusSignInArticles.find_minus_signs(page.title(), text)]
+
+    # externe Links werden für die nächsten 50 Titel auf einmal geholt
+    external_links = {}
+    title_index = {title: index for index, title in enumerate(all_titles)}
+
+    def check_predatory_links(page, text):
+        title = page.title()
+        if title not in external_links:
+            external_links.clear()
+            start = title_index[title]
+            external_links.update(CheckPredatory.get_external_links_batch(site, all_titles[start:start + 50]))
+        return CheckPredatory.find_predatory_links(title, external_links.get(title, []), domain_index)
+
+    def check_predatory_names(page, text):
+        return CheckPredatoryNames.check_page_for_predatory_names(page.title(), text, name_matcher)
+
+    def check_retractions(page, text):
+        result = checkForRetractedDoiPmed.find_retracted_in_references(checkForRetractedDoiPmed.extract_references(text), retraction_index)
+        if result["any_match"]:
+            print(f"Seite: {page.title()} -> {result}")
+            return [(page.title(), result)]
+        return []
+
+    def report_minus_signs(findings):
+        for page_title, line_number, line in findings:
+            print(f"Gefunden in Zeile {line_number} of {page_title}: '{line.strip()}'")
+
+    def report_predatory_links(found_links):
+        if found_links:
+            CheckPredatory.write_results_to_subpage(pywikibot.Page(site, "Benutzer:Rjh/predatory"), found_links)
+
+    def report_predatory_names(found_links):
+        CheckPredatoryNames.write_results_to_subpage(site, found_links)
+
+    plugins = [
+        create_plugin("Sortierschlüssel", fix=addOrderEntryInArticles.add_sort_key,
+                      summary="Ergänze Sortierschlüssel im Artikel", minor=False, titles=sort_titles),
+        create_plugin("Deskriptoren", fix=changeDescriptorsInArticles.italicize_descriptors,
+                      summary="Kursivschreibung von Descriptoren", minor=True, titles=descriptor_titles),
+        create_plugin("Minuszeichen", check=check_minus_signs, report=report_minus_signs, titles=minus_titles),
+        create_plugin("Predatory Links", check=check_predatory_links, report=report_predatory_links, titles=all_titles),
+        create_plugin("Predatory Namen", check=check_predatory_names, report=report_predatory_names, titles=all_titles),
+        create_plugin("Retractions", check=check_retractions, titles=all_titles),
+    ]
+
+    return all_titles, plugins
+
+
+if __name__ == "__main__":
+    zeitanfang = time.time()
+    site = pywikibot.Site('de', 'wikipedia')
+    category_names = ["Kategorie:Chemische Verbindung nach Element", "Kategorie:Chemische Verbindung nach Strukturelement"]
+
+    titles, plugins = build_plugins(site, category_names)
+    scan_pages(site, titles, plugins)
+    CheckPredatory.print_match_statistics()
+
+    print("\nGesamtlaufzeit: ", human_readable_time_difference(zeitanfang, time.time()))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Zählt Suchtreffer über die Trefferzahl der CirrusSearch-Suche (totalhits).
+
+Pro Suchbegriff genügt eine Abfrage list=search mit srlimit=1 und srinfo=totalhits,
+statt alle Treffer seitenweise zu laden. Die Trefferzahlen sind nicht mehr auf 500
+begrenzt. Sie werden in cache/search_counts.json gespeichert und nach
+SEARCH_COUNT_TTL Sekunden neu abgefragt, Fehler werden nicht gespeichert. Neue
+Abfragen laufen mit wenigen parallelen Threads.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from helperfunctions import api_query, cache_path, load_json_cache, save_json_cache
+
+SEARCH_COUNT_FILE = cache_path("search_counts.json")
+
+# Trefferzahlen werden nach 7 Tagen neu abgefragt
+SEARCH_COUNT_TTL = 7 * 24 * 3600
+
+MAX_WORKERS = 4
+
+# Zustand des aktuellen Laufs
+_cache = None
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+lookups = 0
+
+
+def get_cache():
+    """
+    Lädt den Cache der Trefferzahlen (einmal pro Lauf).
+
+    Returns:
+        dict: {Namensräume|Suchbegriff: [Trefferzahl, Zeitpunkt]}
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_json_cache(SEARCH_COUNT_FILE, {})
+    return _cache
+
+
+def query_total_hits(site, search, namespaces=(0,)):
+    """
+    Fragt die Trefferzahl einer Suche mit einer einzigen Abfrage ab.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        search: Der Suchbegriff, z.B. '"Aceton"'.
+        namespaces: Durchsuchte Namensräume.
+
+    Returns:
+        int: Die Trefferzahl oder None bei Fehlern.
+    """
+    try:
+        data = next(api_query(site, list="search", srsearch=search, srlimit=1, srinfo="totalhits",
+                              srprop="", srnamespace="|".join(str(ns) for ns in namespaces)))
+        return data["query"]["searchinfo"]["totalhits"]
+    except Exception as e:
+        print(f"Fehler bei der Suche nach {search}: {e}")
+        return None
+
+
+def count_search_hits(site, searches, namespaces=(0,)):
+    """
+    Liefert die Trefferzahlen mehrerer Suchen, bekannte Ergebnisse kommen aus dem Cache.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        searches: Liste von Suchbegriffen.
+        namespaces: Durchsuchte Namensräume.
+
+    Returns:
+        dict: {Suchbegriff: Trefferzahl (0 bei Fehlern)}
+    """
+    global cache_hits, lookups
+
+    cache = get_cache()
+    prefix = "|".join(str(ns) for ns in namespaces) + "|"
+    now = time.time()
+    counts = {}
+    missing = []
+    for search in dict.fromkeys(searches):
+        entry = cache.get(prefix + search)
+        if entry and now - entry[1] <= SEARCH_COUNT_TTL:
+            counts[search] = entry[0]
+            cache_hits += 1
+        else:
+            missing.append(search)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            found = dict(zip(missing, executor.map(lambda search: query_total_hits(site, search, namespaces), missing)))
+        lookups += len(found)
+
+        for search, count in found.items():
+            if count is None:
+                counts[search] = 0
+                continue
+            cache[prefix + search] = [count, now]
+            counts[search] = count
+        save_json_cache(SEARCH_COUNT_FILE, cache)
+
+    return counts
+
+
+def count_name_hits(site, names, namespaces=(0,)):
+    """
+    Liefert für Namen die Trefferzahl der Phrasensuche ("Name") im Artikelnamensraum.
+
+    Returns:
+        dict: {Name: Trefferzahl}
+    """
+    counts = count_search_hits(site, [f'"{name}"' for name in names], namespaces)
+    return {name: counts[f'"{name}"'] for name in names}
+
+
+def print_search_statistics():
+    """
+    Gibt aus, wie viele Trefferzahlen aus dem Cache kamen.
+    """
+    print(f"Suchtreffer: {cache_hits} aus dem Cache, {lookups} neu abgefragt")
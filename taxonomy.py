@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ordnet Taxa anhand der übergeordneten Taxa (P171) in Wikidata einer Gruppe zu
+(Pflanze, Tier, Pilz, Mikroorganismus).
+
+Für jedes Element werden "ist ein Taxon" (P31) und die übergeordneten Taxa in
+cache/taxon_lineage.json gespeichert. Die Stammbäume werden Ebene für Ebene mit
+wbgetentities (nur claims) in Blöcken zu 50 geladen, bereits bekannte Abschnitte kommen
+von der Festplatte. Die Zuordnung selbst läuft danach nur noch über den Cache.
+"""
+
+import time
+from helperfunctions import api_query, cache_path, load_json_cache, save_json_cache
+from wikidatabulk import get_entities_bulk
+
+TAXON_LINEAGE_FILE = cache_path("taxon_lineage.json")
+# Stammbäume werden nach 180 Tagen neu geladen
+TAXON_LINEAGE_TTL = 180 * 24 * 3600
+
+TAXON_QID = "Q16521"
+GROUPS = {
+    "Q756": "tfpf", #"Pflanze",
+    "Q729": "tfti", #"Tier",
+    "Q764": "tfpi", #"Pilz",
+    "Q7868": "tfmi", #"Mikroorganismus", # Oberbegriff
+    "Q10876": "tfmi", #"Mikroorganismus",# Bacteria
+    "Q10850": "tfmi", #"Mikroorganismus",# Archaea
+    "Q808": "tfmi", #"Mikroorganismus",  # Virus
+    "Q474548": "tfmi", #"Mikroorganismus" # Protist
+}
+
+# Zustand des aktuellen Laufs
+_cache = None
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+loaded = 0
+
+
+def get_cache():
+    """
+    Lädt den Cache der Stammbäume (einmal pro Lauf).
+
+    Returns:
+        dict: {QID: [ist Taxon, [QIDs der übergeordneten Taxa], Zeitpunkt]}
+    """
+    global _cache
+    if _cache is None:
+        _cache = load_json_cache(TAXON_LINEAGE_FILE, {})
+    return _cache
+
+
+def load_lineages(repo, qids):
+    """
+    Lädt die Stammbäume mehrerer Elemente nach oben bis zu den Gruppen in GROUPS.
+    Pro Ebene werden alle noch unbekannten Elemente gemeinsam geladen.
+
+    Args:
+        repo: Das Wikidata-Repository.
+        qids: Liste von Element-IDs.
+    """
+    global cache_hits, loaded
+
+    cache = get_cache()
+    now = time.time()
+    changed = False
+    seen = set()
+    level = set(qids)
+
+    while level:
+        unknown = []
+        for qid in level:
+            entry = cache.get(qid)
+            if entry and now - entry[2] <= TAXON_LINEAGE_TTL:
+                cache_hits += 1
+            else:
+                unknown.append(qid)
+
+        if unknown:
+            for qid, entity in get_entities_bulk(repo, unknown, props="claims").items():
+                if entity is None:
+                    continue
+                claims = entity["claims"]
+                cache[qid] = [TAXON_QID in claims.get("P31", []), claims.get("P171", []), now]
+                loaded += 1
+                changed = True
+
+        seen |= level
+        # oberhalb einer Gruppe muss nicht weiter gesucht werden
+        level = {parent for qid in level if qid in cache and qid not in GROUPS for parent in cache[qid][1]} - seen
+
+    if changed:
+        save_json_cache(TAXON_LINEAGE_FILE, cache)
+
+
+def find_group(qid):
+    """
+    Sucht im gespeicherten Stammbaum nach oben die erste Gruppe aus GROUPS.
+
+    Returns:
+        String: Abkürzung der Gruppe oder None.
+    """
+    cache = get_cache()
+    visited = set()
+    queue = [qid]
+    while queue:
+        cur_qid = queue.pop()
+        if cur_qid in visited:
+            continue
+        visited.add(cur_qid)
+
+        # Prüfen, ob Obergruppe erreicht
+        if cur_qid in GROUPS:
+            return GROUPS[cur_qid]
+
+        if cur_qid in cache:
+            queue.extend(cache[cur_qid][1])
+    return None
+
+
+def search_items(repo, name, language="de", limit=5):
+    """
+    Sucht Wikidata-Elemente nach Name (wbsearchentities).
+
+    Returns:
+        list: QIDs der Treffer in der Reihenfolge der Suche.
+    """
+    data = next(api_query(repo, action="wbsearchentities", search=name, language=language, type="item", limit=limit))
+    return [hit["id"] for hit in data.get("search", []) if hit.get("id")]
+
+
+def classify_taxa(repo, names, language="de"):
+    """
+    Sucht Taxa nach Name und ordnet sie als Pflanze, Tier, Pilz oder Mikroorganismus ein.
+    Namen ohne Leerzeichen (keine Art) werden übergangen.
+
+    Args:
+        repo: Das Wikidata-Repository.
+        names: Liste von Namen.
+        language: Sprache der Suche.
+
+    Returns:
+        dict: {Name: (QID, Gruppe)}, (None, None) wenn kein Taxon gefunden wurde,
+        Gruppe None, wenn keine Gruppe im Stammbaum liegt.
+    """
+    hits = {}
+    for name in dict.fromkeys(names):
+        if " " not in name:
+            continue
+        try:
+            hits[name] = search_items(repo, name, language)
+        except Exception as e:
+            print(f"Fehler bei der Suche nach {name}: {e}")
+
+    load_lineages(repo, [qid for qids in hits.values() for qid in qids])
+    cache = get_cache()
+
+    results = {}
+    for name in names:
+        results[name] = (None, None)
+        for qid in hits.get(name, []):
+            # Prüfen, ob es ein Taxon ist (P31 = taxon)
+            if qid in cache and cache[qid][0]:
+                results[name] = (qid, find_group(qid))
+                break
+    return results
+
+
+def print_taxonomy_statistics():
+    """
+    Gibt aus, wie viele Elemente der Stammbäume aus dem Cache kamen.
+    """
+    print(f"Stammbäume: {cache_hits} Elemente aus dem Cache, {loaded} neu geladen")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unterscheidet direkte Links im Wikitext von Links, die erst über Vorlagen entstehen.
+
+Für jede verlinkende Seite werden die Links des Roh-Wikitexts und des expandierten
+Texts (action=expandtemplates) einmal pro Revision bestimmt und in einer
+SQLite-Datenbank gespeichert (Titel -> revid, Roh-Links, expandierte Links). Die
+Zählung für viele Zielseiten läuft in einem Durchgang über alle verschiedenen
+verlinkenden Seiten, so dass jede Seite höchstens einmal expandiert wird.
+
+Als schnelle Alternative ohne Expansion (fast=True) werden die Links des Roh-Wikitexts mit
+den Links aus prop=links verglichen, die MediaWiki nach der Expansion gespeichert hat.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+import mwparserfromhell
+from helperfunctions import api_query, batched, cache_path
+from pagecache import get_batch
+from redlinkresolver import get_links
+from titleindex import normalize_title
+
+LINK_SET_CACHE_FILE = cache_path("link_sets.sqlite")
+
+# geöffnete Datenbanken: {Dateiname: Verbindung}
+_connections = {}
+_lock = threading.Lock()
+
+# Statistik des aktuellen Laufs
+cache_hits = 0
+expanded_pages = 0
+
+
+def get_connection(cache_file=LINK_SET_CACHE_FILE):
+    """
+    Öffnet die Datenbank der Linkmengen (einmal pro Lauf) und legt die Tabelle bei Bedarf an.
+    """
+    if cache_file not in _connections:
+        os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+        connection = sqlite3.connect(cache_file, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS link_sets ("
+            "title TEXT PRIMARY KEY, revid INTEGER NOT NULL, raw BLOB NOT NULL, expanded BLOB NOT NULL)"
+        )
+        connection.commit()
+        _connections[cache_file] = connection
+    return _connections[cache_file]
+
+
+def pack_links(links):
+    """
+    Packt eine Linkmenge für die Datenbank (sortierte JSON-Liste, komprimiert).
+    """
+    return zlib.compress(json.dumps(sorted(links), ensure_ascii=False).encode("utf-8"))
+
+
+def unpack_links(data):
+    """
+    Gegenstück zu pack_links.
+    """
+    return set(json.loads(zlib.decompress(data).decode("utf-8")))
+
+
+def load_link_sets(titles, cache_file=LINK_SET_CACHE_FILE):
+    """
+    Liest die gespeicherten Linkmengen für Titel.
+
+    Returns:
+        dict: {Titel: (revid, Roh-Links, expandierte Links)}
+    """
+    titles = list(titles)
+    if not titles:
+        return {}
+    with _lock:
+        connection = get_connection(cache_file)
+        placeholders = ",".join("?" * len(titles))
+        rows = connection.execute(
+            f"SELECT title, revid, raw, expanded FROM link_sets WHERE title IN ({placeholders})", titles
+        ).fetchall()
+    return {title: (revid, unpack_links(raw), unpack_links(expanded)) for title, revid, raw, expanded in rows}
+
+
+def store_link_sets(entries, cache_file=LINK_SET_CACHE_FILE):
+    """
+    Speichert Linkmengen.
+
+    Args:
+        entries: dict {Titel: (revid, Roh-Links, expandierte Links)}
+        cache_file: Pfad der Datenbank.
+    """
+    if not entries:
+        return
+    with _lock:
+        connection = get_connection(cache_file)
+        connection.executemany(
+            "INSERT OR REPLACE INTO link_sets (title, revid, raw, expanded) VALUES (?, ?, ?, ?)",
+            [(title, revid, pack_links(raw), pack_links(expanded)) for title, (revid, raw, expanded) in entries.items()],
+        )
+        connection.commit()
+
+
+def extract_links(text):
+    """
+    Liefert die Linkziele eines Wikitexts, so wie sie im Text stehen.
+    """
+    return {str(link.title) for link in mwparserfromhell.parse(text).filter_wikilinks()}
+
+
+def get_link_sets(site, titles, cache_file=LINK_SET_CACHE_FILE):
+    """
+    Liefert für beliebig viele Seiten die Links im Roh-Wikitext und im expandierten Text.
+    Nur Seiten, deren Revision sich seit der letzten Expansion geändert hat, werden neu expandiert.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        titles: Liste von Seitentiteln.
+        cache_file: Pfad der Datenbank.
+
+    Returns:
+        dict: {Titel: (Roh-Links, expandierte Links)}, fehlende oder fehlerhafte Seiten sind nicht enthalten.
+    """
+    global cache_hits, expanded_pages
+
+    link_sets = {}
+    for batch in batched(list(dict.fromkeys(titles)), 50):
+        # Roh-Wikitexte kommen aus dem Seiten-Cache, die revid entscheidet über die Linkmengen
+        entries = get_batch(site, batch)
+        cached = load_link_sets(entries, cache_file)
+
+        new_sets = {}
+        for title, (revid, timestamp, text) in entries.items():
+            if title in cached and cached[title][0] == revid:
+                link_sets[title] = cached[title][1:]
+                cache_hits += 1
+                continue
+            try:
+                expanded = site.expand_text(text, title=title, includecomments=False)
+            except Exception as e:
+                print(f"Fehler bei {title}: {e}")
+                continue
+            new_sets[title] = (revid, extract_links(text), extract_links(expanded))
+            link_sets[title] = new_sets[title][1:]
+            expanded_pages += 1
+
+        store_link_sets(new_sets, cache_file)
+
+    return link_sets
+
+
+def get_referencing_pages(site, targets, namespaces=[0]):
+    """
+    Liefert die Seiten, die auf die Zielseiten verlinken (prop=linkshere, 50 Ziele pro Anfrage).
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        targets: Liste von Titeln der Zielseiten.
+        namespaces: Namensräume der verlinkenden Seiten.
+
+    Returns:
+        dict: {Zielseite: [Titel der verlinkenden Seiten]}
+    """
+    refs = {target: [] for target in targets}
+    for batch in batched(list(refs), 50):
+        normalized = {}
+        for data in api_query(site, prop="linkshere", lhprop="title", lhlimit="max",
+                              lhnamespace="|".join(str(ns) for ns in namespaces), titles="|".join(batch)):
+            query = data.get("query", {})
+            for entry in query.get("normalized", []):
+                normalized[entry["to"]] = entry["from"]
+            for page in query.get("pages", []):
+                target = normalized.get(page["title"], page["title"])
+                refs.setdefault(target, []).extend(link["title"] for link in page.get("linkshere", []))
+    return refs
+
+
+def get_link_sets_fast(site, titles, targets):
+    """
+    Schnelle Variante ohne Expansion: die Roh-Links kommen aus dem Wikitext, die
+    expandierten Links aus prop=links (von MediaWiki nach der Expansion gespeichert).
+    Beide Mengen werden normalisiert, die expandierten Links auf die Zielseiten beschränkt.
+
+    Returns:
+        dict: {Titel: (normalisierte Roh-Links, normalisierte Links auf Zielseiten)}
+    """
+    targets = {normalize_title(target) for target in targets}
+    link_sets = {}
+    for batch in batched(list(dict.fromkeys(titles)), 50):
+        entries = get_batch(site, batch)
+        server_links = get_links(site, list(entries))
+        for title, (revid, timestamp, text) in entries.items():
+            raw = {normalize_title(link.split("#")[0]) for link in extract_links(text)}
+            expanded = {normalize_title(link) for link in server_links.get(title, [])} & targets
+            link_sets[title] = (raw, expanded)
+    return link_sets
+
+
+def count_links_via_templates_bulk(site, targets, namespaces=[0], fast=False):
+    """
+    Zählt für viele Zielseiten, wie viele Links direkt im Wikitext stehen und wie viele
+    über Vorlagen erzeugt werden. Jede verlinkende Seite wird nur einmal ausgewertet.
+
+    Args:
+        site: Das pywikibot.Site-Objekt.
+        targets: Liste von Titeln der Zielseiten.
+        namespaces: Namensräume der verlinkenden Seiten.
+        fast: Statt der Expansion den Vergleich mit prop=links verwenden.
+
+    Returns:
+        dict: {Zielseite: {"direct": int, "template": int, "total": int}}
+    """
+    refs = get_referencing_pages(site, targets, namespaces)
+    distinct = list(dict.fromkeys(title for titles in refs.values() for title in titles))
+    print(f"Vorlagenlinks: {len(distinct)} verschiedene verlinkende Seiten für {len(refs)} Ziele")
+
+    if fast:
+        link_sets = get_link_sets_fast(site, distinct, targets)
+    else:
+        link_sets = get_link_sets(site, distinct)
+
+    counts = {}
+    for target in targets:
+        key = normalize_title(target) if fast else target
+        direct_count = 0
+        template_count = 0
+        for title in refs.get(target, []):
+            if title not in link_sets:
+                continue
+            raw_links, expanded_links = link_sets[title]
+            if key in expanded_links:
+                if key in raw_links:
+                    direct_count += 1
+                else:
+                    template_count += 1
+        counts[target] = {"direct": direct_count, "template": template_count, "total": direct_count + template_count}
+    return counts
+
+
+def print_link_set_statistics():
+    """
+    Gibt aus, wie viele Seiten expandiert werden mussten.
+    """
+    print(f"Linkmengen: {cache_hits} aus dem Cache, {expanded_pages} Seiten expandiert")
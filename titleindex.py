@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Index für Titellisten (Fehlende Substanzen, Ausschlussliste, Zwischenlager, ...).
+
+Die Titel werden beim Aufbau einmal wie von MediaWiki normalisiert (erster Buchstabe groß,
+Unterstriche und mehrfache Leerzeichen, HTML-Entities), danach ist jede Abfrage ein
+Zugriff auf ein dict. Der Index merkt sich, aus welcher Liste ein Titel stammt.
+"""
+
+import html
+import re
+
+WHITESPACE_PATTERN = re.compile(r"[\s_]+")
+DIRECTION_MARK_PATTERN = re.compile("[\u200e\u200f]")
+
+
+def normalize_title(title):
+    """
+    Normalisiert einen Seitentitel wie MediaWiki im Artikelnamensraum.
+
+    Args:
+        title: Der Titel, z.B. "aceton_&amp;_Co".
+
+    Returns:
+        String: Der normalisierte Titel, z.B. "Aceton & Co".
+    """
+    title = DIRECTION_MARK_PATTERN.sub("", html.unescape(title))
+    title = WHITESPACE_PATTERN.sub(" ", title).strip()
+    if not title:
+        return title
+
+    # erster Buchstabe groß, außer wenn sich dabei die Länge ändert (z.B. "ß")
+    first = title[0].upper()
+    if len(first) != 1:
+        first = title[0]
+    return first + title[1:]
+
+
+def create_title_index(title_lists):
+    """
+    Baut einen Index aus mehreren Titellisten auf.
+
+    Args:
+        title_lists: dict {Listenname: Liste von Titeln}.
+
+    Returns:
+        dict: {normalisierter Titel: Listenname}, bei mehrfach vorkommenden Titeln die erste Liste.
+    """
+    index = {}
+    for list_name, titles in title_lists.items():
+        for title in titles:
+            index.setdefault(normalize_title(title), list_name)
+    return index
+
+
+def find_title(index, title):
+    """
+    Sucht einen Titel im Index.
+
+    Args:
+        index: Der Index aus create_title_index.
+        title: Der gesuchte Titel (beliebige Schreibweise).
+
+    Returns:
+        String: Name der Liste, in der der Titel steht, oder None.
+    """
+    return index.get(normalize_title(title))
+
+
+ENTRY_LINK_PATTERN = re.compile(r"\[\[([^\]|#]+)")
+
+
+def get_entry_title(line):
+    """
+    Liefert den normalisierten Titel eines Listeneintrags, z.B. "* [[aceton]] >> ..." -> "Aceton".
+
+    Args:
+        line: Die Zeile der Liste.
+
+    Returns:
+        String: Der normalisierte Titel des ersten Links, ohne Link die normalisierte Zeile.
+    """
+    match = ENTRY_LINK_PATTERN.search(line)
+    return normalize_title(match.group(1) if match else line)
@@ -3,7 +3,9 @@ import re
 import time
 import mwparserfromhell
 from collections import defaultdict
-from helperfunctions import human_readable_time_difference
+from helperfunctions import human_readable_time_difference, batched
+from pagecache import get_latest_revids
+from backlinkcount import count_backlinks
 
 
 def extract_all_minerals(site, mainpage_title):
@@ -32,20 +34,6 @@ def extract_all_minerals(site, mainpage_title):
     return all_minerals
 
 
-def count_article_links(site, title):
-    """
-    Zählt, wie viele Links auf eine Seite aus dem Artikelnamensraum (NS=0) zeigen.
-    """
-    page = pywikibot.Page(site, title)
-    total = 0
-    try:
-        for _ in page.getReferences(namespaces=[0], follow_redirects=False):
-            total += 1
-    except Exception as e:
-        print(f"Fehler bei {title}: {e}")
-    return total
-
-
 def group_by_thresholds(results, thresholds=(30, 25, 20, 15)):
     """
     Gruppiert die Ergebnisse nach Schwellwerten, behält die Reihenfolge der Eingabe.
@@ -114,11 +102,17 @@ def main():
 
 #    missing = [("test30", 35), ("test15", 15)]
         
+    # Existenz in Blöcken zu 50 prüfen, Links im Artikelnamensraum nur für fehlende Artikel zählen
+    existing = set()
+    for batch in batched(minerals, 50):
+        revids, normalized = get_latest_revids(site, batch)
+        existing.update(title for title in batch if revids.get(normalized.get(title, title)))
+    link_counts = count_backlinks(site, [mineral for mineral in minerals if mineral not in existing])
+
     missing = []
     for i, mineral in enumerate(minerals, start=1):
-        page = pywikibot.Page(site, mineral)
-        if not page.exists():
-            count = count_article_links(site, mineral)
+        if mineral not in existing:
+            count = link_counts[mineral]
             if count > 0:
                 missing.append((mineral, count))
                 print(f"[{i}/{total}] {mineral}: {count} Links im Artikelnamensraum")
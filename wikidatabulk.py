@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Abfragen an Wikidata für viele Einträge auf einmal.
+
+CAS-Nummern werden mit VALUES-Blöcken für mehrere hundert Nummern pro SPARQL-Abfrage
+aufgelöst. Schlägt eine Abfrage fehl (z.B. Timeout), wird der Block halbiert und erneut
+versucht, so dass nur einzelne problematische Nummern wiederholt werden.
+
+Elemente werden mit wbgetentities zu je 50 geladen, dabei werden nur die benötigten Teile
+(Sitelinks, Aussagen, Bezeichnungen in de/en) angefragt und Weiterleitungen direkt vom
+Server aufgelöst. Das Ergebnis sind einfache dicts statt vollständiger ItemPage-Objekte.
+
+Bezeichnungen und Weiterleitungsziele häufig gebrauchter Elemente (Typen aus P31, Gründe
+für abgelehnte Werte) werden in cache/qid_labels.json gespeichert und gesammelt geladen.
+"""
+
+import re
+import time
+import pywikibot
+from pywikibot.data.sparql import SparqlQuery
+from helperfunctions import batched, api_query, cache_path, load_json_cache, save_json_cache
+
+CAS_FORMAT = re.compile(r"^\d{2,7}-\d{2}-\d$")
+ENTITY_ID_FORMAT = re.compile(r"^[QPL][1-9]\d*$")
+ENTITY_PREFIX = "http://www.wikidata.org/entity/"
+
+SPARQL_BATCH_SIZE = 300
+SPARQL_RETRIES = 3
+SPARQL_DELAY = 5
+
+ENTITY_BATCH_SIZE = 50
+ENTITY_PROPS = "sitelinks|claims|labels"
+ENTITY_PROPERTIES = ("P31", "P231", "P171")
+ENTITY_LANGUAGES = ("de", "en")
+ENTITY_RETRIES = 3
+ENTITY_DELAY = 5
+
+# Qualifikator "Grund für den missbilligten Rang"
+DEPRECATION_REASON = "P2241"
+
+LABEL_CACHE_FILE = cache_path("qid_labels.json")
+# Bezeichnungen werden nach 30 Tagen neu geladen
+LABEL_CACHE_TTL = 30 * 24 * 3600
+
+# Zustand des aktuellen Laufs
+_label_cache = None
+
+# Statistik des aktuellen Laufs
+label_cache_hits = 0
+labels_loaded = 0
+
+
+def query_qids_for_cas_batch(sparql, cas_numbers):
+    """
+    Fragt die Wikidata-Elemente für einen Block von CAS-Nummern ab (P231).
+
+    Args:
+        sparql: Das SparqlQuery-Objekt.
+        cas_numbers: Liste gültiger CAS-Nummern.
+
+    Returns:
+        dict: {CAS-Nummer: Liste der QIDs}
+
+    Raises:
+        Exception: Wenn die Abfrage fehlschlägt oder kein Ergebnis liefert.
+    """
+    values = " ".join(f'"{cas}"' for cas in cas_numbers)
+    query = f"""
+    SELECT ?cas ?item WHERE {{
+      VALUES ?cas {{ {values} }}
+      ?item wdt:P231 ?cas.
+    }}
+    """
+    rows = sparql.select(query)
+    if rows is None:
+        raise RuntimeError("keine Antwort vom SPARQL-Endpunkt")
+
+    qids = {cas: [] for cas in cas_numbers}
+    for row in rows:
+        item = row["item"]
+        if item.startswith(ENTITY_PREFIX):
+            qids.setdefault(row["cas"], []).append(item[len(ENTITY_PREFIX):])
+    return qids
+
+
+def resolve_cas_batch(sparql, cas_numbers, qids):
+    """
+    Löst einen Block auf und halbiert ihn bei Fehlern, bis einzelne Nummern übrig sind.
+    Einzelne Nummern werden mit wachsender Wartezeit wiederholt.
+
+    Args:
+        sparql: Das SparqlQuery-Objekt.
+        cas_numbers: Liste gültiger CAS-Nummern.
+        qids: dict, in das die Ergebnisse eingetragen werden.
+    """
+    attempts = SPARQL_RETRIES if len(cas_numbers) == 1 else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            qids.update(query_qids_for_cas_batch(sparql, cas_numbers))
+            return
+        except Exception as e:
+            pywikibot.warning(f"SPARQL fehlgeschlagen für {len(cas_numbers)} CAS-Nummern ({cas_numbers[0]} ...): {e}")
+            if len(cas_numbers) == 1 and attempt < attempts:
+                time.sleep(SPARQL_DELAY * attempt)
+
+    if len(cas_numbers) == 1:
+        print(f"max attempts reached for {cas_numbers[0]}")
+        qids[cas_numbers[0]] = []
+        return
+
+    middle = len(cas_numbers) // 2
+    resolve_cas_batch(sparql, cas_numbers[:middle], qids)
+    resolve_cas_batch(sparql, cas_numbers[middle:], qids)
+
+
+def get_qids_by_cas_bulk(repo, cas_numbers, batch_size=SPARQL_BATCH_SIZE):
+    """
+    Liefert die Wikidata-Elemente zu beliebig vielen CAS-Nummern.
+    Doppelte Nummern, "-" und ungültige Formate werden vorher aussortiert.
+
+    Args:
+        repo: Das Wikidata-Repository (site.data_repository()).
+        cas_numbers: Liste von CAS-Nummern.
+        batch_size: Anzahl Nummern pro SPARQL-Abfrage.
+
+    Returns:
+        dict: {CAS-Nummer: sortierte Liste der QIDs} für jede angefragte Nummer.
+    """
+    qids = {cas: [] for cas in cas_numbers}
+    valid = [cas for cas in qids if CAS_FORMAT.match(cas)]
+    print(f"SPARQL: {len(valid)} CAS-Nummern in Blöcken zu {batch_size}")
+
+    sparql = SparqlQuery(repo=repo)
+    for batch in batched(valid, batch_size):
+        resolve_cas_batch(sparql, batch, qids)
+
+    return {cas: sorted(set(qids.get(cas, []))) for cas in cas_numbers}
+
+
+def get_claim_values(statements):
+    """
+    Liefert die Werte einer Liste von Aussagen (Elemente als QID, sonst der Rohwert).
+    Aussagen ohne Wert ("unbekannt", "kein Wert") werden übergangen.
+    """
+    values = []
+    for statement in statements:
+        snak = statement.get("mainsnak", {})
+        if snak.get("snaktype") != "value":
+            continue
+        value = snak["datavalue"]["value"]
+        values.append(value["id"] if isinstance(value, dict) and "id" in value else value)
+    return values
+
+
+def get_deprecated_values(statements):
+    """
+    Liefert die Werte der Aussagen mit missbilligtem Rang und die angegebenen Gründe (P2241).
+
+    Returns:
+        list: [[Wert, [QIDs der Gründe]]]
+    """
+    deprecated = []
+    for statement in statements:
+        snak = statement.get("mainsnak", {})
+        if statement.get("rank") != "deprecated" or snak.get("snaktype") != "value":
+            continue
+        reasons = get_claim_values({"mainsnak": qualifier} for qualifier in statement.get("qualifiers", {}).get(DEPRECATION_REASON, []))
+        deprecated.append([get_claim_values([statement])[0], reasons])
+    return deprecated
+
+
+def make_entity_record(entity, properties=ENTITY_PROPERTIES):
+    """
+    Wandelt ein Element aus der wbgetentities-Antwort in einen schlanken Datensatz um.
+
+    Args:
+        entity: Das Element aus der Antwort (formatversion=2).
+        properties: Eigenschaften, deren Werte übernommen werden.
+
+    Returns:
+        dict: {"id", "sitelinks": {Wiki: Titel}, "claims": {Eigenschaft: [Werte]},
+        "deprecated": {Eigenschaft: [[Wert, [Gründe]]]}, "labels": {Sprache: Bezeichnung}}
+    """
+    claims = entity.get("claims", {})
+    return {
+        "id": entity["id"],
+        "sitelinks": {site: link["title"] for site, link in entity.get("sitelinks", {}).items()},
+        "claims": {prop: get_claim_values(claims[prop]) for prop in properties if prop in claims},
+        "deprecated": {prop: get_deprecated_values(claims[prop]) for prop in properties if prop in claims},
+        "labels": {language: label["value"] for language, label in entity.get("labels", {}).items()},
+    }
+
+
+def query_entities_batch(repo, qids, props, languages):
+    """
+    Lädt einen Block von höchstens 50 Elementen mit einer wbgetentities-Abfrage.
+
+    Args:
+        repo: Das Wikidata-Repository.
+        qids: Liste gültiger Element-IDs.
+        props: Angefragte Teile, z.B. "sitelinks|claims|labels".
+        languages: Sprachen der Bezeichnungen.
+
+    Returns:
+        dict: {angefragte ID: Datensatz oder None, wenn das Element nicht existiert}
+    """
+    entities = {}
+    for data in api_query(repo, action="wbgetentities", ids="|".join(qids), props=props,
+                          languages="|".join(languages), redirects="yes"):
+        for key, entity in data.get("entities", {}).items():
+            # bei Weiterleitungen steht die angefragte ID unter "redirects"
+            requested = entity.get("redirects", {}).get("from", key)
+            entities[requested] = None if "missing" in entity else make_entity_record(entity)
+    return entities
+
+
+def get_entities_bulk(repo, qids, props=ENTITY_PROPS, languages=ENTITY_LANGUAGES, batch_size=ENTITY_BATCH_SIZE):
+    """
+    Lädt beliebig viele Wikidata-Elemente in Blöcken. Weiterleitungen werden aufgelöst,
+    die "id" im Datensatz ist dann die des Ziels. Fehlgeschlagene Blöcke werden mit
+    wachsender Wartezeit wiederholt.
+
+    Args:
+        repo: Das Wikidata-Repository (site.data_repository()).
+        qids: Liste von Element-IDs.
+        props: Angefragte Teile, z.B. "sitelinks" wenn nur die Sitelinks gebraucht werden.
+        languages: Sprachen der Bezeichnungen.
+        batch_size: Anzahl Elemente pro Abfrage (API-Grenze 50).
+
+    Returns:
+        dict: {ID: Datensatz (siehe make_entity_record) oder None, wenn das Element nicht
+        existiert, die ID ungültig ist oder nicht geladen werden konnte}
+    """
+    entities = {qid: None for qid in qids}
+    valid = [qid for qid in entities if ENTITY_ID_FORMAT.match(qid)]
+    print(f"wbgetentities: {len(valid)} Elemente in Blöcken zu {batch_size}")
+
+    for batch in batched(valid, batch_size):
+        for attempt in range(1, ENTITY_RETRIES + 1):
+            try:
+                entities.update(query_entities_batch(repo, batch, props, languages))
+                break
+            except Exception as e:
+                pywikibot.warning(f"wbgetentities fehlgeschlagen für {len(batch)} Elemente ({batch[0]} ...), Versuch {attempt}/{ENTITY_RETRIES}: {e}")
+                if attempt < ENTITY_RETRIES:
+                    time.sleep(ENTITY_DELAY * attempt)
+
+    return entities
+
+
+def get_label_cache():
+    """
+    Lädt den Cache der Bezeichnungen (einmal pro Lauf).
+
+    Returns:
+        dict: {QID: [Ziel-QID, {Sprache: Bezeichnung}, Zeitpunkt]}
+    """
+    global _label_cache
+    if _label_cache is None:
+        _label_cache = load_json_cache(LABEL_CACHE_FILE, {})
+    return _label_cache
+
+
+def get_labels_bulk(repo, qids):
+    """
+    Liefert Bezeichnungen und Weiterleitungsziele von Elementen. Unbekannte oder veraltete
+    Einträge werden gesammelt mit wbgetentities (props=labels) geladen.
+
+    Args:
+        repo: Das Wikidata-Repository.
+        qids: Liste von Element-IDs.
+
+    Returns:
+        dict: {QID: (Ziel-QID, {Sprache: Bezeichnung})}, nicht ladbare Elemente fehlen.
+    """
+    global label_cache_hits, labels_loaded
+
+    cache = get_label_cache()
+    now = time.time()
+    missing = []
+    for qid in dict.fromkeys(qids):
+        entry = cache.get(qid)
+        if entry and now - entry[2] <= LABEL_CACHE_TTL:
+            label_cache_hits += 1
+        else:
+            missing.append(qid)
+
+    if missing:
+        entities = get_entities_bulk(repo, missing, props="labels")
+        for qid, entity in entities.items():
+            if entity is not None:
+                cache[qid] = [entity["id"], entity["labels"], now]
+                labels_loaded += 1
+        save_json_cache(LABEL_CACHE_FILE, cache)
+
+    return {qid: (cache[qid][0], cache[qid][1]) for qid in qids if qid in cache}
+
+
+def get_label(labels, default):
+    """
+    Liefert die deutsche, sonst die englische Bezeichnung, sonst default.
+    """
+    return labels.get("de") or labels.get("en") or default
+
+
+def print_label_statistics():
+    """
+    Gibt aus, wie viele Bezeichnungen aus dem Cache kamen.
+    """
+    print(f"Bezeichnungen: {label_cache_hits} aus dem Cache, {labels_loaded} neu geladen")